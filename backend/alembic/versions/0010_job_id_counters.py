@@ -0,0 +1,39 @@
+"""add per-year job id counters
+
+Revision ID: 0010_job_id_counters
+Revises: 0009_job_archival
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0010_job_id_counters"
+down_revision: Union[str, None] = "0009_job_archival"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_id_counters",
+        sa.Column("year", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.PrimaryKeyConstraint("year"),
+    )
+    op.execute(
+        """
+        INSERT INTO job_id_counters (year, last_value)
+        SELECT CAST(split_part(job_id, '-', 2) AS integer),
+               MAX(CAST(split_part(job_id, '-', 3) AS integer))
+        FROM item_jobs
+        WHERE job_id ~ '^DJ-[0-9]{4}-[0-9]+$'
+        GROUP BY 1
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_id_counters")
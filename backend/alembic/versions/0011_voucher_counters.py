@@ -0,0 +1,50 @@
+"""add per-month voucher counters
+
+Revision ID: 0011_voucher_counters
+Revises: 0010_job_id_counters
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0011_voucher_counters"
+down_revision: Union[str, None] = "0010_job_id_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "voucher_counters",
+        sa.Column("year", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("month", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("last_value", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.PrimaryKeyConstraint("year", "month"),
+    )
+    # Mirrors app.utils.vouchers.parse_voucher_sequence: a legacy
+    # BATCH-YYYY-MM code without a suffix counts as sequence 1. The colons in
+    # the non-capturing groups are escaped so they are not read as binds.
+    op.execute(
+        sa.text(
+            r"""
+            INSERT INTO voucher_counters (year, month, last_value)
+            SELECT CAST(m[1] AS integer), CAST(m[2] AS integer), MAX(CAST(COALESCE(m[3], '1') AS integer))
+            FROM (
+                SELECT regexp_match(batch_code, '^(?\:VCH|VOUCHER)-([0-9]{4})-([0-9]{2})-([0-9]{3})$') AS m
+                FROM batches
+                UNION ALL
+                SELECT regexp_match(batch_code, '^BATCH-([0-9]{4})-([0-9]{2})(?\:-([0-9]{3}))?$') AS m
+                FROM batches
+            ) AS codes
+            WHERE m IS NOT NULL
+            GROUP BY 1, 2
+            """
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("voucher_counters")
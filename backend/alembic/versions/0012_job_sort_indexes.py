@@ -0,0 +1,39 @@
+"""add composite job sort indexes for keyset pagination
+
+Revision ID: 0012_job_sort_indexes
+Revises: 0011_voucher_counters
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0012_job_sort_indexes"
+down_revision: Union[str, None] = "0011_voucher_counters"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SORT_COLUMNS = [
+    "created_at",
+    "last_scan_at",
+    "job_id",
+    "customer_name",
+    "current_status",
+    "current_holder_role",
+]
+
+
+def upgrade() -> None:
+    for column in SORT_COLUMNS:
+        op.create_index(f"ix_item_jobs_{column}_id", "item_jobs", [column, "id"])
+    # Superseded by the composite (column, id) indexes above.
+    op.drop_index("ix_item_jobs_current_status", table_name="item_jobs")
+    op.drop_index("ix_item_jobs_created_at", table_name="item_jobs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_item_jobs_created_at", "item_jobs", ["created_at"])
+    op.create_index("ix_item_jobs_current_status", "item_jobs", ["current_status"])
+    for column in reversed(SORT_COLUMNS):
+        op.drop_index(f"ix_item_jobs_{column}_id", table_name="item_jobs")
@@ -0,0 +1,43 @@
+"""add per-job stage timings
+
+Revision ID: 0014_job_stage_timings
+Revises: 0013_report_snapshots
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0014_job_stage_timings"
+down_revision: Union[str, None] = "0013_report_snapshots"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STAGE_COLUMNS = [
+    "purchased_at",
+    "packed_ready_at",
+    "dispatched_to_factory_at",
+    "received_at_factory_at",
+    "returned_from_factory_at",
+    "received_at_shop_at",
+    "added_to_stock_at",
+    "handed_to_delivery_at",
+    "delivered_to_customer_at",
+]
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_stage_timings",
+        sa.Column("job_id", postgresql.UUID(as_uuid=True), nullable=False),
+        *[sa.Column(column, sa.DateTime(timezone=True), nullable=True) for column in STAGE_COLUMNS],
+        sa.ForeignKeyConstraint(["job_id"], ["item_jobs.id"]),
+        sa.PrimaryKeyConstraint("job_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_stage_timings")
@@ -0,0 +1,53 @@
+"""add document job queue
+
+Revision ID: 0015_document_jobs
+Revises: 0014_job_stage_timings
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0015_document_jobs"
+down_revision: Union[str, None] = "0014_job_stage_timings"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    document_job_status_enum = sa.Enum("QUEUED", "RUNNING", "SUCCEEDED", "FAILED", name="document_job_status")
+    op.create_table(
+        "document_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("kind", sa.String(length=32), nullable=False),
+        sa.Column("params", postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default=sa.text("'{}'::jsonb")),
+        sa.Column("status", document_job_status_enum, nullable=False, server_default="QUEUED"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("requested_by_user_id", postgresql.UUID(as_uuid=True), nullable=True),
+        sa.Column("result_key", sa.String(length=255), nullable=True),
+        sa.Column("result_url", sa.String(length=512), nullable=True),
+        sa.Column("content_type", sa.String(length=128), nullable=True),
+        sa.Column("filename", sa.String(length=255), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["requested_by_user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    # Workers only ever scan for claimable rows; keep that index to those.
+    op.create_index(
+        "ix_document_jobs_claimable",
+        "document_jobs",
+        ["status", "created_at"],
+        postgresql_where=sa.text("status IN ('QUEUED', 'RUNNING')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_document_jobs_claimable", table_name="document_jobs")
+    op.drop_table("document_jobs")
+    op.execute("DROP TYPE IF EXISTS document_job_status")
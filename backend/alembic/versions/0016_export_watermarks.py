@@ -0,0 +1,37 @@
+"""track updated_at on incidents and vouchers for incremental exports
+
+Revision ID: 0016_export_watermarks
+Revises: 0015_document_jobs
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0016_export_watermarks"
+down_revision: Union[str, None] = "0015_document_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows get now(), so the first incremental pull after the upgrade
+    # re-exports them once rather than missing any.
+    for table in ("incidents", "batches"):
+        op.add_column(
+            table,
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        )
+        op.create_index(f"ix_{table}_updated_at", table, ["updated_at"])
+    op.create_index("ix_item_jobs_updated_at", "item_jobs", ["updated_at"])
+    op.create_index("ix_status_events_timestamp", "status_events", ["timestamp"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_status_events_timestamp", table_name="status_events")
+    op.drop_index("ix_item_jobs_updated_at", table_name="item_jobs")
+    for table in ("batches", "incidents"):
+        op.drop_index(f"ix_{table}_updated_at", table_name=table)
+        op.drop_column(table, "updated_at")
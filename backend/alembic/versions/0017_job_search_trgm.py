@@ -0,0 +1,40 @@
+"""add trigram indexes for job search
+
+Revision ID: 0017_job_search_trgm
+Revises: 0016_export_watermarks
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0017_job_search_trgm"
+down_revision: Union[str, None] = "0016_export_watermarks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SEARCH_COLUMNS = [
+    "job_id",
+    "customer_phone",
+    "customer_name",
+    "voucher_no",
+    "style_number",
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f"ix_item_jobs_{column}_trgm",
+            "item_jobs",
+            [column],
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+        )
+
+
+def downgrade() -> None:
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f"ix_item_jobs_{column}_trgm", table_name="item_jobs")
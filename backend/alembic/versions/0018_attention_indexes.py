@@ -0,0 +1,58 @@
+"""add partial indexes for dashboard attention filters
+
+Revision ID: 0018_attention_indexes
+Revises: 0017_job_search_trgm
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0018_attention_indexes"
+down_revision: Union[str, None] = "0017_job_search_trgm"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Predicates are spelled exactly as the ORM renders them (`IS false`) so the
+# planner can match them against the queries' WHERE clauses.
+ACTIVE_JOBS = sa.text("is_archived IS false")
+
+
+def upgrade() -> None:
+    # Status sets and target dates for overdue_returns, at_factory and
+    # awaiting_closure. The INCLUDE columns let the ops summary count every
+    # bucket from an index-only scan.
+    op.create_index(
+        "ix_item_jobs_active_status_target",
+        "item_jobs",
+        ["current_status", "target_return_date"],
+        postgresql_include=["last_scan_at", "created_at", "id"],
+        postgresql_where=ACTIVE_JOBS,
+    )
+    op.create_index(
+        "ix_item_jobs_active_last_activity",
+        "item_jobs",
+        [sa.text("coalesce(last_scan_at, created_at)")],
+        postgresql_where=ACTIVE_JOBS,
+    )
+    op.create_index(
+        "ix_incidents_open_created_at",
+        "incidents",
+        ["created_at"],
+        postgresql_where=sa.text("status = 'OPEN'"),
+    )
+    op.create_index(
+        "ix_batches_active_expected_return",
+        "batches",
+        ["status", "expected_return_date"],
+        postgresql_where=sa.text("is_archived IS false AND dispatch_date IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_batches_active_expected_return", table_name="batches")
+    op.drop_index("ix_incidents_open_created_at", table_name="incidents")
+    op.drop_index("ix_item_jobs_active_last_activity", table_name="item_jobs")
+    op.drop_index("ix_item_jobs_active_status_target", table_name="item_jobs")
@@ -0,0 +1,60 @@
+"""add precomputed pending-aging bucket counts
+
+Revision ID: 0019_job_aging_buckets
+Revises: 0018_attention_indexes
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0019_job_aging_buckets"
+down_revision: Union[str, None] = "0018_attention_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_aging_buckets",
+        sa.Column("status", postgresql.ENUM(name="status", create_type=False), nullable=False),
+        sa.Column("bucket", sa.String(length=16), nullable=False),
+        sa.Column("job_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("status", "bucket"),
+    )
+    # Seed the counts and the refresh marker from the same now() so incremental
+    # moves line up with the seeded ages.
+    op.execute(
+        """
+        INSERT INTO job_aging_buckets (status, bucket, job_count)
+        SELECT current_status,
+               CASE
+                   WHEN age_days <= 2 THEN 'bucket_0_2'
+                   WHEN age_days <= 7 THEN 'bucket_3_7'
+                   WHEN age_days <= 15 THEN 'bucket_8_15'
+                   WHEN age_days <= 30 THEN 'bucket_16_30'
+                   ELSE 'bucket_30_plus'
+               END AS bucket,
+               count(*)
+        FROM (
+            SELECT current_status, date_part('day', now() - coalesce(last_scan_at, created_at)) AS age_days
+            FROM item_jobs
+        ) AS ages
+        GROUP BY 1, 2
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO report_snapshots (name, payload, computed_at)
+        VALUES ('pending_aging', '{}', now())
+        ON CONFLICT (name) DO UPDATE SET computed_at = excluded.computed_at
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM report_snapshots WHERE name = 'pending_aging'")
+    op.drop_table("job_aging_buckets")
@@ -0,0 +1,143 @@
+"""notify live event subscribers on status, voucher and incident writes
+
+Revision ID: 0020_live_event_triggers
+Revises: 0019_job_aging_buckets
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+revision: str = "0020_live_event_triggers"
+down_revision: Union[str, None] = "0019_job_aging_buckets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Keep in step with app.utils.live_events.EVENTS_CHANNEL. NOTIFY is delivered
+# on commit and dropped on rollback, so listeners only see durable writes.
+CHANNEL = "live_events"
+
+
+def upgrade() -> None:
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_status_event() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('{CHANNEL}', jsonb_build_object(
+                'type', 'status',
+                'id', NEW.job_id,
+                'job_id', (SELECT job_id FROM item_jobs WHERE id = NEW.job_id),
+                'from', NEW.from_status,
+                'to', NEW.to_status,
+                'at', NEW.timestamp
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_batch_change() RETURNS trigger AS $$
+        DECLARE
+            rec batches%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                rec := OLD;
+            ELSE
+                rec := NEW;
+            END IF;
+            PERFORM pg_notify('{CHANNEL}', jsonb_build_object(
+                'type', 'batch',
+                'op', lower(TG_OP),
+                'id', rec.id,
+                'batch_code', rec.batch_code,
+                'status', rec.status,
+                'item_count', rec.item_count,
+                'is_archived', rec.is_archived
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        f"""
+        CREATE FUNCTION notify_incident_change() RETURNS trigger AS $$
+        DECLARE
+            rec incidents%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                rec := OLD;
+            ELSE
+                rec := NEW;
+            END IF;
+            PERFORM pg_notify('{CHANNEL}', jsonb_build_object(
+                'type', 'incident',
+                'op', lower(TG_OP),
+                'id', rec.id,
+                'job', rec.job_id,
+                'batch', rec.batch_id,
+                'incident_type', rec.type,
+                'status', rec.status
+            )::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER status_events_notify
+        AFTER INSERT ON status_events
+        FOR EACH ROW EXECUTE FUNCTION notify_status_event()
+        """
+    )
+    # Updates only notify when a field the dashboards show changes; most batch
+    # updates just touch updated_at.
+    op.execute(
+        """
+        CREATE TRIGGER batches_notify_write
+        AFTER INSERT OR DELETE ON batches
+        FOR EACH ROW EXECUTE FUNCTION notify_batch_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER batches_notify_update
+        AFTER UPDATE ON batches
+        FOR EACH ROW
+        WHEN ((OLD.status, OLD.item_count, OLD.is_archived, OLD.factory_id, OLD.expected_return_date)
+              IS DISTINCT FROM (NEW.status, NEW.item_count, NEW.is_archived, NEW.factory_id, NEW.expected_return_date))
+        EXECUTE FUNCTION notify_batch_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER incidents_notify_write
+        AFTER INSERT OR DELETE ON incidents
+        FOR EACH ROW EXECUTE FUNCTION notify_incident_change()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER incidents_notify_update
+        AFTER UPDATE ON incidents
+        FOR EACH ROW
+        WHEN ((OLD.status, OLD.type, OLD.job_id, OLD.batch_id)
+              IS DISTINCT FROM (NEW.status, NEW.type, NEW.job_id, NEW.batch_id))
+        EXECUTE FUNCTION notify_incident_change()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS incidents_notify_update ON incidents")
+    op.execute("DROP TRIGGER IF EXISTS incidents_notify_write ON incidents")
+    op.execute("DROP TRIGGER IF EXISTS batches_notify_update ON batches")
+    op.execute("DROP TRIGGER IF EXISTS batches_notify_write ON batches")
+    op.execute("DROP TRIGGER IF EXISTS status_events_notify ON status_events")
+    op.execute("DROP FUNCTION IF EXISTS notify_incident_change()")
+    op.execute("DROP FUNCTION IF EXISTS notify_batch_change()")
+    op.execute("DROP FUNCTION IF EXISTS notify_status_event()")
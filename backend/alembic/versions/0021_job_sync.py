@@ -0,0 +1,39 @@
+"""add job tombstones and a keyset index for the job change feed
+
+Revision ID: 0021_job_sync
+Revises: 0020_live_event_triggers
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision: str = "0021_job_sync"
+down_revision: Union[str, None] = "0020_live_event_triggers"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_tombstones",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("job_id", sa.String(length=32), nullable=False),
+        sa.Column("deleted_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_job_tombstones_deleted_at_id", "job_tombstones", ["deleted_at", "id"])
+    # The feed pages on (updated_at, id); the composite index also serves the
+    # Parquet export's updated_since pulls, so it replaces the single column one.
+    op.create_index("ix_item_jobs_updated_at_id", "item_jobs", ["updated_at", "id"])
+    op.drop_index("ix_item_jobs_updated_at", table_name="item_jobs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_item_jobs_updated_at", "item_jobs", ["updated_at"])
+    op.drop_index("ix_item_jobs_updated_at_id", table_name="item_jobs")
+    op.drop_index("ix_job_tombstones_deleted_at_id", table_name="job_tombstones")
+    op.drop_table("job_tombstones")
@@ -0,0 +1,50 @@
+"""stamp exported tables with the writing transaction id
+
+Revision ID: 0022_change_xid
+Revises: 0021_job_sync
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0022_change_xid"
+down_revision: Union[str, None] = "0021_job_sync"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("item_jobs", "status_events", "incidents", "batches")
+
+
+def upgrade() -> None:
+    # Existing rows keep 0, below every horizon, so the first pull picks them up.
+    op.execute(
+        """
+        CREATE FUNCTION stamp_change_xid() RETURNS trigger AS $$
+        BEGIN
+            NEW.change_xid := pg_current_xact_id()::text::bigint;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for table in TABLES:
+        op.add_column(table, sa.Column("change_xid", sa.BigInteger(), server_default=sa.text("0"), nullable=False))
+        op.create_index(f"ix_{table}_change_xid_id", table, ["change_xid", "id"])
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_stamp_change_xid
+            BEFORE INSERT OR UPDATE ON {table}
+            FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()
+            """
+        )
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_stamp_change_xid ON {table}")
+        op.drop_index(f"ix_{table}_change_xid_id", table_name=table)
+        op.drop_column(table, "change_xid")
+    op.execute("DROP FUNCTION IF EXISTS stamp_change_xid()")
@@ -0,0 +1,39 @@
+"""page the job change feed on change_xid
+
+Revision ID: 0023_job_sync_change_xid
+Revises: 0022_change_xid
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0023_job_sync_change_xid"
+down_revision: Union[str, None] = "0022_change_xid"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("job_tombstones", sa.Column("change_xid", sa.BigInteger(), server_default=sa.text("0"), nullable=False))
+    op.execute(
+        """
+        CREATE TRIGGER job_tombstones_stamp_change_xid
+        BEFORE INSERT OR UPDATE ON job_tombstones
+        FOR EACH ROW EXECUTE FUNCTION stamp_change_xid()
+        """
+    )
+    op.create_index("ix_job_tombstones_change_xid_id", "job_tombstones", ["change_xid", "id"])
+    op.drop_index("ix_job_tombstones_deleted_at_id", table_name="job_tombstones")
+    # Both feeds now page on (change_xid, id), which 0022 indexed for item_jobs.
+    op.drop_index("ix_item_jobs_updated_at_id", table_name="item_jobs")
+
+
+def downgrade() -> None:
+    op.create_index("ix_item_jobs_updated_at_id", "item_jobs", ["updated_at", "id"])
+    op.create_index("ix_job_tombstones_deleted_at_id", "job_tombstones", ["deleted_at", "id"])
+    op.drop_index("ix_job_tombstones_change_xid_id", table_name="job_tombstones")
+    op.execute("DROP TRIGGER IF EXISTS job_tombstones_stamp_change_xid ON job_tombstones")
+    op.drop_column("job_tombstones", "change_xid")
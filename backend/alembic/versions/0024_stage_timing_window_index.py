@@ -0,0 +1,36 @@
+"""index job_stage_timings on the latest stage reached
+
+Revision ID: 0024_stage_timing_window_index
+Revises: 0023_job_sync_change_xid
+Create Date: 2026-10-17 00:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+revision: str = "0024_stage_timing_window_index"
+down_revision: Union[str, None] = "0023_job_sync_change_xid"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Matches LATEST_STAGE_AT in app/utils/turnaround.py, which bounds the
+    # turnaround report to its window.
+    op.create_index(
+        "ix_job_stage_timings_latest_stage_at",
+        "job_stage_timings",
+        [
+            sa.text(
+                "greatest(packed_ready_at, dispatched_to_factory_at, received_at_factory_at, "
+                "returned_from_factory_at, received_at_shop_at, added_to_stock_at, "
+                "handed_to_delivery_at, delivered_to_customer_at)"
+            )
+        ],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_job_stage_timings_latest_stage_at", table_name="job_stage_timings")
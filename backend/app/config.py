@@ -17,6 +17,10 @@ class Settings(BaseSettings):
     db_max_overflow: int = 10
     db_pool_timeout: int = 30
     db_pool_recycle: int = 1800
+    # The async engine keeps its own, smaller pool: each worker opens up to
+    # db_pool_size + db_max_overflow + async_db_pool_size + async_db_max_overflow.
+    async_db_pool_size: int = 3
+    async_db_max_overflow: int = 2
     secret_key: str = "change-me"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
@@ -24,6 +28,7 @@ class Settings(BaseSettings):
     auth_access_cookie_name: str = "diamond_access_token"
     auth_refresh_cookie_name: str = "diamond_refresh_token"
     auth_cookie_samesite: str = "lax"
+    auth_user_cache_seconds: int = 60
 
     admin_username: str = "admin"
     admin_password: str = "admin123"
@@ -35,6 +40,18 @@ class Settings(BaseSettings):
     s3_secret_key: str = "minio123"
     s3_region: str = "us-east-1"
     local_storage_path: str = "./storage"
+    upload_max_bytes: int = 15 * 1024 * 1024
+    thumbnail_workers: int = 2
+    label_photo_cache_dir: str = ""
+    label_photo_cache_entries: int = 512
+    label_photo_prefetch_timeout: float = 8.0
+    label_render_processes: int = 0
+    document_workers: int = 2
+    document_worker_poll_seconds: float = 1.0
+    document_job_timeout_seconds: int = 600
+    document_retention_hours: int = 24
+
+    ops_summary_cache_seconds: int = 30
 
     cors_origins: str = ",".join(DEFAULT_CORS_ORIGINS)
     cors_origin_regex: str = r"^https://([a-z0-9-]+\.)?majesticjewellers\.com$"
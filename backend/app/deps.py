@@ -1,13 +1,14 @@
 from typing import Callable
+import threading
+import time
 import uuid
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.db import get_db
+from app.db import AsyncSessionLocal
 from app.models import Role, User
 
 settings = get_settings()
@@ -15,6 +16,58 @@ settings = get_settings()
 bearer_scheme = HTTPBearer(auto_error=False)
 
 
+class ActiveUserCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 1024) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: dict[uuid.UUID, tuple[float, dict]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id: uuid.UUID) -> User | None:
+        if self.ttl_seconds <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if not entry:
+                return None
+            expires_at, fields = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                return None
+        return User(**{**fields, "roles": list(fields["roles"])})
+
+    def set(self, user: User) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        fields = {
+            "id": user.id,
+            "username": user.username,
+            "roles": tuple(user.roles),
+            "is_active": user.is_active,
+            "created_at": user.created_at,
+        }
+        with self._lock:
+            self._entries.pop(user.id, None)
+            while len(self._entries) >= self.max_entries:
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, fields)
+
+    def invalidate(self, user_id: uuid.UUID) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Always expire well before the access token does so a deactivated user
+# cannot ride a cached entry for the rest of the token lifetime.
+user_cache = ActiveUserCache(
+    ttl_seconds=min(settings.auth_user_cache_seconds, settings.access_token_expire_minutes * 60 // 2),
+)
+
+
 def extract_access_token(
     request: Request, credentials: HTTPAuthorizationCredentials | None
 ) -> str:
@@ -26,10 +79,17 @@ def extract_access_token(
     raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
 
-def get_current_user(
+async def _load_user(user_id: uuid.UUID) -> User | None:
+    # Looked up on its own short-lived session so the connection goes straight
+    # back to the pool, rather than sitting idle in transaction next to the
+    # route's own (sync or async) session until the request ends.
+    async with AsyncSessionLocal() as db:
+        return await db.get(User, user_id)
+
+
+async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(bearer_scheme),
-    db: Session = Depends(get_db),
 ) -> User:
     token = extract_access_token(request, credentials)
     try:
@@ -47,14 +107,23 @@ def get_current_user(
     except ValueError as exc:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid user id") from exc
 
-    user = db.query(User).filter(User.id == user_uuid).first()
-    if not user or not user.is_active:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+    user = user_cache.get(user_uuid)
+    token_roles = payload.get("roles")
+    if user and token_roles is not None and sorted(token_roles) != sorted(role.value for role in user.roles):
+        # Roles changed since this entry was cached (possibly on another
+        # worker); reload instead of trusting either copy.
+        user = None
+    if user is None:
+        user = await _load_user(user_uuid)
+        if not user or not user.is_active:
+            user_cache.invalidate(user_uuid)
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Inactive user")
+        user_cache.set(user)
     return user
 
 
 def require_roles(*roles: Role) -> Callable:
-    def role_dependency(user: User = Depends(get_current_user)) -> User:
+    async def role_dependency(user: User = Depends(get_current_user)) -> User:
         if roles and not any(role in user.roles for role in roles):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient role")
         return user
@@ -1,18 +1,30 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
 from app.db import SessionLocal
 from app.models import Branch, Role, User
-from app.routers import audit, auth, batches, factories, incidents, jobs, reports, uploads, users
+from app.routers import audit, auth, batches, documents, events, factories, incidents, jobs, reports, sync, uploads, users
+from app.utils.live_events import hub
 from app.utils.security import hash_password
 
 settings = get_settings()
 
 app = FastAPI(title=settings.app_name)
 
+
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    # Refuse oversized uploads from Content-Length before the multipart body is
+    # spooled; chunked bodies are still checked against the limit in the route.
+    if request.method == "POST" and request.url.path.startswith(uploads.router.prefix):
+        if uploads.exceeds_upload_limit(request.headers.get("content-length")):
+            return JSONResponse(status_code=413, content={"detail": "File too large"})
+    return await call_next(request)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -20,6 +32,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"] ,
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Export-Watermark"],
 )
 
 app.include_router(auth.router)
@@ -31,6 +44,9 @@ app.include_router(incidents.router)
 app.include_router(reports.router)
 app.include_router(users.router)
 app.include_router(audit.router)
+app.include_router(documents.router)
+app.include_router(events.router)
+app.include_router(sync.router)
 
 if settings.storage_backend.lower() == "local":
     app.mount("/storage", StaticFiles(directory=settings.local_storage_path), name="storage")
@@ -59,6 +75,11 @@ def seed_defaults() -> None:
         db.close()
 
 
+@app.on_event("shutdown")
+async def close_event_hub() -> None:
+    await hub.close()
+
+
 @app.get("/")
 def root():
     return {"status": "ok"}
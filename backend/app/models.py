@@ -3,11 +3,13 @@ import uuid
 from datetime import datetime
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     CheckConstraint,
     Column,
     DateTime,
     Enum,
+    FetchedValue,
     Float,
     ForeignKey,
     Integer,
@@ -79,6 +81,13 @@ class IncidentStatus(str, enum.Enum):
     RESOLVED = "RESOLVED"
 
 
+class DocumentJobStatus(str, enum.Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+
 ROLE_ENUM = Enum(Role, name="role", values_callable=lambda obj: [e.value for e in obj])
 STATUS_ENUM = Enum(Status, name="status", values_callable=lambda obj: [e.value for e in obj])
 ITEM_SOURCE_ENUM = Enum(ItemSource, name="item_source", values_callable=lambda obj: [e.value for e in obj])
@@ -92,6 +101,9 @@ INCIDENT_TYPE_ENUM = Enum(
 INCIDENT_STATUS_ENUM = Enum(
     IncidentStatus, name="incident_status", values_callable=lambda obj: [e.value for e in obj]
 )
+DOCUMENT_JOB_STATUS_ENUM = Enum(
+    DocumentJobStatus, name="document_job_status", values_callable=lambda obj: [e.value for e in obj]
+)
 
 
 class User(Base):
@@ -140,6 +152,8 @@ class ItemJob(Base):
     branch_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("branches.id"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    # Writing transaction id, stamped by trigger; see app.utils.change_xid.
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default="0", server_onupdate=FetchedValue())
     customer_name: Mapped[str | None] = mapped_column(String(120), nullable=True)
     customer_phone: Mapped[str | None] = mapped_column(String(40), nullable=True)
     item_description: Mapped[str] = mapped_column(Text)
@@ -182,6 +196,21 @@ class ItemJob(Base):
         return self.factory.name
 
 
+class JobIdCounter(Base):
+    __tablename__ = "job_id_counters"
+
+    year: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    last_value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class VoucherCounter(Base):
+    __tablename__ = "voucher_counters"
+
+    year: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    month: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    last_value: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
 class StatusEvent(Base):
     __tablename__ = "status_events"
 
@@ -197,10 +226,26 @@ class StatusEvent(Base):
     remarks: Mapped[str | None] = mapped_column(Text, nullable=True)
     incident_flag: Mapped[bool] = mapped_column(Boolean, default=False)
     override_reason: Mapped[str | None] = mapped_column(Text, nullable=True)
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default="0", server_onupdate=FetchedValue())
 
     job = relationship("ItemJob", back_populates="status_events")
 
 
+class JobStageTiming(Base):
+    __tablename__ = "job_stage_timings"
+
+    job_id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("item_jobs.id"), primary_key=True)
+    purchased_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    packed_ready_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    dispatched_to_factory_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    received_at_factory_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    returned_from_factory_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    received_at_shop_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    added_to_stock_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    handed_to_delivery_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    delivered_to_customer_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class Batch(Base):
     __tablename__ = "batches"
 
@@ -210,6 +255,8 @@ class Batch(Base):
     created_by: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
     factory_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("factories.id"), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default="0", server_onupdate=FetchedValue())
     dispatch_date: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     expected_return_date: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     status: Mapped[BatchStatus] = mapped_column(BATCH_STATUS_ENUM, default=BatchStatus.CREATED)
@@ -254,6 +301,8 @@ class Incident(Base):
     description: Mapped[str] = mapped_column(Text)
     reported_by: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"))
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default="0", server_onupdate=FetchedValue())
     resolved_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     resolution_notes: Mapped[str | None] = mapped_column(Text, nullable=True)
     attachments: Mapped[list | None] = mapped_column(JSONB, nullable=True)
@@ -271,6 +320,41 @@ class RefreshToken(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
 
+class ReportSnapshot(Base):
+    __tablename__ = "report_snapshots"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    payload: Mapped[dict] = mapped_column(JSONB)
+    computed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True))
+
+
+class JobAgingBucket(Base):
+    __tablename__ = "job_aging_buckets"
+
+    status: Mapped[Status] = mapped_column(STATUS_ENUM, primary_key=True)
+    bucket: Mapped[str] = mapped_column(String(16), primary_key=True)
+    job_count: Mapped[int] = mapped_column(Integer, default=0)
+
+
+class DocumentJob(Base):
+    __tablename__ = "document_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind: Mapped[str] = mapped_column(String(32))
+    params: Mapped[dict] = mapped_column(JSONB, default=dict)
+    status: Mapped[DocumentJobStatus] = mapped_column(DOCUMENT_JOB_STATUS_ENUM, default=DocumentJobStatus.QUEUED)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    requested_by_user_id: Mapped[uuid.UUID | None] = mapped_column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+    result_key: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    result_url: Mapped[str | None] = mapped_column(String(512), nullable=True)
+    content_type: Mapped[str | None] = mapped_column(String(128), nullable=True)
+    filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 class JobEditAudit(Base):
     __tablename__ = "job_edit_audits"
 
@@ -281,3 +365,13 @@ class JobEditAudit(Base):
     edited_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     reason: Mapped[str] = mapped_column(Text)
     changes: Mapped[dict] = mapped_column(JSONB)
+
+
+class JobTombstone(Base):
+    __tablename__ = "job_tombstones"
+
+    # The deleted job's own id, so sync clients can match what they hold.
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True)
+    job_id: Mapped[str] = mapped_column(String(32))
+    deleted_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    change_xid: Mapped[int] = mapped_column(BigInteger, server_default="0", server_onupdate=FetchedValue())
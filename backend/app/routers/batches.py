@@ -4,7 +4,7 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import func, or_
+from sqlalchemy import func
 from sqlalchemy.orm import Session, selectinload
 
 from app.db import get_db
@@ -21,10 +21,18 @@ from app.schemas import (
     JobOut,
 )
 from app.utils.diamond import diamond_carat_value
-from app.utils.pdf import generate_manifest_pdf
+from app.utils.manifests import (
+    STORED_MANIFEST_STATUSES,
+    invalidate_manifest,
+    load_stored_manifest,
+    render_manifest,
+    store_manifest,
+)
 from app.utils.roles import select_role_for_action
 from app.utils.transitions import STATUS_HOLDER_ROLE
-from app.utils.vouchers import format_voucher_code, next_voucher_sequence
+from app.utils.aging import aging_state, note_aging_move
+from app.utils.turnaround import record_stage_timings
+from app.utils.sequences import next_voucher_code
 
 router = APIRouter(prefix="/batches", tags=["batches"])
 
@@ -48,6 +56,7 @@ MANIFEST_ITEM_COLUMNS = [
     "Created At",
     "Added To Voucher At",
 ]
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
 
 
 def _get_default_branch(db: Session) -> Branch:
@@ -102,6 +111,7 @@ def _ensure_batch_not_archived(batch: Batch) -> None:
 
 
 def _sync_batch_item_count(db: Session, batch: Batch) -> int:
+    db.flush()
     item_count = (
         db.query(func.count(BatchItem.id))
         .filter(BatchItem.batch_id == batch.id)
@@ -116,7 +126,7 @@ def _sync_batch_item_count(db: Session, batch: Batch) -> int:
     return batch.item_count
 
 
-def _remove_batch_item(batch: Batch, batch_item: BatchItem, user) -> None:
+def _remove_batch_item(db: Session, batch: Batch, batch_item: BatchItem, user) -> StatusEvent:
     job = batch_item.job
     if job.current_status != Status.DISPATCHED_TO_FACTORY:
         raise HTTPException(
@@ -127,25 +137,27 @@ def _remove_batch_item(batch: Batch, batch_item: BatchItem, user) -> None:
     now = datetime.now(timezone.utc)
     event_role = select_role_for_action(user.roles, preferred=[Role.DISPATCH, Role.ADMIN])
     previous_status = job.current_status
+    before = aging_state(job)
     job.current_status = Status.PACKED_READY
     job.current_holder_role = STATUS_HOLDER_ROLE[Status.PACKED_READY]
     job.current_holder_user_id = user.id
     job.last_scan_at = now
     job.factory_id = None
-
-    db.add(
-        StatusEvent(
-            job_id=job.id,
-            from_status=previous_status,
-            to_status=Status.PACKED_READY,
-            scanned_by_user_id=user.id,
-            scanned_by_role=event_role,
-            timestamp=now,
-            remarks=f"Removed from voucher {batch.batch_code}",
-            override_reason="Removed from voucher",
-        )
+    note_aging_move(db, before, aging_state(job))
+
+    event = StatusEvent(
+        job_id=job.id,
+        from_status=previous_status,
+        to_status=Status.PACKED_READY,
+        scanned_by_user_id=user.id,
+        scanned_by_role=event_role,
+        timestamp=now,
+        remarks=f"Removed from voucher {batch.batch_code}",
+        override_reason="Removed from voucher",
     )
+    db.add(event)
     db.delete(batch_item)
+    return event
 
 
 def _sorted_batch_items(batch: Batch) -> list[BatchItem]:
@@ -305,31 +317,13 @@ def create_batch(payload: BatchCreate, user=Depends(require_roles(Role.DISPATCH,
     now = datetime.now(timezone.utc)
     year = payload.year or now.year
     month = payload.month or now.month
-    existing_codes = [
-        row[0]
-        for row in (
-            db.query(Batch.batch_code)
-            .filter(
-                or_(
-                    Batch.batch_code.like(f"VCH-{year}-{month:02d}-%"),
-                    Batch.batch_code.like(f"BATCH-{year}-{month:02d}%"),
-                )
-            )
-            .all()
-        )
-    ]
-    batch_code = format_voucher_code(
-        year,
-        month,
-        next_voucher_sequence(existing_codes, year=year, month=month),
-    )
     factory_id = None
     if payload.factory_id:
         factory_id = _get_factory_by_uuid(db, payload.factory_id).id
 
     branch = _get_default_branch(db)
     batch = Batch(
-        batch_code=batch_code,
+        batch_code=next_voucher_code(db, year=year, month=month),
         branch_id=branch.id,
         created_by=user.id,
         factory_id=factory_id,
@@ -397,6 +391,7 @@ def add_item(batch_id: str, payload: BatchAddItem, user=Depends(require_roles(Ro
 
     db.add(BatchItem(batch_id=batch.id, job_id=job.id))
     batch.item_count += 1
+    invalidate_manifest(batch)
     db.commit()
     db.refresh(batch)
     return batch
@@ -446,6 +441,7 @@ def dispatch_batch(batch_id: str, payload: BatchDispatchRequest, user=Depends(re
         for job in jobs:
             if job.target_return_date is None:
                 job.target_return_date = payload.expected_return_date
+    store_manifest(db, batch)
     db.commit()
     db.refresh(batch)
     return batch
@@ -483,8 +479,10 @@ def remove_item(
     if not batch_item:
         raise HTTPException(status_code=404, detail="Item not found in voucher")
 
-    _remove_batch_item(batch, batch_item, user)
+    event = _remove_batch_item(db, batch, batch_item, user)
+    record_stage_timings(db, [event])
     _sync_batch_item_count(db, batch)
+    invalidate_manifest(batch)
     db.commit()
     db.refresh(batch)
     return batch
@@ -507,10 +505,10 @@ def clear_batch_items(
         .filter(BatchItem.batch_id == batch.id)
         .all()
     )
-    for batch_item in items:
-        _remove_batch_item(batch, batch_item, user)
-
+    events = [_remove_batch_item(db, batch, batch_item, user) for batch_item in items]
+    record_stage_timings(db, events)
     _sync_batch_item_count(db, batch)
+    invalidate_manifest(batch)
     db.commit()
     db.refresh(batch)
     return batch
@@ -584,27 +582,43 @@ def delete_batch(
     )
 
 
+def _manifest_pdf_bytes(db: Session, batch: Batch) -> bytes:
+    pdf_bytes = load_stored_manifest(batch)
+    if pdf_bytes is None:
+        if batch.status in STORED_MANIFEST_STATUSES:
+            # Vouchers dispatched before manifests were stored, or whose
+            # stored copy went missing, are persisted on first download.
+            pdf_bytes = store_manifest(db, batch)
+            db.commit()
+        else:
+            pdf_bytes = render_manifest(db, batch)
+    return pdf_bytes
+
+
+def _manifest_xlsx_bytes(batch: Batch) -> bytes:
+    buf = BytesIO()
+    _build_manifest_workbook(batch).save(buf)
+    return buf.getvalue()
+
+
+def _manifest_filename(batch: Batch, extension: str) -> str:
+    return f'{batch.batch_code.lower().replace(" ", "-")}-manifest.{extension}'
+
+
 @router.get("/{batch_id}/manifest.pdf")
 def get_manifest(batch_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
-    batch = _get_batch(db, batch_id, with_items=True, with_factory=True)
-    jobs = [item.job for item in batch.items]
-    pdf_bytes = generate_manifest_pdf(batch, jobs)
+    batch = _get_batch(db, batch_id, with_factory=True)
+    pdf_bytes = _manifest_pdf_bytes(db, batch)
     return StreamingResponse(iter([pdf_bytes]), media_type="application/pdf")
 
 
 @router.get("/{batch_id}/manifest.xlsx")
 def get_manifest_xlsx(batch_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
     batch = _get_batch(db, batch_id, with_items=True, with_factory=True)
-    wb = _build_manifest_workbook(batch)
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
-    filename = f'{batch.batch_code.lower().replace(" ", "-")}-manifest.xlsx'
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    headers = {"Content-Disposition": f'attachment; filename="{_manifest_filename(batch, "xlsx")}"'}
     return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        iter([_manifest_xlsx_bytes(batch)]),
+        media_type=XLSX_MEDIA_TYPE,
         headers=headers,
     )
 
@@ -625,6 +639,7 @@ def close_batch(batch_id: str, db: Session = Depends(get_db), user=Depends(requi
             raise HTTPException(status_code=400, detail="Not all items have returned")
 
     batch.status = BatchStatus.CLOSED
+    store_manifest(db, batch)
     db.commit()
     db.refresh(batch)
     return batch
@@ -0,0 +1,154 @@
+import asyncio
+import time
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db import get_async_db, get_db
+from app.deps import require_roles
+from app.models import DocumentJob, DocumentJobStatus, Role, User
+from app.routers import batches, jobs, reports
+from app.schemas import DocumentJobOut, ExcelExportRequest, LabelSheetRequest
+from app.utils.document_jobs import FINISHED_STATUSES, DocumentHandler, DocumentResult, enqueue_document_job
+from app.utils.pdf import LABEL_SHEET_COLUMNS, LABEL_SHEET_ROWS, generate_label_sheet_pdf
+from app.utils.storage import get_storage
+from app.utils.turnaround import record_stage_timings
+
+router = APIRouter(prefix="/documents", tags=["documents"])
+
+LONG_POLL_MAX_SECONDS = 30.0
+LONG_POLL_INTERVAL_SECONDS = 0.5
+
+
+def _render_label_sheet(db: Session, params: dict) -> DocumentResult:
+    _, label_entries = jobs._label_sheet_entries(db, params["job_ids"])
+    pdf_bytes = generate_label_sheet_pdf(label_entries, start_position=params.get("start_position", 1))
+    return DocumentResult(pdf_bytes, "application/pdf", "labels.pdf")
+
+
+def _render_manifest_pdf(db: Session, params: dict) -> DocumentResult:
+    batch = batches._get_batch(db, params["batch_id"], with_factory=True)
+    pdf_bytes = batches._manifest_pdf_bytes(db, batch)
+    return DocumentResult(pdf_bytes, "application/pdf", batches._manifest_filename(batch, "pdf"))
+
+
+def _render_manifest_xlsx(db: Session, params: dict) -> DocumentResult:
+    batch = batches._get_batch(db, params["batch_id"], with_items=True, with_factory=True)
+    return DocumentResult(
+        batches._manifest_xlsx_bytes(batch),
+        batches.XLSX_MEDIA_TYPE,
+        batches._manifest_filename(batch, "xlsx"),
+    )
+
+
+def _render_export_xlsx(db: Session, params: dict) -> DocumentResult:
+    # include_archived was already restricted to admins when the job was queued.
+    return DocumentResult(
+        reports._write_export_xlsx(db, ExcelExportRequest(**params), is_admin=True),
+        reports.XLSX_MEDIA_TYPE,
+        "items-export.xlsx",
+    )
+
+
+DOCUMENT_HANDLERS: dict[str, DocumentHandler] = {
+    "label_sheet": _render_label_sheet,
+    "manifest_pdf": _render_manifest_pdf,
+    "manifest_xlsx": _render_manifest_xlsx,
+    "export_xlsx": _render_export_xlsx,
+}
+
+
+def _enqueue(db: Session, kind: str, params: dict, user: User) -> DocumentJob:
+    document = enqueue_document_job(db, kind, params, user_id=user.id)
+    db.commit()
+    db.refresh(document)
+    return document
+
+
+def _ensure_can_read(document: DocumentJob | None, user: User) -> DocumentJob:
+    if document is None:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.requested_by_user_id != user.id and Role.ADMIN not in user.roles:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+
+@router.post("/labels.pdf", response_model=DocumentJobOut, status_code=202)
+def enqueue_label_sheet(
+    payload: LabelSheetRequest,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
+):
+    job_ids = jobs._label_sheet_job_ids(payload)
+    # Validate up front and record the print now, while the requesting user is
+    # known; the worker only renders.
+    label_jobs, _ = jobs._label_sheet_entries(db, job_ids)
+    labels_per_page = LABEL_SHEET_COLUMNS * LABEL_SHEET_ROWS
+    if payload.start_position > labels_per_page:
+        raise HTTPException(status_code=400, detail=f"start_position must be between 1 and {labels_per_page}")
+    events = [event for job in label_jobs if (event := jobs._record_label_print(db, job, user))]
+    if events:
+        record_stage_timings(db, events)
+    return _enqueue(db, "label_sheet", {"job_ids": job_ids, "start_position": payload.start_position}, user)
+
+
+@router.post("/batches/{batch_id}/manifest.pdf", response_model=DocumentJobOut, status_code=202)
+def enqueue_manifest_pdf(batch_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
+    batch = batches._get_batch(db, batch_id)
+    return _enqueue(db, "manifest_pdf", {"batch_id": str(batch.id)}, user)
+
+
+@router.post("/batches/{batch_id}/manifest.xlsx", response_model=DocumentJobOut, status_code=202)
+def enqueue_manifest_xlsx(batch_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
+    batch = batches._get_batch(db, batch_id)
+    return _enqueue(db, "manifest_xlsx", {"batch_id": str(batch.id)}, user)
+
+
+@router.post("/export.xlsx", response_model=DocumentJobOut, status_code=202)
+def enqueue_export_xlsx(
+    payload: ExcelExportRequest,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.DISPATCH)),
+):
+    is_admin = Role.ADMIN in user.roles
+    # Builds (and so validates) the query without running it.
+    reports._export_query(payload, is_admin=is_admin)
+    params = payload.model_dump(mode="json")
+    params["include_archived"] = payload.include_archived and is_admin
+    return _enqueue(db, "export_xlsx", params, user)
+
+
+@router.get("/{document_id}", response_model=DocumentJobOut)
+async def get_document(
+    document_id: uuid.UUID,
+    wait: float = Query(default=0, ge=0, le=LONG_POLL_MAX_SECONDS),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles()),
+):
+    """Return the job's state, holding the request up to `wait` seconds for it to finish."""
+    deadline = time.monotonic() + wait
+    while True:
+        document = _ensure_can_read(await db.get(DocumentJob, document_id, populate_existing=True), user)
+        if document.status in FINISHED_STATUSES or time.monotonic() >= deadline:
+            return document
+        # End the read transaction so the connection goes back to the pool
+        # while this request sleeps.
+        await db.rollback()
+        await asyncio.sleep(min(LONG_POLL_INTERVAL_SECONDS, max(deadline - time.monotonic(), 0)))
+
+
+@router.get("/{document_id}/file")
+def get_document_file(document_id: uuid.UUID, db: Session = Depends(get_db), user=Depends(require_roles())):
+    document = _ensure_can_read(db.get(DocumentJob, document_id), user)
+    if document.status == DocumentJobStatus.FAILED:
+        raise HTTPException(status_code=409, detail=document.error or "Document generation failed")
+    if document.status != DocumentJobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail="Document is not ready")
+    chunks = get_storage().iter_chunks(document.result_key) if document.result_key else None
+    if chunks is None:
+        raise HTTPException(status_code=410, detail="Document is no longer available")
+    headers = {"Content-Disposition": f'attachment; filename="{document.filename}"'}
+    return StreamingResponse(chunks, media_type=document.content_type, headers=headers)
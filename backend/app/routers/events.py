@@ -0,0 +1,36 @@
+import asyncio
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.deps import require_roles
+from app.utils.live_events import EventHub, hub
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+KEEPALIVE_SECONDS = 15.0
+RETRY_MILLISECONDS = 5000
+
+
+async def _event_frames(event_hub: EventHub):
+    queue = event_hub.subscribe()
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while True:
+            try:
+                yield await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment lines keep proxies from closing an idle stream.
+                yield ": keepalive\n\n"
+    finally:
+        event_hub.unsubscribe(queue)
+
+
+@router.get("/stream")
+async def stream_events(user=Depends(require_roles())):
+    """Server-sent `status`, `batch` and `incident` deltas as they commit.
+
+    A `resync` event means deltas may have been missed; refetch and carry on.
+    """
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(_event_frames(hub), media_type="text/event-stream", headers=headers)
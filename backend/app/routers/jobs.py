@@ -3,12 +3,13 @@ from typing import Optional
 import enum
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy import desc, func
+from sqlalchemy import and_, desc, func, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
-from app.db import get_db
+from app.db import get_async_db, get_db
 from app.deps import require_roles
 from app.models import (
     Batch,
@@ -20,6 +21,8 @@ from app.models import (
     ItemJob,
     ItemSource,
     JobEditAudit,
+    JobStageTiming,
+    JobTombstone,
     RepairType,
     Role,
     Status,
@@ -31,16 +34,24 @@ from app.schemas import (
     JobBulkActionResponse,
     JobBulkDeleteRequest,
     JobBulkDeleteResponse,
+    JobBulkScanRequest,
+    JobBulkScanResponse,
+    JobBulkScanResult,
     JobCreate,
     JobDetail,
+    JobFilters,
     JobMetric,
     JobOut,
     JobScanRequest,
     JobUpdate,
     LabelSheetRequest,
+    PhotoMeta,
     StatusEventOut,
 )
-from app.utils.pdf import generate_label_pdf, generate_label_sheet_pdf
+from app.utils.cursors import decode_cursor, encode_cursor
+from app.utils.manifests import invalidate_manifest
+from app.utils.pdf import cached_label_pdf, generate_label_sheet_pdf, label_digest
+from app.utils.job_filters import apply_job_filters
 from app.utils.errors import raise_validation_error
 from app.utils.transitions import (
     STATUS_HOLDER_ROLE,
@@ -52,27 +63,38 @@ from app.utils.transitions import (
     role_can_transition,
 )
 from app.utils.roles import select_role_for_action, select_role_for_status
+from app.utils.sequences import next_job_id
+from app.utils.storage import get_storage
+from app.utils.aging import aging_state, note_aging_move
+from app.utils.turnaround import record_stage_timings
+from app.utils.thumbnails import link_existing_thumbnails
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
-
-def _generate_job_id(db: Session) -> str:
-    year = datetime.now(timezone.utc).year
-    prefix = f"DJ-{year}-"
-    last_job = (
-        db.query(ItemJob)
-        .filter(ItemJob.job_id.like(f"{prefix}%"))
-        .order_by(desc(ItemJob.job_id))
-        .first()
-    )
-    if not last_job:
-        next_number = 1
-    else:
-        try:
-            next_number = int(last_job.job_id.split("-")[-1]) + 1
-        except ValueError:
-            next_number = 1
-    return f"{prefix}{next_number:06d}"
+BULK_SCAN_MAX_ITEMS = 500
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+JOB_SORT_COLUMNS = {
+    "created_at": ItemJob.created_at,
+    "last_scan_at": ItemJob.last_scan_at,
+    "job_id": ItemJob.job_id,
+    "customer_name": ItemJob.customer_name,
+    "current_status": ItemJob.current_status,
+    "current_holder_role": ItemJob.current_holder_role,
+}
+JOB_SEARCH_COLUMNS = [
+    ItemJob.job_id,
+    ItemJob.customer_phone,
+    ItemJob.customer_name,
+    ItemJob.voucher_no,
+    ItemJob.style_number,
+]
+JOB_SORT_PARSERS = {
+    "created_at": datetime.fromisoformat,
+    "last_scan_at": datetime.fromisoformat,
+    "current_status": Status,
+    "current_holder_role": Role,
+}
 
 
 def _get_default_branch(db: Session) -> Branch:
@@ -115,6 +137,12 @@ def _ensure_job_not_archived(job: ItemJob) -> None:
         raise HTTPException(status_code=400, detail="Item is archived")
 
 
+def _photos_for_storage(photos: list[PhotoMeta] | None) -> list[dict]:
+    # Uploads hand out the original as thumb_url; switch to the rendition if
+    # the thumbnail pool has written it by the time the job is saved.
+    return link_existing_thumbnails(get_storage(), [photo.model_dump() for photo in photos or []])
+
+
 def _normalize_job_ids(job_ids: list[str]) -> list[str]:
     return list(dict.fromkeys(job_id.strip() for job_id in job_ids if job_id and job_id.strip()))
 
@@ -154,6 +182,7 @@ def _sync_batch_counts(db: Session, batch_ids: list[uuid.UUID]) -> None:
     }
     for batch in batches:
         batch.item_count = int(remaining_counts.get(batch.id, 0))
+        invalidate_manifest(batch)
 
 
 def _detach_jobs_from_created_batches(db: Session, jobs: list[ItemJob]) -> set[uuid.UUID]:
@@ -195,10 +224,12 @@ def _cancel_jobs(db: Session, jobs: list[ItemJob], user: User, *, reason: str) -
         if job.id in detached_job_ids:
             job.factory_id = None
         previous_status = job.current_status
+        before = aging_state(job)
         job.current_status = Status.CANCELLED
         job.current_holder_role = STATUS_HOLDER_ROLE[Status.CANCELLED]
         job.current_holder_user_id = user.id
         job.last_scan_at = now
+        note_aging_move(db, before, aging_state(job))
         db.add(
             StatusEvent(
                 job_id=job.id,
@@ -266,6 +297,8 @@ def _delete_jobs(db: Session, job_ids: list[str]) -> tuple[list[str], list[str]]
         )
 
     job_db_ids = [job.id for job in found_jobs]
+    for job in found_jobs:
+        note_aging_move(db, aging_state(job), None)
     affected_batch_ids = [
         batch_id
         for (batch_id,) in db.query(BatchItem.batch_id)
@@ -278,23 +311,27 @@ def _delete_jobs(db: Session, job_ids: list[str]) -> tuple[list[str], list[str]]
     db.query(JobEditAudit).filter(JobEditAudit.job_id.in_(job_db_ids)).delete(synchronize_session=False)
     db.query(Incident).filter(Incident.job_id.in_(job_db_ids)).delete(synchronize_session=False)
     db.query(BatchItem).filter(BatchItem.job_id.in_(job_db_ids)).delete(synchronize_session=False)
+    db.query(JobStageTiming).filter(JobStageTiming.job_id.in_(job_db_ids)).delete(synchronize_session=False)
     db.query(ItemJob).filter(ItemJob.id.in_(job_db_ids)).delete(synchronize_session=False)
+    db.add_all(JobTombstone(id=job.id, job_id=job.job_id) for job in found_jobs)
     db.flush()
 
     _sync_batch_counts(db, affected_batch_ids)
     return [job.job_id for job in found_jobs], missing_job_ids
 
 
-def _record_label_print(db: Session, job: ItemJob, user: User) -> bool:
+def _record_label_print(db: Session, job: ItemJob, user: User) -> Optional[StatusEvent]:
     if job.current_status != Status.PURCHASED:
-        return False
+        return None
     if Role.PACKING not in user.roles and Role.ADMIN not in user.roles:
-        return False
+        return None
     event_role = select_role_for_status(user.roles, Status.PACKED_READY)
+    before = aging_state(job)
     job.current_status = Status.PACKED_READY
     job.current_holder_role = STATUS_HOLDER_ROLE[Status.PACKED_READY]
     job.current_holder_user_id = user.id
     job.last_scan_at = datetime.now(timezone.utc)
+    note_aging_move(db, before, aging_state(job))
     event = StatusEvent(
         job_id=job.id,
         from_status=Status.PURCHASED,
@@ -305,7 +342,7 @@ def _record_label_print(db: Session, job: ItemJob, user: User) -> bool:
         remarks="Label printed",
     )
     db.add(event)
-    return True
+    return event
 
 
 def _get_previous_status_before_hold(db: Session, job: ItemJob) -> Optional[Status]:
@@ -320,6 +357,134 @@ def _get_previous_status_before_hold(db: Session, job: ItemJob) -> Optional[Stat
     return hold_event.from_status
 
 
+def _get_previous_statuses_before_hold(db: Session, job_db_ids: list[uuid.UUID]) -> dict[uuid.UUID, Optional[Status]]:
+    if not job_db_ids:
+        return {}
+    rows = (
+        db.query(StatusEvent.job_id, StatusEvent.from_status)
+        .filter(StatusEvent.job_id.in_(job_db_ids), StatusEvent.to_status == Status.ON_HOLD)
+        .distinct(StatusEvent.job_id)
+        .order_by(StatusEvent.job_id, desc(StatusEvent.timestamp))
+        .all()
+    )
+    return {job_id: from_status for job_id, from_status in rows}
+
+
+def _check_scan_transition(
+    job: ItemJob,
+    payload: JobScanRequest,
+    user: User,
+    *,
+    previous_status: Optional[Status],
+) -> tuple[bool, Role]:
+    current_status = job.current_status
+    target_status = payload.to_status
+    event_role = select_role_for_status(user.roles, target_status)
+    is_admin = Role.ADMIN in user.roles
+
+    if current_status == Status.ON_HOLD:
+        if not previous_status:
+            raise HTTPException(status_code=400, detail="Cannot resolve ON_HOLD without previous status")
+        allowed = target_status in next_logical_statuses(previous_status)
+        if not allowed:
+            raise HTTPException(status_code=400, detail="ON_HOLD can only move to the next logical step")
+        override_needed = True
+    else:
+        override_needed = requires_override(current_status, target_status)
+
+    if is_terminal(current_status) and target_status != current_status:
+        raise HTTPException(status_code=400, detail="Item is in terminal status")
+
+    if override_needed:
+        if not is_admin:
+            raise HTTPException(status_code=403, detail="Admin override required")
+        if not payload.override_reason:
+            raise HTTPException(status_code=400, detail="Override reason required")
+        event_role = Role.ADMIN
+    else:
+        if not is_allowed_transition(current_status, target_status):
+            raise HTTPException(status_code=400, detail="Invalid transition")
+        if not any(role_can_transition(role, target_status) for role in user.roles):
+            raise HTTPException(status_code=403, detail="Role cannot perform this transition")
+    return override_needed, event_role
+
+
+def _resolve_scan_batch(db: Session, payload: JobScanRequest) -> Optional[Batch]:
+    if payload.to_status != Status.DISPATCHED_TO_FACTORY or not payload.batch_id:
+        return None
+    batch = _get_batch_by_uuid(db, payload.batch_id)
+    if payload.factory_id:
+        factory = _get_factory_by_uuid(db, payload.factory_id)
+        if batch.factory_id and batch.factory_id != factory.id:
+            raise HTTPException(status_code=400, detail="Voucher factory does not match")
+        batch.factory_id = factory.id
+    return batch
+
+
+def _add_job_to_scan_batch(
+    db: Session,
+    job: ItemJob,
+    batch: Batch,
+    *,
+    in_batch: bool,
+    override_needed: bool,
+) -> None:
+    if in_batch and not override_needed:
+        raise HTTPException(status_code=400, detail="Item already in voucher")
+    if not in_batch:
+        db.add(BatchItem(batch_id=batch.id, job_id=job.id))
+        batch.item_count += 1
+        invalidate_manifest(batch)
+    if batch.factory_id:
+        job.factory_id = batch.factory_id
+
+
+def _apply_scan(
+    db: Session,
+    job: ItemJob,
+    payload: JobScanRequest,
+    user: User,
+    event_role: Role,
+    *,
+    batch: Optional[Batch] = None,
+) -> StatusEvent:
+    current_status = job.current_status
+    target_status = payload.to_status
+    now = datetime.now(timezone.utc)
+    before = aging_state(job)
+    job.current_status = target_status
+    job.current_holder_role = STATUS_HOLDER_ROLE[target_status]
+    job.current_holder_user_id = user.id
+    job.last_scan_at = now
+    note_aging_move(db, before, aging_state(job))
+    remarks = payload.remarks
+    if target_status == Status.DISPATCHED_TO_FACTORY and batch:
+        remarks = remarks or f"Voucher dispatch {batch.batch_code}"
+
+    event = StatusEvent(
+        job_id=job.id,
+        from_status=current_status,
+        to_status=target_status,
+        scanned_by_user_id=user.id,
+        scanned_by_role=event_role,
+        timestamp=now,
+        location=payload.location,
+        device_id=payload.device_id,
+        remarks=remarks,
+        incident_flag=payload.incident_flag,
+        override_reason=payload.override_reason,
+    )
+    db.add(event)
+    return event
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
 def _get_batch_by_uuid(db: Session, batch_id: uuid.UUID) -> Batch:
     batch = db.query(Batch).filter(Batch.id == batch_id).first()
     if not batch:
@@ -340,6 +505,29 @@ def _get_factory_by_uuid(db: Session, factory_id: uuid.UUID) -> Factory:
     return factory
 
 
+def _job_cursor_filter(cursor: str, sort_key: str, descending: bool):
+    try:
+        payload = decode_cursor(cursor)
+        last_id = uuid.UUID(str(payload["id"]))
+        raw_value = payload["value"]
+        value = None if raw_value is None else JOB_SORT_PARSERS.get(sort_key, str)(raw_value)
+    except (KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+    if payload.get("sort") != sort_key or payload.get("dir") != ("desc" if descending else "asc"):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+
+    # Postgres sorts NULLs last ascending and first descending, so a NULL
+    # cursor value sits at the tail (asc) or head (desc) of the ordering.
+    column = JOB_SORT_COLUMNS[sort_key]
+    if descending:
+        if value is None:
+            return or_(and_(column.is_(None), ItemJob.id < last_id), column.isnot(None))
+        return tuple_(column, ItemJob.id) < tuple_(value, last_id)
+    if value is None:
+        return and_(column.is_(None), ItemJob.id > last_id)
+    return or_(tuple_(column, ItemJob.id) > tuple_(value, last_id), column.is_(None))
+
+
 @router.post("", response_model=JobOut)
 def create_job(payload: JobCreate, user=Depends(require_roles(Role.PURCHASE, Role.ADMIN)), db: Session = Depends(get_db)):
     event_role = select_role_for_action(user.roles, preferred=[Role.PURCHASE])
@@ -362,7 +550,7 @@ def create_job(payload: JobCreate, user=Depends(require_roles(Role.PURCHASE, Rol
     if errors:
         raise_validation_error(errors)
     job = ItemJob(
-        job_id=_generate_job_id(db),
+        job_id=next_job_id(db),
         branch_id=branch.id,
         customer_name=payload.customer_name,
         customer_phone=payload.customer_phone,
@@ -378,7 +566,7 @@ def create_job(payload: JobCreate, user=Depends(require_roles(Role.PURCHASE, Rol
         diamond_cent=payload.diamond_cent,
         style_number=payload.style_number,
         card_weight=payload.card_weight,
-        photos=[photo.model_dump() for photo in payload.photos] if payload.photos else [],
+        photos=_photos_for_storage(payload.photos),
         current_status=Status.PURCHASED,
         current_holder_role=Role.PURCHASE,
         current_holder_user_id=user.id,
@@ -387,6 +575,7 @@ def create_job(payload: JobCreate, user=Depends(require_roles(Role.PURCHASE, Rol
     )
     db.add(job)
     db.flush()
+    note_aging_move(db, None, aging_state(job))
 
     event = StatusEvent(
         job_id=job.id,
@@ -398,13 +587,15 @@ def create_job(payload: JobCreate, user=Depends(require_roles(Role.PURCHASE, Rol
         remarks="Job created",
     )
     db.add(event)
+    record_stage_timings(db, [event])
     db.commit()
     db.refresh(job)
     return job
 
 
 @router.get("", response_model=list[JobOut])
-def list_jobs(
+async def list_jobs(
+    response: Response,
     status: Optional[Status] = Query(default=None),
     attention: Optional[str] = Query(default=None),
     from_date: Optional[datetime] = Query(default=None),
@@ -418,89 +609,87 @@ def list_jobs(
     include_archived: bool = Query(default=False),
     limit: int = Query(default=50, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(default=None),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
 ):
-    query = db.query(ItemJob).options(selectinload(ItemJob.factory))
-    if not include_archived or Role.ADMIN not in user.roles:
-        query = query.filter(ItemJob.is_archived.is_(False))
-    if status:
-        query = query.filter(ItemJob.current_status == status)
-    if attention:
-        now = datetime.now(timezone.utc)
-        if attention == "overdue_returns":
-            query = query.filter(
-                ItemJob.target_return_date.isnot(None),
-                ItemJob.target_return_date < now,
-                ItemJob.current_status.in_(
-                    [
-                        Status.PURCHASED,
-                        Status.PACKED_READY,
-                        Status.DISPATCHED_TO_FACTORY,
-                        Status.RECEIVED_AT_FACTORY,
-                        Status.RETURNED_FROM_FACTORY,
-                        Status.ON_HOLD,
-                    ]
-                ),
-            )
-        elif attention == "aged_over_7":
-            query = query.filter(
-                func.coalesce(ItemJob.last_scan_at, ItemJob.created_at) < now - timedelta(days=7),
-                ItemJob.current_status.notin_([Status.DELIVERED_TO_CUSTOMER, Status.CANCELLED]),
-            )
-        elif attention == "at_factory":
-            query = query.filter(
-                ItemJob.current_status.in_([Status.DISPATCHED_TO_FACTORY, Status.RECEIVED_AT_FACTORY])
-            )
-        elif attention == "awaiting_closure":
-            query = query.filter(
-                ItemJob.current_status.in_(
-                    [
-                        Status.RETURNED_FROM_FACTORY,
-                        Status.RECEIVED_AT_SHOP,
-                        Status.ADDED_TO_STOCK,
-                        Status.HANDED_TO_DELIVERY,
-                    ]
-                )
-            )
-        else:
-            raise HTTPException(status_code=400, detail="Invalid attention filter")
-    if from_date:
-        query = query.filter(ItemJob.created_at >= from_date)
-    if to_date:
-        query = query.filter(ItemJob.created_at <= to_date)
-    if phone:
-        query = query.filter(ItemJob.customer_phone.ilike(f"%{phone}%"))
-    if job_id:
-        query = query.filter(ItemJob.job_id.ilike(f"%{job_id}%"))
-    if factory_id:
-        try:
-            factory_uuid = uuid.UUID(factory_id)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Invalid factory id") from exc
-        query = query.filter(ItemJob.factory_id == factory_uuid)
-    if batch_id:
-        try:
-            batch_uuid = uuid.UUID(batch_id)
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail="Invalid voucher id") from exc
-        query = query.join(BatchItem).filter(BatchItem.batch_id == batch_uuid)
-
-    sort_map = {
-        "created_at": ItemJob.created_at,
-        "last_scan_at": ItemJob.last_scan_at,
-        "job_id": ItemJob.job_id,
-        "customer_name": ItemJob.customer_name,
-        "current_status": ItemJob.current_status,
-        "current_holder_role": ItemJob.current_holder_role,
-    }
-    sort_column = sort_map.get(sort_by or "created_at", ItemJob.created_at)
-    if (sort_dir or "desc").lower() == "asc":
-        query = query.order_by(sort_column.asc())
+    filters = JobFilters(
+        status=status,
+        attention=attention,
+        from_date=from_date,
+        to_date=to_date,
+        batch_id=batch_id,
+        factory_id=factory_id,
+        phone=phone,
+        job_id=job_id,
+        include_archived=include_archived,
+    )
+    query = apply_job_filters(
+        select(ItemJob).options(selectinload(ItemJob.factory)),
+        filters,
+        is_admin=Role.ADMIN in user.roles,
+    )
+
+    sort_key = sort_by if sort_by in JOB_SORT_COLUMNS else "created_at"
+    sort_column = JOB_SORT_COLUMNS[sort_key]
+    descending = (sort_dir or "desc").lower() != "asc"
+    if cursor:
+        query = query.filter(_job_cursor_filter(cursor, sort_key, descending))
+    if descending:
+        query = query.order_by(sort_column.desc(), ItemJob.id.desc())
     else:
-        query = query.order_by(sort_column.desc())
+        query = query.order_by(sort_column.asc(), ItemJob.id.asc())
+
+    if not cursor:
+        query = query.offset(offset)
+    jobs = (await db.execute(query.limit(limit))).scalars().all()
+    if len(jobs) == limit:
+        last_job = jobs[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(
+            {
+                "sort": sort_key,
+                "dir": "desc" if descending else "asc",
+                "value": getattr(last_job, sort_key),
+                "id": str(last_job.id),
+            }
+        )
+    return jobs
+
 
-    return query.offset(offset).limit(limit).all()
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _job_search_query(q: str, *, include_archived: bool, limit: int):
+    # Each column has a pg_trgm GIN index, so the ILIKEs become a bitmap OR of
+    # index scans instead of a sequential scan.
+    pattern = f"%{_escape_like(q)}%"
+    rank = func.greatest(*[func.similarity(column, q) for column in JOB_SEARCH_COLUMNS])
+    query = (
+        select(ItemJob)
+        .options(selectinload(ItemJob.factory))
+        .filter(or_(*[column.ilike(pattern, escape="\\") for column in JOB_SEARCH_COLUMNS]))
+    )
+    if not include_archived:
+        query = query.filter(ItemJob.is_archived.is_(False))
+    return query.order_by(rank.desc(), ItemJob.created_at.desc(), ItemJob.id.desc()).limit(limit)
+
+
+@router.get("/search", response_model=list[JobOut])
+async def search_jobs(
+    q: str = Query(..., min_length=2, max_length=80),
+    include_archived: bool = Query(default=False),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
+):
+    """Match job ID, phone, customer name, voucher and style number, best match first."""
+    query = _job_search_query(
+        q.strip(),
+        include_archived=include_archived and Role.ADMIN in user.roles,
+        limit=limit,
+    )
+    return (await db.execute(query)).scalars().all()
 
 
 @router.get("/metrics", response_model=list[JobMetric])
@@ -635,14 +824,110 @@ def bulk_delete_jobs(
     )
 
 
+@router.post("/scan/bulk", response_model=JobBulkScanResponse)
+def bulk_scan_jobs(
+    payload: JobBulkScanRequest,
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY, Role.PURCHASE)),
+):
+    unique_job_ids, found_jobs, _missing_job_ids = _get_jobs_for_codes(db, payload.job_ids)
+    if not unique_job_ids:
+        raise HTTPException(status_code=400, detail="Job ids are required")
+    if len(unique_job_ids) > BULK_SCAN_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_SCAN_MAX_ITEMS} items can be scanned at once")
+
+    jobs_by_code = {job.job_id: job for job in found_jobs}
+    previous_by_job = _get_previous_statuses_before_hold(
+        db,
+        [job.id for job in found_jobs if job.current_status == Status.ON_HOLD],
+    )
+    batch = _resolve_scan_batch(db, payload)
+    batched_job_ids: set[uuid.UUID] = set()
+    if batch and found_jobs:
+        batched_job_ids = {
+            batch_job_id
+            for (batch_job_id,) in db.query(BatchItem.job_id)
+            .filter(BatchItem.batch_id == batch.id, BatchItem.job_id.in_([job.id for job in found_jobs]))
+            .all()
+        }
+
+    outcomes: list[tuple[str, StatusEvent | None, str | None]] = []
+    for code in unique_job_ids:
+        job = jobs_by_code.get(code)
+        if not job:
+            outcomes.append((code, None, "Job not found"))
+            continue
+        try:
+            _ensure_job_not_archived(job)
+            override_needed, event_role = _check_scan_transition(
+                job,
+                payload,
+                user,
+                previous_status=previous_by_job.get(job.id),
+            )
+            if payload.to_status == Status.DISPATCHED_TO_FACTORY and not override_needed:
+                if not batch:
+                    raise HTTPException(status_code=400, detail="Voucher id required for dispatch")
+                if not batch.factory_id:
+                    raise HTTPException(status_code=400, detail="Factory id required for dispatch")
+            if batch:
+                _add_job_to_scan_batch(
+                    db,
+                    job,
+                    batch,
+                    in_batch=job.id in batched_job_ids,
+                    override_needed=override_needed,
+                )
+                batched_job_ids.add(job.id)
+        except HTTPException as exc:
+            outcomes.append((code, None, str(exc.detail)))
+            continue
+        outcomes.append((code, _apply_scan(db, job, payload, user, event_role, batch=batch), None))
+
+    try:
+        record_stage_timings(db, [event for _code, event, _detail in outcomes if event is not None])
+        db.flush()
+        results = [
+            JobBulkScanResult(
+                job_id=code,
+                ok=event is not None,
+                detail=detail,
+                event=StatusEventOut.model_validate(event).model_copy(update={"job_code": code}) if event else None,
+            )
+            for code, event, detail in outcomes
+        ]
+        if any(result.ok for result in results):
+            db.commit()
+        else:
+            db.rollback()
+    except Exception:
+        db.rollback()
+        raise
+
+    updated_count = sum(1 for result in results if result.ok)
+    return JobBulkScanResponse(
+        results=results,
+        updated_count=updated_count,
+        failed_count=len(results) - updated_count,
+    )
+
+
 @router.get("/{job_id}", response_model=JobDetail)
-def get_job(job_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY))):
-    job = _get_job_by_code(db, job_id, with_factory=True)
-    events = db.query(StatusEvent).filter(StatusEvent.job_id == job.id).order_by(StatusEvent.timestamp).all()
+async def get_job(job_id: str, db: AsyncSession = Depends(get_async_db), user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY))):
+    job = await db.scalar(
+        select(ItemJob).options(selectinload(ItemJob.factory)).where(ItemJob.job_id == job_id)
+    )
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    events = (
+        await db.scalars(
+            select(StatusEvent).where(StatusEvent.job_id == job.id).order_by(StatusEvent.timestamp)
+        )
+    ).all()
     user_ids = {event.scanned_by_user_id for event in events}
     if job.current_holder_user_id:
         user_ids.add(job.current_holder_user_id)
-    users = db.query(User).filter(User.id.in_(user_ids)).all() if user_ids else []
+    users = (await db.scalars(select(User).where(User.id.in_(user_ids)))).all() if user_ids else []
     user_map = {user.id: user.username for user in users}
     status_events = [
         StatusEventOut.model_validate(event).model_copy(
@@ -703,7 +988,7 @@ def update_job(job_id: str, payload: JobUpdate, user=Depends(require_roles(Role.
         if value is not None:
             old_value = getattr(job, field)
             if field == "photos":
-                value = [photo.model_dump() for photo in value]
+                value = _photos_for_storage(value)
             if field == "voucher_no":
                 value = value.strip()
                 if not value:
@@ -730,125 +1015,81 @@ def update_job(job_id: str, payload: JobUpdate, user=Depends(require_roles(Role.
 
 
 @router.post("/{job_id}/scan", response_model=StatusEventOut)
-def scan_job(job_id: str, payload: JobScanRequest, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY, Role.PURCHASE))):
+async def scan_job(job_id: str, payload: JobScanRequest, db: AsyncSession = Depends(get_async_db), user=Depends(require_roles(Role.ADMIN, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY, Role.PURCHASE))):
+    # The transition checks and event writes are shared with the sync bulk scan,
+    # so they run on the async session's underlying sync session.
+    return await db.run_sync(_scan_job, job_id, payload, user)
+
+
+def _scan_job(db: Session, job_id: str, payload: JobScanRequest, user: User) -> StatusEvent:
     job = _get_job_by_code(db, job_id)
     _ensure_job_not_archived(job)
-    current_status = job.current_status
-    target_status = payload.to_status
-    batch = None
-    event_role = select_role_for_status(user.roles, target_status)
-    is_admin = Role.ADMIN in user.roles
-
-    if current_status == Status.ON_HOLD:
+    previous_status = None
+    if job.current_status == Status.ON_HOLD:
         previous_status = _get_previous_status_before_hold(db, job)
-        if not previous_status:
-            raise HTTPException(status_code=400, detail="Cannot resolve ON_HOLD without previous status")
-        allowed = target_status in next_logical_statuses(previous_status)
-        if not allowed:
-            raise HTTPException(status_code=400, detail="ON_HOLD can only move to the next logical step")
-        override_needed = True
-    else:
-        override_needed = requires_override(current_status, target_status)
-
-    if is_terminal(current_status) and target_status != current_status:
-        raise HTTPException(status_code=400, detail="Item is in terminal status")
-
-    if override_needed:
-        if not is_admin:
-            raise HTTPException(status_code=403, detail="Admin override required")
-        if not payload.override_reason:
-            raise HTTPException(status_code=400, detail="Override reason required")
-        event_role = Role.ADMIN
-    else:
-        if not is_allowed_transition(current_status, target_status):
-            raise HTTPException(status_code=400, detail="Invalid transition")
-        if not any(role_can_transition(role, target_status) for role in user.roles):
-            raise HTTPException(status_code=403, detail="Role cannot perform this transition")
+    override_needed, event_role = _check_scan_transition(
+        job,
+        payload,
+        user,
+        previous_status=previous_status,
+    )
 
-    if target_status == Status.DISPATCHED_TO_FACTORY and not override_needed:
-        if not payload.batch_id:
-            raise HTTPException(status_code=400, detail="Voucher id required for dispatch")
-        batch = _get_batch_by_uuid(db, payload.batch_id)
-        if payload.factory_id:
-            factory = _get_factory_by_uuid(db, payload.factory_id)
-            if batch.factory_id and batch.factory_id != factory.id:
-                raise HTTPException(status_code=400, detail="Voucher factory does not match")
-            batch.factory_id = factory.id
-        elif not batch.factory_id:
+    if payload.to_status == Status.DISPATCHED_TO_FACTORY and not override_needed and not payload.batch_id:
+        raise HTTPException(status_code=400, detail="Voucher id required for dispatch")
+    batch = _resolve_scan_batch(db, payload)
+    if batch:
+        if not override_needed and not batch.factory_id:
             raise HTTPException(status_code=400, detail="Factory id required for dispatch")
         existing_item = (
             db.query(BatchItem)
             .filter(BatchItem.batch_id == batch.id, BatchItem.job_id == job.id)
             .first()
         )
-        if existing_item:
-            raise HTTPException(status_code=400, detail="Item already in voucher")
-        db.add(BatchItem(batch_id=batch.id, job_id=job.id))
-        batch.item_count += 1
-        job.factory_id = batch.factory_id
-    elif target_status == Status.DISPATCHED_TO_FACTORY and payload.batch_id:
-        batch = _get_batch_by_uuid(db, payload.batch_id)
-        if payload.factory_id:
-            factory = _get_factory_by_uuid(db, payload.factory_id)
-            if batch.factory_id and batch.factory_id != factory.id:
-                raise HTTPException(status_code=400, detail="Voucher factory does not match")
-            batch.factory_id = factory.id
-        existing_item = (
-            db.query(BatchItem)
-            .filter(BatchItem.batch_id == batch.id, BatchItem.job_id == job.id)
-            .first()
-        )
-        if not existing_item:
-            db.add(BatchItem(batch_id=batch.id, job_id=job.id))
-            batch.item_count += 1
-        if batch.factory_id:
-            job.factory_id = batch.factory_id
-
-    job.current_status = target_status
-    job.current_holder_role = STATUS_HOLDER_ROLE[target_status]
-    job.current_holder_user_id = user.id
-    job.last_scan_at = datetime.now(timezone.utc)
-    remarks = payload.remarks
-    if target_status == Status.DISPATCHED_TO_FACTORY and batch:
-        remarks = remarks or f"Voucher dispatch {batch.batch_code}"
+        _add_job_to_scan_batch(db, job, batch, in_batch=existing_item is not None, override_needed=override_needed)
 
-    event = StatusEvent(
-        job_id=job.id,
-        from_status=current_status,
-        to_status=target_status,
-        scanned_by_user_id=user.id,
-        scanned_by_role=event_role,
-        timestamp=datetime.now(timezone.utc),
-        location=payload.location,
-        device_id=payload.device_id,
-        remarks=remarks,
-        incident_flag=payload.incident_flag,
-        override_reason=payload.override_reason,
-    )
-    db.add(event)
+    event = _apply_scan(db, job, payload, user, event_role, batch=batch)
+    record_stage_timings(db, [event])
     db.commit()
     db.refresh(event)
     return event
 
 
 @router.get("/{job_id}/label.pdf")
-def get_label(job_id: str, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY))):
+def get_label(
+    job_id: str,
+    if_none_match: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
+):
     job = _get_job_by_code(db, job_id)
     _ensure_job_not_archived(job)
     branch = db.query(Branch).filter(Branch.id == job.branch_id).first()
+    branch_name = branch.name if branch else "Main Branch"
     factory_name = _resolve_factory_name(db, job)
-    pdf_bytes = generate_label_pdf(job, branch.name if branch else "Main Branch", factory_name=factory_name)
-    if _record_label_print(db, job, user):
+    digest = label_digest(job, branch_name, factory_name)
+    etag = f'"{digest}"'
+    # Printing moves a purchased job to packed whether or not the client
+    # already holds this label.
+    event = _record_label_print(db, job, user)
+    if event:
+        record_stage_timings(db, [event])
         db.commit()
-    return StreamingResponse(iter([pdf_bytes]), media_type="application/pdf")
 
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    pdf_bytes = cached_label_pdf(get_storage(), job, branch_name, factory_name, digest=digest)
+    return Response(content=pdf_bytes, media_type="application/pdf", headers=headers)
 
-@router.post("/labels.pdf")
-def get_label_sheet(payload: LabelSheetRequest, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY))):
+
+def _label_sheet_job_ids(payload: LabelSheetRequest) -> list[str]:
     job_ids = [job_id.strip() for job_id in payload.job_ids if job_id and job_id.strip()]
     if not job_ids:
         raise HTTPException(status_code=400, detail="Job ids are required")
+    return job_ids
 
+
+def _label_sheet_entries(db: Session, job_ids: list[str]) -> tuple[list[ItemJob], list[tuple[ItemJob, str, Optional[str]]]]:
     unique_job_ids = list(dict.fromkeys(job_ids))
     jobs = (
         db.query(ItemJob)
@@ -896,14 +1137,20 @@ def get_label_sheet(payload: LabelSheetRequest, db: Session = Depends(get_db), u
             factory_name = _resolve_factory_name(db, job)
         label_entries.append((job, branch_name, factory_name))
 
+    return jobs, label_entries
+
+
+@router.post("/labels.pdf")
+def get_label_sheet(payload: LabelSheetRequest, db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY))):
+    jobs, label_entries = _label_sheet_entries(db, _label_sheet_job_ids(payload))
+
     try:
         pdf_bytes = generate_label_sheet_pdf(label_entries, start_position=payload.start_position)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
-    updated = False
-    for job in jobs:
-        updated = _record_label_print(db, job, user) or updated
-    if updated:
+    events = [event for job in jobs if (event := _record_label_print(db, job, user))]
+    if events:
+        record_stage_timings(db, events)
         db.commit()
 
     return StreamingResponse(iter([pdf_bytes]), media_type="application/pdf")
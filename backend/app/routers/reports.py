@@ -1,16 +1,37 @@
 import csv
+import enum
+import uuid
+import zlib
 from datetime import datetime, timedelta, timezone
-from io import BytesIO, StringIO
-from typing import List
+from io import StringIO
+from tempfile import SpooledTemporaryFile
+from typing import Callable, List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
 from fastapi.responses import StreamingResponse
-from sqlalchemy import case, func
+from sqlalchemy import Boolean, DateTime, Float, Integer, Select, and_, case, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, selectinload
 
-from app.db import get_db
+from app.config import get_settings
+from app.db import get_async_db, get_db
 from app.deps import require_roles
-from app.models import Batch, BatchStatus, Factory, Incident, IncidentStatus, ItemJob, Role, Status, StatusEvent, User
+from app.models import (
+    Batch,
+    BatchStatus,
+    Factory,
+    Incident,
+    IncidentStatus,
+    ItemJob,
+    JobAgingBucket,
+    JobStageTiming,
+    ReportSnapshot,
+    Role,
+    Status,
+    StatusEvent,
+    User,
+)
 from app.schemas import (
     AgingBucket,
     BatchDelay,
@@ -23,26 +44,62 @@ from app.schemas import (
     TurnaroundMetrics,
     UserActivity,
 )
+from app.utils.aging import AGING_BUCKETS
+from app.utils.change_xid import CHANGE_XID_HORIZON
+from app.utils.job_filters import apply_job_filters
+from app.utils.turnaround import LATEST_STAGE_AT, TURNAROUND_STAGES, stage_column
 
 router = APIRouter(prefix="/reports", tags=["reports"])
+settings = get_settings()
+
+OPS_SUMMARY_SNAPSHOT = "ops_summary"
+SNAPSHOT_LOCK_NAMESPACE = 7201
+EXPORT_YIELD_ROWS = 1000
+CSV_CHUNK_BYTES = 64 * 1024
+
 
+def _stream_csv_rows(db: Session, header: list[str], query: Select):
+    """Yield CSV text in ~CSV_CHUNK_BYTES pieces rather than one piece per row.
 
-def _stream_csv_rows(header: list[str], rows, row_builder):
+    The session is closed as soon as the last row is read so the connection is
+    not held while the tail of the response drains.
+    """
     output = StringIO()
     writer = csv.writer(output)
     writer.writerow(header)
-    yield output.getvalue()
-    output.seek(0)
-    output.truncate(0)
-    for row in rows:
-        writer.writerow(row_builder(row))
+    try:
+        for row in db.execute(query.execution_options(yield_per=EXPORT_YIELD_ROWS)):
+            writer.writerow(row)
+            if output.tell() >= CSV_CHUNK_BYTES:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    finally:
+        db.close()
+    if output.tell():
         yield output.getvalue()
-        output.seek(0)
-        output.truncate(0)
 
 
-def _count(query) -> int:
-    return int(query.scalar() or 0)
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk.encode("utf-8"))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    for part in (accept_encoding or "").lower().split(","):
+        coding, _, params = part.partition(";")
+        if coding.strip() != "gzip":
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            return not params.strip() or float(quality) > 0
+        except ValueError:
+            return True
+    return False
 
 
 def _delta_metric(total: int, today: int, yesterday: int) -> OpsDeltaMetric:
@@ -50,104 +107,75 @@ def _delta_metric(total: int, today: int, yesterday: int) -> OpsDeltaMetric:
 
 
 @router.get("/pending-aging", response_model=List[AgingBucket])
-def pending_aging(db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.QC_STOCK))):
-    base_time = func.coalesce(ItemJob.last_scan_at, ItemJob.created_at)
-    age_days = func.date_part("day", func.now() - base_time)
-    bucket_0_2 = func.sum(case((age_days <= 2, 1), else_=0)).label("bucket_0_2")
-    bucket_3_7 = func.sum(case((age_days.between(3, 7), 1), else_=0)).label("bucket_3_7")
-    bucket_8_15 = func.sum(case((age_days.between(8, 15), 1), else_=0)).label("bucket_8_15")
-    bucket_16_30 = func.sum(case((age_days.between(16, 30), 1), else_=0)).label("bucket_16_30")
-    bucket_30_plus = func.sum(case((age_days > 30, 1), else_=0)).label("bucket_30_plus")
+async def pending_aging(db: AsyncSession = Depends(get_async_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.QC_STOCK))):
+    # Read-only: the recount that catches jobs ageing into older buckets runs
+    # from scripts/refresh_aging_buckets.py, since it blocks status changes.
+    rows = (await db.execute(select(JobAgingBucket.status, JobAgingBucket.bucket, JobAgingBucket.job_count))).all()
+    counts = {(row.status, row.bucket): row.job_count for row in rows}
+    return [
+        AgingBucket(status=status, **{bucket: counts.get((status, bucket), 0) for bucket, _max_days in AGING_BUCKETS})
+        for status in Status
+    ]
 
-    rows = (
-        db.query(ItemJob.current_status.label("status"), bucket_0_2, bucket_3_7, bucket_8_15, bucket_16_30, bucket_30_plus)
-        .group_by(ItemJob.current_status)
-        .all()
-    )
-    row_map = {row.status: row for row in rows}
-    buckets = []
-    for status in Status:
-        row = row_map.get(status)
-        buckets.append(
-            AgingBucket(
-                status=status,
-                bucket_0_2=int(getattr(row, "bucket_0_2", 0) or 0),
-                bucket_3_7=int(getattr(row, "bucket_3_7", 0) or 0),
-                bucket_8_15=int(getattr(row, "bucket_8_15", 0) or 0),
-                bucket_16_30=int(getattr(row, "bucket_16_30", 0) or 0),
-                bucket_30_plus=int(getattr(row, "bucket_30_plus", 0) or 0),
-            )
+
+def _turnaround_statement(cutoff: datetime) -> Select:
+    # Like the old status_events scan, a stage only counts when both ends fall
+    # inside the window, and it ends at the earliest in-window end status.
+    aggregates = []
+    for _label, start_status, end_statuses in TURNAROUND_STAGES:
+        start = getattr(JobStageTiming, stage_column(start_status))
+        end_columns = [getattr(JobStageTiming, stage_column(status)) for status in end_statuses]
+        if len(end_columns) == 1:
+            end = end_columns[0]
+        else:
+            end = func.least(*[case((column >= cutoff, column)) for column in end_columns])
+        days = case(
+            (and_(start >= cutoff, end >= cutoff), func.floor(func.extract("epoch", end - start) / 86400)),
         )
-    return buckets
+        aggregates.extend(
+            [
+                func.avg(days),
+                func.percentile_cont(0.5).within_group(days),
+                func.percentile_cont(0.9).within_group(days),
+            ]
+        )
+    return select(*aggregates).select_from(JobStageTiming).where(LATEST_STAGE_AT >= cutoff)
 
 
 @router.get("/turnaround", response_model=List[TurnaroundMetrics])
-def turnaround(
+async def turnaround(
     window_days: int = Query(default=365, ge=1, le=3650),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(require_roles(Role.ADMIN)),
 ):
-    stages = [
-        ("Purchase->Packed", Status.PURCHASED, Status.PACKED_READY),
-        ("Packed->Dispatch", Status.PACKED_READY, Status.DISPATCHED_TO_FACTORY),
-        ("Dispatch->FactoryReceive", Status.DISPATCHED_TO_FACTORY, Status.RECEIVED_AT_FACTORY),
-        ("FactoryReceive->Return", Status.RECEIVED_AT_FACTORY, Status.RETURNED_FROM_FACTORY),
-        ("Return->ShopReceive", Status.RETURNED_FROM_FACTORY, Status.RECEIVED_AT_SHOP),
-        ("ShopReceive->Stock/Delivery", Status.RECEIVED_AT_SHOP, None),
-        ("Delivery->Delivered", Status.HANDED_TO_DELIVERY, Status.DELIVERED_TO_CUSTOMER),
-    ]
     cutoff = datetime.now(timezone.utc) - timedelta(days=window_days)
-    event_rows = (
-        db.query(
-            StatusEvent.job_id,
-            StatusEvent.to_status,
-            func.min(StatusEvent.timestamp).label("timestamp"),
-        )
-        .filter(StatusEvent.timestamp >= cutoff)
-        .group_by(StatusEvent.job_id, StatusEvent.to_status)
-        .all()
-    )
-    events_by_job: dict = {}
-    for row in event_rows:
-        events_by_job.setdefault(row.job_id, {})[row.to_status] = row.timestamp
-
-    durations_by_stage = {label: [] for label, _, _ in stages}
-    for statuses in events_by_job.values():
-        for label, from_status, to_status in stages:
-            start = statuses.get(from_status)
-            if not start:
-                continue
-            if to_status:
-                end = statuses.get(to_status)
-                if not end:
-                    continue
-                durations_by_stage[label].append((end - start).days)
-            else:
-                candidates = [Status.ADDED_TO_STOCK, Status.HANDED_TO_DELIVERY]
-                timestamps = [statuses.get(candidate) for candidate in candidates if statuses.get(candidate)]
-                if not timestamps:
-                    continue
-                durations_by_stage[label].append((min(timestamps) - start).days)
+    row = (await db.execute(_turnaround_statement(cutoff))).one()
 
     results: List[TurnaroundMetrics] = []
-    for label, _, _ in stages:
-        durations = durations_by_stage[label]
-        average = sum(durations) / len(durations) if durations else 0
-        results.append(TurnaroundMetrics(stage=label, average_days=round(average, 2)))
+    for index, (label, _start_status, _end_statuses) in enumerate(TURNAROUND_STAGES):
+        average, p50, p90 = row[index * 3 : index * 3 + 3]
+        results.append(
+            TurnaroundMetrics(
+                stage=label,
+                average_days=round(float(average or 0), 2),
+                p50_days=round(float(p50 or 0), 2),
+                p90_days=round(float(p90 or 0), 2),
+            )
+        )
     return results
 
 
 @router.get("/batch-delays", response_model=List[BatchDelay])
-def batch_delays(db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
+async def batch_delays(db: AsyncSession = Depends(get_async_db), user=Depends(require_roles(Role.ADMIN, Role.DISPATCH))):
     now = datetime.now(timezone.utc)
     batches = (
-        db.query(Batch)
-        .filter(
-            Batch.is_archived.is_(False),
-            Batch.status.in_([BatchStatus.DISPATCHED, BatchStatus.RECEIVED_AT_FACTORY]),
+        await db.scalars(
+            select(Batch).where(
+                Batch.is_archived.is_(False),
+                Batch.status.in_([BatchStatus.DISPATCHED, BatchStatus.RECEIVED_AT_FACTORY]),
+            )
         )
-        .all()
-    )
+    ).all()
     delays = []
     for batch in batches:
         delay_days = 0
@@ -165,12 +193,41 @@ def batch_delays(db: Session = Depends(get_db), user=Depends(require_roles(Role.
     return delays
 
 
-@router.get("/ops-summary", response_model=OpsSummary)
-def ops_summary(
-    db: Session = Depends(get_db),
-    user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.QC_STOCK)),
-):
+def _load_snapshot(db: Session, name: str, max_age_seconds: int, build: Callable[[], dict]) -> tuple[dict, datetime]:
     now = datetime.now(timezone.utc)
+    if max_age_seconds <= 0:
+        return build(), now
+
+    snapshot = db.get(ReportSnapshot, name)
+    if snapshot and snapshot.computed_at >= now - timedelta(seconds=max_age_seconds):
+        return snapshot.payload, snapshot.computed_at
+
+    # Only the worker holding the lock recomputes; the rest keep serving the
+    # stale copy until it lands instead of piling the same queries on Postgres.
+    locked = db.execute(
+        select(func.pg_try_advisory_xact_lock(SNAPSHOT_LOCK_NAMESPACE, func.hashtext(name)))
+    ).scalar()
+    if not locked:
+        if snapshot:
+            return snapshot.payload, snapshot.computed_at
+        return build(), now
+
+    payload = build()
+    stmt = (
+        insert(ReportSnapshot)
+        .values(name=name, payload=payload, computed_at=now)
+        .on_conflict_do_update(
+            index_elements=[ReportSnapshot.name],
+            set_={"payload": payload, "computed_at": now},
+        )
+    )
+    db.execute(stmt)
+    db.commit()
+    return payload, now
+
+
+def _ops_summary_statements(now: datetime) -> tuple[Select, Select, Select]:
+    """The incident, job and voucher count queries behind the ops summary."""
     start_today = now.replace(hour=0, minute=0, second=0, microsecond=0)
     start_yesterday = start_today - timedelta(days=1)
     end_today = start_today + timedelta(days=1)
@@ -205,177 +262,147 @@ def ops_summary(
     active_delayed_batch_statuses = [BatchStatus.DISPATCHED, BatchStatus.RECEIVED_AT_FACTORY]
     base_time = func.coalesce(ItemJob.last_scan_at, ItemJob.created_at)
 
-    open_incidents_total = _count(
-        db.query(func.count(Incident.id)).filter(Incident.status == IncidentStatus.OPEN)
-    )
-    open_incidents_today = _count(
-        db.query(func.count(Incident.id)).filter(
-            Incident.status == IncidentStatus.OPEN,
-            Incident.created_at >= start_today,
-            Incident.created_at < end_today,
-        )
-    )
-    open_incidents_yesterday = _count(
-        db.query(func.count(Incident.id)).filter(
-            Incident.status == IncidentStatus.OPEN,
-            Incident.created_at >= start_yesterday,
-            Incident.created_at < end_yesterday,
-        )
-    )
-
-    overdue_total = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.target_return_date.isnot(None),
-            ItemJob.target_return_date < now,
-            ItemJob.current_status.in_(not_returned_statuses),
-        )
-    )
-    overdue_today = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.target_return_date >= start_today,
-            ItemJob.target_return_date < end_today,
-            ItemJob.current_status.in_(not_returned_statuses),
-        )
-    )
-    overdue_yesterday = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.target_return_date >= start_yesterday,
-            ItemJob.target_return_date < end_yesterday,
-            ItemJob.current_status.in_(not_returned_statuses),
+    incidents = (
+        select(
+            func.count(Incident.id).label("total"),
+            func.count(Incident.id)
+            .filter(Incident.created_at >= start_today, Incident.created_at < end_today)
+            .label("today"),
+            func.count(Incident.id)
+            .filter(Incident.created_at >= start_yesterday, Incident.created_at < end_yesterday)
+            .label("yesterday"),
         )
+        .where(Incident.status == IncidentStatus.OPEN)
     )
 
-    aged_over_7_total = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.current_status.in_(active_statuses),
-            base_time < now - timedelta(days=7),
-        )
-    )
-    aged_over_7_today = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.current_status.in_(active_statuses),
-            base_time >= start_today - timedelta(days=7),
-            base_time < end_today - timedelta(days=7),
-        )
-    )
-    aged_over_7_yesterday = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.current_status.in_(active_statuses),
-            base_time >= start_yesterday - timedelta(days=7),
-            base_time < end_yesterday - timedelta(days=7),
-        )
-    )
-    aged_over_15 = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.current_status.in_(active_statuses),
-            base_time < now - timedelta(days=15),
+    not_returned = ItemJob.current_status.in_(not_returned_statuses)
+    active = ItemJob.current_status.in_(active_statuses)
+    awaiting = ItemJob.current_status.in_(awaiting_closure_statuses)
+    jobs = (
+        select(
+            func.count(ItemJob.id)
+            .filter(not_returned, ItemJob.target_return_date.isnot(None), ItemJob.target_return_date < now)
+            .label("overdue_total"),
+            func.count(ItemJob.id)
+            .filter(not_returned, ItemJob.target_return_date >= start_today, ItemJob.target_return_date < end_today)
+            .label("overdue_today"),
+            func.count(ItemJob.id)
+            .filter(
+                not_returned,
+                ItemJob.target_return_date >= start_yesterday,
+                ItemJob.target_return_date < end_yesterday,
+            )
+            .label("overdue_yesterday"),
+            func.count(ItemJob.id)
+            .filter(active, base_time < now - timedelta(days=7))
+            .label("aged_over_7_total"),
+            func.count(ItemJob.id)
+            .filter(
+                active,
+                base_time >= start_today - timedelta(days=7),
+                base_time < end_today - timedelta(days=7),
+            )
+            .label("aged_over_7_today"),
+            func.count(ItemJob.id)
+            .filter(
+                active,
+                base_time >= start_yesterday - timedelta(days=7),
+                base_time < end_yesterday - timedelta(days=7),
+            )
+            .label("aged_over_7_yesterday"),
+            func.count(ItemJob.id)
+            .filter(active, base_time < now - timedelta(days=15))
+            .label("aged_over_15"),
+            func.count(ItemJob.id)
+            .filter(ItemJob.current_status.in_(at_factory_statuses))
+            .label("at_factory"),
+            func.count(ItemJob.id)
+            .filter(ItemJob.current_status == Status.RECEIVED_AT_FACTORY)
+            .label("received_at_factory"),
+            func.count(ItemJob.id).filter(awaiting).label("awaiting_closure"),
+            func.count(ItemJob.id)
+            .filter(awaiting, ItemJob.target_return_date.isnot(None), ItemJob.target_return_date < now)
+            .label("awaiting_closure_overdue"),
         )
+        # Every bucket is a subset of the active statuses; saying so lets
+        # delivered and cancelled history be skipped via the status index.
+        .where(ItemJob.is_archived.is_(False), active)
     )
 
-    delayed_total = _count(
-        db.query(func.count(Batch.id))
-        .select_from(Batch)
-        .filter(
-            Batch.is_archived.is_(False),
-            Batch.status.in_(active_delayed_batch_statuses),
-            Batch.dispatch_date.isnot(None),
-            Batch.expected_return_date.isnot(None),
-            Batch.expected_return_date < now,
-        )
-    )
-    delayed_today = _count(
-        db.query(func.count(Batch.id))
-        .select_from(Batch)
-        .filter(
-            Batch.is_archived.is_(False),
-            Batch.status.in_(active_delayed_batch_statuses),
-            Batch.dispatch_date.isnot(None),
-            Batch.expected_return_date >= start_today,
-            Batch.expected_return_date < end_today,
+    batches = (
+        select(
+            func.count(Batch.id)
+            .filter(Batch.expected_return_date.isnot(None), Batch.expected_return_date < now)
+            .label("total"),
+            func.count(Batch.id)
+            .filter(Batch.expected_return_date >= start_today, Batch.expected_return_date < end_today)
+            .label("today"),
+            func.count(Batch.id)
+            .filter(Batch.expected_return_date >= start_yesterday, Batch.expected_return_date < end_yesterday)
+            .label("yesterday"),
         )
-    )
-    delayed_yesterday = _count(
-        db.query(func.count(Batch.id))
-        .select_from(Batch)
-        .filter(
+        .where(
             Batch.is_archived.is_(False),
             Batch.status.in_(active_delayed_batch_statuses),
             Batch.dispatch_date.isnot(None),
-            Batch.expected_return_date >= start_yesterday,
-            Batch.expected_return_date < end_yesterday,
         )
     )
+    return incidents, jobs, batches
 
-    at_factory = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(ItemJob.is_archived.is_(False), ItemJob.current_status.in_(at_factory_statuses))
-    )
-    received_at_factory = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(ItemJob.is_archived.is_(False), ItemJob.current_status == Status.RECEIVED_AT_FACTORY)
-    )
-    awaiting_closure = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(ItemJob.is_archived.is_(False), ItemJob.current_status.in_(awaiting_closure_statuses))
-    )
-    awaiting_closure_overdue = _count(
-        db.query(func.count(ItemJob.id))
-        .select_from(ItemJob)
-        .filter(
-            ItemJob.is_archived.is_(False),
-            ItemJob.current_status.in_(awaiting_closure_statuses),
-            ItemJob.target_return_date.isnot(None),
-            ItemJob.target_return_date < now,
-        )
-    )
 
+def _compute_ops_summary(db: Session) -> OpsSummary:
+    now = datetime.now(timezone.utc)
+    incidents_stmt, jobs_stmt, batches_stmt = _ops_summary_statements(now)
+    incidents = db.execute(incidents_stmt).one()
+    jobs = db.execute(jobs_stmt).one()
+    batches = db.execute(batches_stmt).one()
+
+    open_incidents_total = int(incidents.total or 0)
+    overdue_total = int(jobs.overdue_total or 0)
+    delayed_total = int(batches.total or 0)
     return OpsSummary(
         attention_count=open_incidents_total + overdue_total + delayed_total,
-        open_incidents=_delta_metric(open_incidents_total, open_incidents_today, open_incidents_yesterday),
-        overdue_returns=_delta_metric(overdue_total, overdue_today, overdue_yesterday),
-        aged_over_7=_delta_metric(aged_over_7_total, aged_over_7_today, aged_over_7_yesterday),
-        delayed_vouchers=_delta_metric(delayed_total, delayed_today, delayed_yesterday),
-        aged_over_15=aged_over_15,
-        at_factory=at_factory,
-        received_at_factory=received_at_factory,
-        awaiting_closure=awaiting_closure,
-        awaiting_closure_overdue=awaiting_closure_overdue,
+        open_incidents=_delta_metric(open_incidents_total, int(incidents.today or 0), int(incidents.yesterday or 0)),
+        overdue_returns=_delta_metric(overdue_total, int(jobs.overdue_today or 0), int(jobs.overdue_yesterday or 0)),
+        aged_over_7=_delta_metric(
+            int(jobs.aged_over_7_total or 0),
+            int(jobs.aged_over_7_today or 0),
+            int(jobs.aged_over_7_yesterday or 0),
+        ),
+        delayed_vouchers=_delta_metric(delayed_total, int(batches.today or 0), int(batches.yesterday or 0)),
+        aged_over_15=int(jobs.aged_over_15 or 0),
+        at_factory=int(jobs.at_factory or 0),
+        received_at_factory=int(jobs.received_at_factory or 0),
+        awaiting_closure=int(jobs.awaiting_closure or 0),
+        awaiting_closure_overdue=int(jobs.awaiting_closure_overdue or 0),
+    )
+
+
+@router.get("/ops-summary", response_model=OpsSummary)
+async def ops_summary(
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.QC_STOCK)),
+):
+    payload, computed_at = await db.run_sync(
+        lambda session: _load_snapshot(
+            session,
+            OPS_SUMMARY_SNAPSHOT,
+            settings.ops_summary_cache_seconds,
+            lambda: _compute_ops_summary(session).model_dump(mode="json", exclude={"computed_at"}),
+        )
     )
+    return OpsSummary(**payload, computed_at=computed_at)
 
 
 @router.get("/repair-targets", response_model=RepairTrackingReport)
-def repair_targets(
+async def repair_targets(
     window_days: int = Query(default=3, ge=1, le=30),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.QC_STOCK)),
 ):
     now = datetime.now(timezone.utc)
     window_end = now + timedelta(days=window_days)
-    base_query = db.query(ItemJob).filter(
+    base_query = select(ItemJob).options(selectinload(ItemJob.factory)).where(
         ItemJob.is_archived.is_(False),
         ItemJob.target_return_date.isnot(None),
         ItemJob.current_status != Status.CANCELLED,
@@ -390,24 +417,26 @@ def repair_targets(
         Status.ON_HOLD,
     ]
     overdue = (
-        base_query.filter(
-            ItemJob.target_return_date < now,
-            ItemJob.current_status.in_(not_returned_statuses),
+        await db.scalars(
+            base_query.where(
+                ItemJob.target_return_date < now,
+                ItemJob.current_status.in_(not_returned_statuses),
+            )
+            .order_by(ItemJob.target_return_date)
+            .limit(200)
         )
-        .order_by(ItemJob.target_return_date)
-        .limit(200)
-        .all()
-    )
+    ).all()
     approaching = (
-        base_query.filter(
-            ItemJob.target_return_date >= now,
-            ItemJob.target_return_date <= window_end,
-            ItemJob.current_status.in_(not_returned_statuses),
+        await db.scalars(
+            base_query.where(
+                ItemJob.target_return_date >= now,
+                ItemJob.target_return_date <= window_end,
+                ItemJob.current_status.in_(not_returned_statuses),
+            )
+            .order_by(ItemJob.target_return_date)
+            .limit(200)
         )
-        .order_by(ItemJob.target_return_date)
-        .limit(200)
-        .all()
-    )
+    ).all()
 
     uncollected_statuses = [
         Status.RECEIVED_AT_SHOP,
@@ -415,14 +444,15 @@ def repair_targets(
         Status.HANDED_TO_DELIVERY,
     ]
     uncollected = (
-        base_query.filter(
-            ItemJob.target_return_date < now,
-            ItemJob.current_status.in_(uncollected_statuses),
+        await db.scalars(
+            base_query.where(
+                ItemJob.target_return_date < now,
+                ItemJob.current_status.in_(uncollected_statuses),
+            )
+            .order_by(ItemJob.target_return_date)
+            .limit(200)
         )
-        .order_by(ItemJob.target_return_date)
-        .limit(200)
-        .all()
-    )
+    ).all()
 
     return RepairTrackingReport(
         overdue=[JobOut.model_validate(job) for job in overdue],
@@ -432,80 +462,118 @@ def repair_targets(
 
 
 @router.get("/user-activity", response_model=List[UserActivity])
-def user_activity(db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN))):
+async def user_activity(db: AsyncSession = Depends(get_async_db), user=Depends(require_roles(Role.ADMIN))):
     rows = (
-        db.query(StatusEvent.scanned_by_user_id, User.username, func.count(StatusEvent.id))
-        .join(User, User.id == StatusEvent.scanned_by_user_id)
-        .group_by(StatusEvent.scanned_by_user_id, User.username)
-        .all()
-    )
+        await db.execute(
+            select(StatusEvent.scanned_by_user_id, User.username, func.count(StatusEvent.id))
+            .join(User, User.id == StatusEvent.scanned_by_user_id)
+            .group_by(StatusEvent.scanned_by_user_id, User.username)
+        )
+    ).all()
     return [UserActivity(user_id=row[0], username=row[1], scans=row[2]) for row in rows]
 
 
+EXPORT_FIELDS = [
+    ("Job ID", ItemJob.job_id),
+    ("Voucher No", ItemJob.voucher_no),
+    ("Customer Name", ItemJob.customer_name),
+    ("Phone", ItemJob.customer_phone),
+    ("Item Description", ItemJob.item_description),
+    ("Style Number", ItemJob.style_number),
+    ("Card Weight", ItemJob.card_weight),
+    ("Physical Weight", ItemJob.approximate_weight),
+    ("Diamond Cent", ItemJob.diamond_cent),
+    ("Purchase Value", ItemJob.purchase_value),
+    ("Factory", Factory.name),
+    ("Status", ItemJob.current_status),
+    ("Work Narration", ItemJob.work_narration),
+    ("Item Source", ItemJob.item_source),
+    ("Repair Type", ItemJob.repair_type),
+    ("Target Return Date", ItemJob.target_return_date),
+    ("Created At", ItemJob.created_at),
+]
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Finished workbooks up to this size stay in memory; larger ones spill to disk.
+EXPORT_SPOOL_BYTES = 8 * 1024 * 1024
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _export_query(payload: ExcelExportRequest, *, is_admin: bool) -> Select:
+    query = (
+        select(*[column for _, column in EXPORT_FIELDS])
+        .select_from(ItemJob)
+        .outerjoin(Factory, ItemJob.factory_id == Factory.id)
+    )
+    if payload.job_ids is not None:
+        if not payload.job_ids:
+            raise HTTPException(status_code=400, detail="job_ids is required")
+        query = query.filter(ItemJob.job_id.in_(payload.job_ids))
+    else:
+        query = apply_job_filters(query, payload, is_admin=is_admin)
+    return query.order_by(ItemJob.created_at.desc(), ItemJob.id.desc())
+
+
+def _export_cell(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _write_export_xlsx(db: Session, payload: ExcelExportRequest, *, is_admin: bool) -> SpooledTemporaryFile:
+    """Write the export workbook row by row into a spooled temporary file.
+
+    Rows come off a server-side cursor and write-only worksheets flush them as
+    they go, so memory stays flat however many jobs match.
+    """
+    from openpyxl import Workbook
+
+    query = _export_query(payload, is_admin=is_admin)
+    if payload.job_ids is not None and not db.execute(select(query.exists())).scalar():
+        raise HTTPException(status_code=404, detail="No matching jobs found")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Items")
+    ws.append([header for header, _ in EXPORT_FIELDS])
+    output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    try:
+        try:
+            for row in db.execute(query.execution_options(yield_per=EXPORT_YIELD_ROWS)):
+                ws.append([_export_cell(value) for value in row])
+        finally:
+            # Saving is what releases the write-only sheet's temporary file;
+            # after a failure the partial workbook goes away with output.
+            wb.save(output)
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
+
+def _iter_file(fileobj, chunk_size: int = EXPORT_CHUNK_BYTES):
+    try:
+        while chunk := fileobj.read(chunk_size):
+            yield chunk
+    finally:
+        fileobj.close()
+
+
 @router.post("/export.xlsx")
 def export_xlsx(
     payload: ExcelExportRequest,
     db: Session = Depends(get_db),
     user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.DISPATCH)),
 ):
-    from openpyxl import Workbook
-
-    if not payload.job_ids:
-        raise HTTPException(status_code=400, detail="job_ids is required")
-    jobs = (
-        db.query(ItemJob)
-        .options(selectinload(ItemJob.factory))
-        .filter(ItemJob.job_id.in_(payload.job_ids))
-        .all()
-    )
-    if not jobs:
-        raise HTTPException(status_code=404, detail="No matching jobs found")
-
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Items"
-    columns = [
-        "Job ID", "Voucher No", "Customer Name", "Phone", "Item Description",
-        "Style Number", "Card Weight", "Physical Weight", "Diamond Cent",
-        "Purchase Value", "Factory", "Status", "Work Narration", "Item Source",
-        "Repair Type", "Target Return Date", "Created At",
-    ]
-    ws.append(columns)
-    for job in jobs:
-        ws.append([
-            job.job_id,
-            job.voucher_no,
-            job.customer_name,
-            job.customer_phone,
-            job.item_description,
-            job.style_number,
-            job.card_weight,
-            job.approximate_weight,
-            job.diamond_cent,
-            job.purchase_value,
-            job.factory.name if job.factory else None,
-            job.current_status.value if job.current_status else None,
-            job.work_narration,
-            job.item_source.value if job.item_source else None,
-            job.repair_type.value if job.repair_type else None,
-            job.target_return_date.isoformat() if job.target_return_date else None,
-            job.created_at.isoformat() if job.created_at else None,
-        ])
-
-    buf = BytesIO()
-    wb.save(buf)
-    buf.seek(0)
+    output = _write_export_xlsx(db, payload, is_admin=Role.ADMIN in user.roles)
     headers = {"Content-Disposition": 'attachment; filename="items-export.xlsx"'}
-    return StreamingResponse(
-        buf,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers=headers,
-    )
+    return StreamingResponse(_iter_file(output), media_type=XLSX_MEDIA_TYPE, headers=headers)
 
 
 @router.get("/factory-summary", response_model=List[FactorySummary])
-def factory_summary(
-    db: Session = Depends(get_db),
+async def factory_summary(
+    db: AsyncSession = Depends(get_async_db),
     user=Depends(require_roles(Role.ADMIN, Role.DISPATCH, Role.FACTORY)),
 ):
     at_factory_statuses = [Status.DISPATCHED_TO_FACTORY, Status.RECEIVED_AT_FACTORY]
@@ -522,19 +590,20 @@ def factory_summary(
     ]
 
     rows = (
-        db.query(
-            Factory.id.label("factory_id"),
-            Factory.name.label("factory_name"),
-            func.sum(case((ItemJob.current_status.in_(at_factory_statuses), 1), else_=0)).label("at_factory"),
-            func.sum(case((ItemJob.current_status.in_(expected_statuses), 1), else_=0)).label("expected_from_factory"),
-            func.sum(case((ItemJob.current_status.in_(returned_statuses), 1), else_=0)).label("returned_pending"),
-            func.sum(case((ItemJob.current_status.in_(dispatched_statuses), 1), else_=0)).label("total_dispatched"),
+        await db.execute(
+            select(
+                Factory.id.label("factory_id"),
+                Factory.name.label("factory_name"),
+                func.sum(case((ItemJob.current_status.in_(at_factory_statuses), 1), else_=0)).label("at_factory"),
+                func.sum(case((ItemJob.current_status.in_(expected_statuses), 1), else_=0)).label("expected_from_factory"),
+                func.sum(case((ItemJob.current_status.in_(returned_statuses), 1), else_=0)).label("returned_pending"),
+                func.sum(case((ItemJob.current_status.in_(dispatched_statuses), 1), else_=0)).label("total_dispatched"),
+            )
+            .join(ItemJob, ItemJob.factory_id == Factory.id)
+            .where(ItemJob.is_archived.is_(False))
+            .group_by(Factory.id, Factory.name)
         )
-        .join(ItemJob, ItemJob.factory_id == Factory.id)
-        .filter(ItemJob.is_archived.is_(False))
-        .group_by(Factory.id, Factory.name)
-        .all()
-    )
+    ).all()
 
     return [
         FactorySummary(
@@ -549,56 +618,249 @@ def factory_summary(
     ]
 
 
+CSV_EXPORT_COLUMNS = {
+    "jobs": [
+        ("job_id", ItemJob.job_id),
+        ("status", ItemJob.current_status),
+        ("holder_role", ItemJob.current_holder_role),
+        ("created_at", ItemJob.created_at),
+        ("phone", ItemJob.customer_phone),
+        ("repair_type", ItemJob.repair_type),
+        ("target_return_date", ItemJob.target_return_date),
+        ("factory", Factory.name),
+        ("work_narration", ItemJob.work_narration),
+        ("item_source", ItemJob.item_source),
+    ],
+    "incidents": [
+        ("id", Incident.id),
+        ("type", Incident.type),
+        ("status", Incident.status),
+        ("created_at", Incident.created_at),
+        ("description", Incident.description),
+    ],
+    "batches": [
+        ("batch_code", Batch.batch_code),
+        ("status", Batch.status),
+        ("dispatch_date", Batch.dispatch_date),
+        ("expected_return_date", Batch.expected_return_date),
+        ("item_count", Batch.item_count),
+    ],
+}
+CSV_EXPORT_COLUMNS["vouchers"] = CSV_EXPORT_COLUMNS["batches"]
+
+
+def _csv_export_query(export_type: str) -> Select:
+    columns = CSV_EXPORT_COLUMNS.get(export_type)
+    if columns is None:
+        raise HTTPException(status_code=400, detail="Unsupported export type")
+    query = select(*[column for _, column in columns])
+    if export_type == "jobs":
+        query = query.select_from(ItemJob).outerjoin(Factory, ItemJob.factory_id == Factory.id)
+    return query
+
+
 @router.get("/export.csv")
-def export_csv(type: str = Query(...), db: Session = Depends(get_db), user=Depends(require_roles(Role.ADMIN))):
+def export_csv(
+    type: str = Query(...),
+    accept_encoding: Optional[str] = Header(default=None),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN)),
+):
     export_type = type.lower()
+    query = _csv_export_query(export_type)
     filename = "vouchers.csv" if export_type == "vouchers" else f"{export_type}.csv"
-    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
-
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    header = [name for name, _ in CSV_EXPORT_COLUMNS[export_type]]
+    chunks = _stream_csv_rows(db, header, query)
+    if _accepts_gzip(accept_encoding):
+        headers["Content-Encoding"] = "gzip"
+        return StreamingResponse(_gzip_chunks(chunks), media_type="text/csv", headers=headers)
+    return StreamingResponse(chunks, media_type="text/csv", headers=headers)
+
+
+PARQUET_EXPORT_COLUMNS = {
+    "jobs": [
+        ("id", ItemJob.id),
+        ("job_id", ItemJob.job_id),
+        ("branch_id", ItemJob.branch_id),
+        ("voucher_no", ItemJob.voucher_no),
+        ("customer_name", ItemJob.customer_name),
+        ("customer_phone", ItemJob.customer_phone),
+        ("item_description", ItemJob.item_description),
+        ("style_number", ItemJob.style_number),
+        ("card_weight", ItemJob.card_weight),
+        ("approximate_weight", ItemJob.approximate_weight),
+        ("diamond_cent", ItemJob.diamond_cent),
+        ("purchase_value", ItemJob.purchase_value),
+        ("factory_id", ItemJob.factory_id),
+        ("factory", Factory.name),
+        ("current_status", ItemJob.current_status),
+        ("current_holder_role", ItemJob.current_holder_role),
+        ("item_source", ItemJob.item_source),
+        ("repair_type", ItemJob.repair_type),
+        ("work_narration", ItemJob.work_narration),
+        ("target_return_date", ItemJob.target_return_date),
+        ("last_scan_at", ItemJob.last_scan_at),
+        ("is_archived", ItemJob.is_archived),
+        ("created_at", ItemJob.created_at),
+        ("updated_at", ItemJob.updated_at),
+    ],
+    "events": [
+        ("id", StatusEvent.id),
+        ("job_uuid", StatusEvent.job_id),
+        ("job_id", ItemJob.job_id),
+        ("from_status", StatusEvent.from_status),
+        ("to_status", StatusEvent.to_status),
+        ("scanned_by_user_id", StatusEvent.scanned_by_user_id),
+        ("scanned_by_role", StatusEvent.scanned_by_role),
+        ("timestamp", StatusEvent.timestamp),
+        ("location", StatusEvent.location),
+        ("device_id", StatusEvent.device_id),
+        ("remarks", StatusEvent.remarks),
+        ("incident_flag", StatusEvent.incident_flag),
+        ("override_reason", StatusEvent.override_reason),
+    ],
+    "incidents": [
+        ("id", Incident.id),
+        ("job_id", Incident.job_id),
+        ("batch_id", Incident.batch_id),
+        ("type", Incident.type),
+        ("status", Incident.status),
+        ("description", Incident.description),
+        ("reported_by", Incident.reported_by),
+        ("resolution_notes", Incident.resolution_notes),
+        ("created_at", Incident.created_at),
+        ("resolved_at", Incident.resolved_at),
+        ("updated_at", Incident.updated_at),
+    ],
+    "batches": [
+        ("id", Batch.id),
+        ("batch_code", Batch.batch_code),
+        ("status", Batch.status),
+        ("factory_id", Batch.factory_id),
+        ("factory", Factory.name),
+        ("dispatch_date", Batch.dispatch_date),
+        ("expected_return_date", Batch.expected_return_date),
+        ("item_count", Batch.item_count),
+        ("is_archived", Batch.is_archived),
+        ("created_at", Batch.created_at),
+        ("updated_at", Batch.updated_at),
+    ],
+}
+PARQUET_EXPORT_COLUMNS["vouchers"] = PARQUET_EXPORT_COLUMNS["batches"]
+# (created column for date ranges, commit-ordered change column for incremental pulls).
+PARQUET_EXPORT_WINDOWS = {
+    "jobs": (ItemJob.created_at, ItemJob.change_xid),
+    "events": (StatusEvent.timestamp, StatusEvent.change_xid),
+    "incidents": (Incident.created_at, Incident.change_xid),
+    "batches": (Batch.created_at, Batch.change_xid),
+    "vouchers": (Batch.created_at, Batch.change_xid),
+}
+PARQUET_ROW_GROUP_ROWS = 10000
+WATERMARK_HEADER = "X-Export-Watermark"
+
+
+def _parquet_export_query(
+    export_type: str,
+    *,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    since: Optional[int] = None,
+    horizon: Optional[int] = None,
+) -> Select:
+    """Rows in the date range that changed in transactions in [since, horizon).
+
+    The horizon is the xmin of a snapshot, so everything below it is final;
+    the next pull starts from it.
+    """
+    columns = PARQUET_EXPORT_COLUMNS.get(export_type)
+    if columns is None:
+        raise HTTPException(status_code=400, detail="Unsupported export type")
+    created_column, change_column = PARQUET_EXPORT_WINDOWS[export_type]
+    query = select(*[column for _, column in columns])
     if export_type == "jobs":
-        rows = db.query(ItemJob).execution_options(stream_results=True).yield_per(1000)
-        generator = _stream_csv_rows(
-            [
-                "job_id",
-                "status",
-                "holder_role",
-                "created_at",
-                "phone",
-                "repair_type",
-                "target_return_date",
-                "factory",
-                "work_narration",
-                "item_source",
-            ],
-            rows,
-            lambda job: [
-                job.job_id,
-                job.current_status,
-                job.current_holder_role,
-                job.created_at,
-                job.customer_phone,
-                job.repair_type,
-                job.target_return_date,
-                job.factory_name,
-                job.work_narration,
-                job.item_source,
-            ],
-        )
-    elif export_type == "incidents":
-        rows = db.query(Incident).execution_options(stream_results=True).yield_per(1000)
-        generator = _stream_csv_rows(
-            ["id", "type", "status", "created_at", "description"],
-            rows,
-            lambda inc: [inc.id, inc.type, inc.status, inc.created_at, inc.description],
-        )
+        query = query.select_from(ItemJob).outerjoin(Factory, ItemJob.factory_id == Factory.id)
+    elif export_type == "events":
+        query = query.select_from(StatusEvent).join(ItemJob, StatusEvent.job_id == ItemJob.id)
     elif export_type in {"batches", "vouchers"}:
-        rows = db.query(Batch).execution_options(stream_results=True).yield_per(1000)
-        generator = _stream_csv_rows(
-            ["batch_code", "status", "dispatch_date", "expected_return_date", "item_count"],
-            rows,
-            lambda batch: [batch.batch_code, batch.status, batch.dispatch_date, batch.expected_return_date, batch.item_count],
-        )
-    else:
-        raise HTTPException(status_code=400, detail="Unsupported export type")
+        query = query.select_from(Batch).outerjoin(Factory, Batch.factory_id == Factory.id)
+    if from_date:
+        query = query.where(created_column >= from_date)
+    if to_date:
+        query = query.where(created_column <= to_date)
+    if since is not None:
+        query = query.where(change_column >= since)
+    if horizon is not None:
+        query = query.where(change_column < horizon)
+    primary_key = columns[0][1]
+    return query.order_by(change_column, primary_key)
+
+
+def _arrow_type(pa, column):
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us", tz="UTC")
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    # Strings, enums and UUIDs.
+    return pa.string()
+
+
+def _arrow_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _write_export_parquet(db: Session, export_type: str, query: Select) -> SpooledTemporaryFile:
+    """Write the export as Parquet, one row group per fetched partition."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow") from exc
+
+    columns = PARQUET_EXPORT_COLUMNS[export_type]
+    schema = pa.schema([(name, _arrow_type(pa, column)) for name, column in columns])
+
+    output = SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    try:
+        with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+            result = db.execute(query.execution_options(yield_per=PARQUET_ROW_GROUP_ROWS))
+            for partition in result.partitions():
+                values = list(zip(*partition))
+                arrays = [
+                    pa.array([_arrow_value(value) for value in column_values], type=field.type)
+                    for column_values, field in zip(values, schema)
+                ]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+    except BaseException:
+        output.close()
+        raise
+    output.seek(0)
+    return output
+
 
-    return StreamingResponse(generator, media_type="text/csv", headers=headers)
+@router.get("/export.parquet")
+def export_parquet(
+    type: str = Query(...),
+    from_date: Optional[datetime] = Query(default=None),
+    to_date: Optional[datetime] = Query(default=None),
+    since: Optional[int] = Query(default=None, ge=0, description="X-Export-Watermark of the previous pull"),
+    db: Session = Depends(get_db),
+    user=Depends(require_roles(Role.ADMIN)),
+):
+    export_type = type.lower()
+    horizon = db.execute(CHANGE_XID_HORIZON).scalar_one()
+    query = _parquet_export_query(export_type, from_date=from_date, to_date=to_date, since=since, horizon=horizon)
+    output = _write_export_parquet(db, export_type, query)
+    headers = {
+        "Content-Disposition": f'attachment; filename="{export_type}.parquet"',
+        WATERMARK_HEADER: str(horizon),
+    }
+    return StreamingResponse(_iter_file(output), media_type="application/vnd.apache.parquet", headers=headers)
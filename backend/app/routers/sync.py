@@ -0,0 +1,105 @@
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.db import get_async_db
+from app.deps import require_roles
+from app.models import ItemJob, JobTombstone, Role
+from app.schemas import JobSyncOut
+from app.utils.change_xid import CHANGE_XID_HORIZON
+from app.utils.cursors import decode_cursor, encode_cursor
+
+router = APIRouter(prefix="/sync", tags=["sync"])
+
+Position = Optional[tuple[int, uuid.UUID]]
+
+
+def _decode_watermark(token: str) -> tuple[Position, Position]:
+    try:
+        payload = decode_cursor(token)
+        positions = []
+        for stream in ("jobs", "deleted"):
+            xid, entry_id = payload.get(f"{stream}_xid"), payload.get(f"{stream}_id")
+            positions.append(None if xid is None else (int(xid), uuid.UUID(str(entry_id))))
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(status_code=400, detail="Invalid watermark") from exc
+    return positions[0], positions[1]
+
+
+def _encode_watermark(jobs: Position, deleted: Position) -> str:
+    payload = {}
+    for stream, position in (("jobs", jobs), ("deleted", deleted)):
+        if position is not None:
+            payload[f"{stream}_xid"], payload[f"{stream}_id"] = position[0], str(position[1])
+    return encode_cursor(payload)
+
+
+def _feed_query(query: Select, xid_column, id_column, position: Position, horizon: int, limit: int) -> Select:
+    # Rows below the horizon are final, so the watermark never passes a write
+    # that has yet to commit; see app.utils.change_xid.
+    query = query.where(xid_column < horizon)
+    if position is not None:
+        query = query.where(tuple_(xid_column, id_column) > tuple_(*position))
+    return query.order_by(xid_column, id_column).limit(limit)
+
+
+@router.get("/jobs", response_model=JobSyncOut)
+async def sync_jobs(
+    since: Optional[str] = Query(default=None, description="Watermark from the previous response; omit for a full sync"),
+    limit: int = Query(default=500, ge=1, le=1000),
+    db: AsyncSession = Depends(get_async_db),
+    user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
+):
+    """Jobs changed since `since`, in commit-safe (change_xid, id) order.
+
+    Keep calling with the returned watermark while `has_more` is set. Archived
+    and hard-deleted jobs come back in `removed`.
+    """
+    jobs_position, deleted_position = _decode_watermark(since) if since else (None, None)
+    horizon = (await db.execute(CHANGE_XID_HORIZON)).scalar_one()
+    jobs = (
+        await db.execute(
+            _feed_query(
+                select(ItemJob).options(selectinload(ItemJob.factory)),
+                ItemJob.change_xid,
+                ItemJob.id,
+                jobs_position,
+                horizon,
+                limit,
+            )
+        )
+    ).scalars().all()
+    tombstones = (
+        await db.execute(
+            _feed_query(select(JobTombstone), JobTombstone.change_xid, JobTombstone.id, deleted_position, horizon, limit)
+        )
+    ).scalars().all()
+
+    # Merge both feeds into one page; each keeps its own position in the watermark.
+    entries = sorted(
+        [(job.change_xid, job.id, job) for job in jobs]
+        + [(tombstone.change_xid, tombstone.id, tombstone) for tombstone in tombstones],
+        key=lambda entry: entry[:2],
+    )
+    changed, removed = [], []
+    for xid, entry_id, entry in entries[:limit]:
+        if isinstance(entry, JobTombstone):
+            deleted_position = (xid, entry_id)
+            removed.append(entry.job_id)
+            continue
+        jobs_position = (xid, entry_id)
+        if entry.is_archived:
+            removed.append(entry.job_id)
+        else:
+            changed.append(entry)
+
+    return JobSyncOut(
+        changed=changed,
+        removed=removed,
+        watermark=_encode_watermark(jobs_position, deleted_position),
+        has_more=len(entries) > limit or len(jobs) == limit or len(tombstones) == limit,
+    )
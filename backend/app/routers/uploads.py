@@ -1,13 +1,44 @@
-from fastapi import APIRouter, Depends, File, UploadFile, Request
+import os
 
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Request
+
+from app.config import get_settings
 from app.deps import require_roles
 from app.models import Role
 from app.schemas import UploadResponse
-from app.utils.storage import StorageClient
+from app.utils.images import IMAGE_CONTENT_TYPES, detect_image_type
+from app.utils.storage import UPLOAD_CHUNK_SIZE, get_storage
+from app.utils.thumbnails import schedule_thumbnails
 
 router = APIRouter(prefix="/uploads", tags=["uploads"])
 
-storage = StorageClient()
+settings = get_settings()
+storage = get_storage()
+
+# Multipart framing (boundaries, part headers) on top of the file itself.
+UPLOAD_FORM_OVERHEAD = 64 * 1024
+
+
+def exceeds_upload_limit(content_length: str | None) -> bool:
+    if not content_length or not content_length.isdigit():
+        return False
+    return int(content_length) > settings.upload_max_bytes + UPLOAD_FORM_OVERHEAD
+
+
+def _validate_image_upload(file: UploadFile) -> str:
+    head = file.file.read(UPLOAD_CHUNK_SIZE)
+    if not head:
+        raise HTTPException(status_code=400, detail="File is empty")
+    ext = detect_image_type(head)
+    declared = (file.content_type or "").lower()
+    if not ext or (declared not in {"", "application/octet-stream"} and not declared.startswith("image/")):
+        raise HTTPException(status_code=415, detail="Unsupported image type")
+
+    file.file.seek(0, os.SEEK_END)
+    if file.file.tell() > settings.upload_max_bytes:
+        raise HTTPException(status_code=413, detail="File too large")
+    file.file.seek(0)
+    return ext
 
 
 @router.post("/image", response_model=UploadResponse)
@@ -16,8 +47,11 @@ def upload_image(
     file: UploadFile = File(...),
     user=Depends(require_roles(Role.ADMIN, Role.PURCHASE, Role.PACKING, Role.DISPATCH, Role.FACTORY, Role.QC_STOCK, Role.DELIVERY)),
 ):
-    content = file.file.read()
-    key, url, thumb_url = storage.upload_file(file.filename, content)
+    ext = _validate_image_upload(file)
+    key, url, thumb_url = storage.upload_fileobj(file.file, ext=ext, content_type=IMAGE_CONTENT_TYPES[ext])
+    # thumb_url stays on the original until the rendition exists; saving the
+    # photo on a job, or the thumbnail backfill, switches it over.
+    schedule_thumbnails(storage, key)
     if url.startswith("/"):
         base_url = str(request.base_url).rstrip("/")
         url = f"{base_url}{url}"
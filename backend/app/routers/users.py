@@ -4,7 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.db import get_db
-from app.deps import require_roles
+from app.deps import require_roles, user_cache
 from app.models import Role, User
 from app.schemas import UserCreate, UserOut, UserUpdate
 from app.utils.security import hash_password
@@ -54,5 +54,6 @@ def update_user(user_id: str, payload: UserUpdate, db: Session = Depends(get_db)
         target.roles = payload.roles
 
     db.commit()
+    user_cache.invalidate(target.id)
     db.refresh(target)
     return target
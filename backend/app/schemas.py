@@ -4,7 +4,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, model_validator
 
-from app.models import BatchStatus, IncidentStatus, IncidentType, ItemSource, RepairType, Role, Status
+from app.models import BatchStatus, DocumentJobStatus, IncidentStatus, IncidentType, ItemSource, RepairType, Role, Status
 
 
 class TokenResponse(BaseModel):
@@ -149,6 +149,14 @@ class JobOut(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class JobSyncOut(BaseModel):
+    changed: List[JobOut]
+    # Job ids archived or hard-deleted since the previous page.
+    removed: List[str]
+    watermark: str
+    has_more: bool
+
+
 class StatusEventOut(BaseModel):
     id: UUID
     job_id: UUID
@@ -189,6 +197,23 @@ class JobScanRequest(BaseModel):
     incident_flag: bool = False
 
 
+class JobBulkScanRequest(JobScanRequest):
+    job_ids: List[str] = Field(default_factory=list)
+
+
+class JobBulkScanResult(BaseModel):
+    job_id: str
+    ok: bool
+    detail: Optional[str] = None
+    event: Optional[StatusEventOut] = None
+
+
+class JobBulkScanResponse(BaseModel):
+    results: List[JobBulkScanResult] = Field(default_factory=list)
+    updated_count: int = 0
+    failed_count: int = 0
+
+
 class LabelSheetRequest(BaseModel):
     job_ids: List[str] = Field(default_factory=list)
     start_position: int = Field(default=1, ge=1)
@@ -300,6 +325,8 @@ class AgingBucket(BaseModel):
 class TurnaroundMetrics(BaseModel):
     stage: str
     average_days: float
+    p50_days: float = 0
+    p90_days: float = 0
 
 
 class BatchDelay(BaseModel):
@@ -339,10 +366,41 @@ class OpsSummary(BaseModel):
     received_at_factory: int
     awaiting_closure: int
     awaiting_closure_overdue: int
+    computed_at: Optional[datetime] = None
 
 
-class ExcelExportRequest(BaseModel):
-    job_ids: List[str]
+class JobFilters(BaseModel):
+    """Filters accepted by GET /jobs and the job exports."""
+
+    status: Optional[Status] = None
+    attention: Optional[str] = None
+    from_date: Optional[datetime] = None
+    to_date: Optional[datetime] = None
+    batch_id: Optional[str] = None
+    factory_id: Optional[str] = None
+    phone: Optional[str] = None
+    job_id: Optional[str] = None
+    include_archived: bool = False
+
+
+class ExcelExportRequest(JobFilters):
+    # An explicit selection wins over the filters.
+    job_ids: Optional[List[str]] = None
+
+
+class DocumentJobOut(BaseModel):
+    id: UUID
+    kind: str
+    status: DocumentJobStatus
+    attempts: int
+    filename: Optional[str] = None
+    content_type: Optional[str] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {"from_attributes": True}
 
 
 class FactorySummary(BaseModel):
@@ -0,0 +1,134 @@
+"""Pending-aging counts kept in ``job_aging_buckets``.
+
+The table holds one row per (status, bucket) with every job's age measured at
+the last full refresh. Status transitions shift counts between rows as they
+happen; jobs that simply grow older are caught up by ``refresh_aging_buckets``
+(run periodically, see ``scripts/refresh_aging_buckets.py``). Because a job
+touched after the refresh is younger than the refresh itself, it always lands
+in the first bucket, so the table stays exact for the refresh instant.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+from sqlalchemy import case, delete, event, func, literal, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import ItemJob, JobAgingBucket, ReportSnapshot, Status
+
+AGING_SNAPSHOT = "pending_aging"
+PENDING_MOVES_KEY = "aging_moves"
+
+# Bucket name and the oldest whole-day age it holds; the last bucket is open-ended.
+AGING_BUCKETS: list[tuple[str, Optional[int]]] = [
+    ("bucket_0_2", 2),
+    ("bucket_3_7", 7),
+    ("bucket_8_15", 15),
+    ("bucket_16_30", 30),
+    ("bucket_30_plus", None),
+]
+
+AgingState = tuple[Status, Optional[datetime]]
+
+
+def aging_bucket(base_time: Optional[datetime], now: datetime) -> str:
+    age_days = (now - base_time).days if base_time else 0
+    for name, max_days in AGING_BUCKETS[:-1]:
+        if age_days <= max_days:
+            return name
+    return AGING_BUCKETS[-1][0]
+
+
+def aging_state(job: ItemJob) -> AgingState:
+    return job.current_status, job.last_scan_at or job.created_at
+
+
+def note_aging_move(db: Session, before: Optional[AgingState], after: Optional[AgingState]) -> None:
+    """Queue a job's move between aging buckets; ``None`` means created or deleted.
+
+    Call this wherever a job's status or ``last_scan_at`` changes. The moves are
+    written in one statement when the session commits.
+    """
+
+    db.info.setdefault(PENDING_MOVES_KEY, []).append((before, after))
+
+
+def record_aging_moves(db: Session) -> None:
+    moves = db.info.pop(PENDING_MOVES_KEY, None)
+    if not moves:
+        return
+
+    # KEY SHARE conflicts only with the refresh's FOR UPDATE, so transitions run
+    # side by side but never interleave with a rebuild.
+    refreshed_at = db.execute(
+        select(ReportSnapshot.computed_at)
+        .where(ReportSnapshot.name == AGING_SNAPSHOT)
+        .with_for_update(read=True, key_share=True)
+    ).scalar() or datetime.now(timezone.utc)
+
+    deltas: Counter[tuple[Status, str]] = Counter()
+    for before, after in moves:
+        if before is not None:
+            deltas[(before[0], aging_bucket(before[1], refreshed_at))] -= 1
+        if after is not None:
+            deltas[(after[0], aging_bucket(after[1], refreshed_at))] += 1
+    # Sorted rows lock in the same order in every transaction.
+    rows = [
+        {"status": status, "bucket": bucket, "job_count": delta}
+        for (status, bucket), delta in sorted(deltas.items())
+        if delta
+    ]
+    if not rows:
+        return
+
+    stmt = insert(JobAgingBucket).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobAgingBucket.status, JobAgingBucket.bucket],
+        set_={"job_count": JobAgingBucket.job_count + stmt.excluded.job_count},
+    )
+    db.execute(stmt)
+
+
+@event.listens_for(Session, "before_commit")
+def _write_aging_moves(session: Session) -> None:
+    record_aging_moves(session)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_aging_moves(session: Session, transaction) -> None:
+    # Moves left over here belong to a transaction that was rolled back or closed.
+    if transaction.parent is None:
+        session.info.pop(PENDING_MOVES_KEY, None)
+
+
+def aging_bucket_column(now: datetime):
+    age_days = func.date_part("day", literal(now) - func.coalesce(ItemJob.last_scan_at, ItemJob.created_at))
+    whens = [(age_days <= max_days, name) for name, max_days in AGING_BUCKETS[:-1]]
+    return case(*whens, else_=AGING_BUCKETS[-1][0])
+
+
+def refresh_aging_buckets(db: Session) -> datetime:
+    """Recount every job's bucket as of now. The caller commits."""
+
+    # Waits for in-flight transitions to commit and holds new ones back until
+    # the recount lands, so none of them is counted twice or lost.
+    db.execute(select(ReportSnapshot.name).where(ReportSnapshot.name == AGING_SNAPSHOT).with_for_update())
+    now = datetime.now(timezone.utc)
+    ages = select(ItemJob.current_status.label("status"), aging_bucket_column(now).label("bucket")).subquery()
+    db.execute(delete(JobAgingBucket))
+    db.execute(
+        insert(JobAgingBucket).from_select(
+            ["status", "bucket", "job_count"],
+            select(ages.c.status, ages.c.bucket, func.count()).group_by(ages.c.status, ages.c.bucket),
+        )
+    )
+    db.execute(
+        insert(ReportSnapshot)
+        .values(name=AGING_SNAPSHOT, payload={}, computed_at=now)
+        .on_conflict_do_update(index_elements=[ReportSnapshot.name], set_={"computed_at": now})
+    )
+    return now
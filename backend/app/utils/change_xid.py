@@ -0,0 +1,12 @@
+"""Commit-ordered watermarks for incremental pulls.
+
+A trigger stamps each written row's ``change_xid`` with the id of the writing
+transaction. Every transaction below the xmin of the current snapshot has
+finished, so the rows under that horizon are final: a transaction that commits
+late can only ever add rows at or above it. Timestamps give no such promise,
+since ``now()`` is taken when a transaction starts, not when it commits.
+"""
+
+from sqlalchemy import BigInteger, Text, cast, func, select
+
+CHANGE_XID_HORIZON = select(cast(cast(func.pg_snapshot_xmin(func.pg_current_snapshot()), Text), BigInteger))
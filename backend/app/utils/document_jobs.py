@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import BinaryIO, Callable, Optional, Union
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import DocumentJob, DocumentJobStatus
+from app.utils.storage import StorageClient
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+DOCUMENT_PREFIX = "documents"
+MAX_ATTEMPTS = 3
+FINISHED_STATUSES = {DocumentJobStatus.SUCCEEDED, DocumentJobStatus.FAILED}
+PURGE_INTERVAL_SECONDS = 600
+PURGE_BATCH_SIZE = 100
+
+
+@dataclass
+class DocumentResult:
+    # Large artifacts can be handed over as an open file; it is closed once stored.
+    content: Union[bytes, BinaryIO]
+    content_type: str
+    filename: str
+
+
+DocumentHandler = Callable[[Session, dict], DocumentResult]
+
+
+def enqueue_document_job(db: Session, kind: str, params: dict, *, user_id: Optional[uuid.UUID]) -> DocumentJob:
+    job = DocumentJob(kind=kind, params=params, status=DocumentJobStatus.QUEUED, attempts=0, requested_by_user_id=user_id)
+    db.add(job)
+    return job
+
+
+def claim_next_job(db: Session, *, timeout_seconds: int) -> Optional[DocumentJob]:
+    """Lock and mark the oldest runnable job as running.
+
+    Jobs left RUNNING past the timeout (a worker died mid-render) are picked up
+    again until they run out of attempts. SKIP LOCKED lets any number of
+    workers poll the same table without handing out a job twice.
+    """
+    now = datetime.now(timezone.utc)
+    stale_before = now - timedelta(seconds=timeout_seconds)
+    job = db.execute(
+        select(DocumentJob)
+        .where(
+            or_(
+                DocumentJob.status == DocumentJobStatus.QUEUED,
+                and_(
+                    DocumentJob.status == DocumentJobStatus.RUNNING,
+                    DocumentJob.started_at < stale_before,
+                ),
+            )
+        )
+        .order_by(DocumentJob.created_at)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar_one_or_none()
+    if job is None:
+        return None
+    if job.attempts >= MAX_ATTEMPTS:
+        job.status = DocumentJobStatus.FAILED
+        job.error = job.error or "Worker did not finish the job"
+        job.finished_at = now
+        db.commit()
+        return claim_next_job(db, timeout_seconds=timeout_seconds)
+    job.status = DocumentJobStatus.RUNNING
+    job.started_at = now
+    job.attempts += 1
+    db.commit()
+    return job
+
+
+def run_document_job(db: Session, storage: StorageClient, job: DocumentJob, handlers: dict[str, DocumentHandler]) -> None:
+    job_id = job.id
+    try:
+        handler = handlers.get(job.kind)
+        if handler is None:
+            raise ValueError(f"Unknown document kind: {job.kind}")
+        result = handler(db, dict(job.params or {}))
+        key = f"{DOCUMENT_PREFIX}/{job_id}/{result.filename}"
+        if isinstance(result.content, bytes):
+            storage.put_bytes(key, result.content, content_type=result.content_type)
+        else:
+            with result.content:
+                storage.put_fileobj(key, result.content, content_type=result.content_type)
+    except Exception as exc:
+        db.rollback()
+        job = db.get(DocumentJob, job_id)
+        job.status = DocumentJobStatus.FAILED
+        job.error = str(exc.detail) if isinstance(exc, HTTPException) else str(exc) or exc.__class__.__name__
+        job.finished_at = datetime.now(timezone.utc)
+        db.commit()
+        logger.warning("Document job %s (%s) failed: %s", job_id, job.kind, job.error)
+        return
+
+    job.status = DocumentJobStatus.SUCCEEDED
+    job.result_key = key
+    job.result_url = storage.url_for(key)
+    job.content_type = result.content_type
+    job.filename = result.filename
+    job.error = None
+    job.finished_at = datetime.now(timezone.utc)
+    db.commit()
+
+
+def purge_expired_documents(db: Session, storage: StorageClient, *, retention_hours: int) -> int:
+    """Delete stored results of jobs finished more than ``retention_hours`` ago.
+
+    The job rows are kept, so their file endpoint answers 410 afterwards.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(hours=retention_hours)
+    expired = db.execute(
+        select(DocumentJob)
+        .where(DocumentJob.result_key.is_not(None), DocumentJob.finished_at < cutoff)
+        .order_by(DocumentJob.finished_at)
+        .limit(PURGE_BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    ).scalars().all()
+    for job in expired:
+        storage.delete(job.result_key)
+        job.result_key = None
+        job.result_url = None
+    db.commit()
+    return len(expired)
+
+
+def run_worker(
+    session_factory: Callable[[], Session],
+    storage: StorageClient,
+    handlers: dict[str, DocumentHandler],
+    *,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    stop = stop or threading.Event()
+    next_purge = time.monotonic()
+    while not stop.is_set():
+        db = session_factory()
+        try:
+            if settings.document_retention_hours > 0 and time.monotonic() >= next_purge:
+                next_purge = time.monotonic() + PURGE_INTERVAL_SECONDS
+                purged = purge_expired_documents(db, storage, retention_hours=settings.document_retention_hours)
+                if purged:
+                    logger.info("Purged %d expired documents", purged)
+            job = claim_next_job(db, timeout_seconds=settings.document_job_timeout_seconds)
+            if job is not None:
+                run_document_job(db, storage, job, handlers)
+        except Exception:
+            logger.exception("Document worker iteration failed")
+            db.rollback()
+            job = None
+        finally:
+            db.close()
+        if job is None:
+            stop.wait(settings.document_worker_poll_seconds)
@@ -0,0 +1,72 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+from sqlalchemy import Select, func
+
+from app.models import BatchItem, ItemJob, Status
+from app.schemas import JobFilters
+
+OVERDUE_RETURN_STATUSES = [
+    Status.PURCHASED,
+    Status.PACKED_READY,
+    Status.DISPATCHED_TO_FACTORY,
+    Status.RECEIVED_AT_FACTORY,
+    Status.RETURNED_FROM_FACTORY,
+    Status.ON_HOLD,
+]
+AWAITING_CLOSURE_STATUSES = [
+    Status.RETURNED_FROM_FACTORY,
+    Status.RECEIVED_AT_SHOP,
+    Status.ADDED_TO_STOCK,
+    Status.HANDED_TO_DELIVERY,
+]
+
+
+def apply_job_filters(query: Select, filters: JobFilters, *, is_admin: bool) -> Select:
+    if not filters.include_archived or not is_admin:
+        query = query.filter(ItemJob.is_archived.is_(False))
+    if filters.status:
+        query = query.filter(ItemJob.current_status == filters.status)
+    if filters.attention:
+        now = datetime.now(timezone.utc)
+        if filters.attention == "overdue_returns":
+            query = query.filter(
+                ItemJob.target_return_date.isnot(None),
+                ItemJob.target_return_date < now,
+                ItemJob.current_status.in_(OVERDUE_RETURN_STATUSES),
+            )
+        elif filters.attention == "aged_over_7":
+            query = query.filter(
+                func.coalesce(ItemJob.last_scan_at, ItemJob.created_at) < now - timedelta(days=7),
+                ItemJob.current_status.notin_([Status.DELIVERED_TO_CUSTOMER, Status.CANCELLED]),
+            )
+        elif filters.attention == "at_factory":
+            query = query.filter(
+                ItemJob.current_status.in_([Status.DISPATCHED_TO_FACTORY, Status.RECEIVED_AT_FACTORY])
+            )
+        elif filters.attention == "awaiting_closure":
+            query = query.filter(ItemJob.current_status.in_(AWAITING_CLOSURE_STATUSES))
+        else:
+            raise HTTPException(status_code=400, detail="Invalid attention filter")
+    if filters.from_date:
+        query = query.filter(ItemJob.created_at >= filters.from_date)
+    if filters.to_date:
+        query = query.filter(ItemJob.created_at <= filters.to_date)
+    if filters.phone:
+        query = query.filter(ItemJob.customer_phone.ilike(f"%{filters.phone}%"))
+    if filters.job_id:
+        query = query.filter(ItemJob.job_id.ilike(f"%{filters.job_id}%"))
+    if filters.factory_id:
+        try:
+            factory_uuid = uuid.UUID(filters.factory_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid factory id") from exc
+        query = query.filter(ItemJob.factory_id == factory_uuid)
+    if filters.batch_id:
+        try:
+            batch_uuid = uuid.UUID(filters.batch_id)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail="Invalid voucher id") from exc
+        query = query.join(BatchItem, BatchItem.job_id == ItemJob.id).filter(BatchItem.batch_id == batch_uuid)
+    return query
@@ -0,0 +1,101 @@
+"""Fan Postgres NOTIFY deltas out to server-sent event subscribers.
+
+Triggers on ``status_events``, ``batches`` and ``incidents`` publish a compact
+JSON delta on ``EVENTS_CHANNEL`` when their transaction commits. Each worker
+process keeps a single LISTEN connection, opened for the first subscriber, and
+copies every message into the subscribers' queues.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+from typing import Optional
+
+import psycopg
+from sqlalchemy.engine import make_url
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "live_events"
+SUBSCRIBER_QUEUE_SIZE = 256
+RECONNECT_SECONDS = 5.0
+
+
+def sse_frame(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+# Tells clients they may have missed deltas and should refetch their views.
+RESYNC_FRAME = sse_frame("resync", "{}")
+
+
+def listen_dsn(database_url: str) -> str:
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class EventHub:
+    def __init__(self, dsn: str, queue_size: int = SUBSCRIBER_QUEUE_SIZE) -> None:
+        self.dsn = dsn
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[str]] = set()
+        self._listener: Optional[asyncio.Task] = None
+
+    def subscribe(self) -> asyncio.Queue[str]:
+        queue: asyncio.Queue[str] = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue[str]) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(self, payload: str) -> None:
+        try:
+            event = json.loads(payload)["type"]
+        except (ValueError, KeyError, TypeError):
+            logger.warning("Ignoring malformed live event: %s", payload)
+            return
+        self._broadcast(sse_frame(event, payload))
+
+    def _broadcast(self, frame: str) -> None:
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # A client this far behind refetches rather than replaying the backlog.
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(RESYNC_FRAME)
+
+    async def _listen(self) -> None:
+        reconnecting = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.dsn, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {EVENTS_CHANNEL}")
+                    if reconnecting:
+                        self._broadcast(RESYNC_FRAME)
+                    async for notify in conn.notifies():
+                        self.publish(notify.payload)
+            except Exception:
+                logger.warning("Live event listener disconnected", exc_info=True)
+            reconnecting = True
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def close(self) -> None:
+        if self._listener is None:
+            return
+        self._listener.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._listener
+        self._listener = None
+
+
+hub = EventHub(listen_dsn(settings.database_url))
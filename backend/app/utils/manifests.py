@@ -0,0 +1,75 @@
+import logging
+import uuid
+from typing import Optional
+
+from sqlalchemy.orm import Session, selectinload
+
+from app.models import Batch, BatchItem, BatchStatus
+from app.utils.pdf import generate_manifest_pdf
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_PREFIX = "manifests"
+# Vouchers in these states have a fixed item list, so their manifest is kept.
+STORED_MANIFEST_STATUSES = {BatchStatus.DISPATCHED, BatchStatus.RECEIVED_AT_FACTORY, BatchStatus.CLOSED}
+
+
+def render_manifest(db: Session, batch: Batch, *, live_status: bool = True) -> bytes:
+    items = (
+        db.query(BatchItem)
+        .options(selectinload(BatchItem.job))
+        .filter(BatchItem.batch_id == batch.id)
+        .order_by(BatchItem.added_at)
+        .all()
+    )
+    return generate_manifest_pdf(batch, [item.job for item in items], live_status=live_status)
+
+
+def store_manifest(db: Session, batch: Batch) -> bytes:
+    """Render the voucher's manifest, upload it and record its URL on the batch.
+
+    The stored copy leaves out statuses: it is kept until the voucher changes,
+    while its items keep moving through the workflow.
+    """
+    pdf_bytes = render_manifest(db, batch, live_status=False)
+    storage = get_storage()
+    old_url = batch.manifest_pdf_url
+    key = f"{MANIFEST_PREFIX}/{batch.batch_code}-{uuid.uuid4().hex[:12]}.pdf"
+    try:
+        storage.put_bytes(key, pdf_bytes, content_type="application/pdf")
+    except Exception as exc:
+        logger.warning("Manifest upload failed for %s: %s", batch.batch_code, exc)
+        return pdf_bytes
+    batch.manifest_pdf_url = storage.url_for(key)
+    if old_url:
+        _delete_manifest_object(old_url)
+    return pdf_bytes
+
+
+def load_stored_manifest(batch: Batch) -> Optional[bytes]:
+    if not batch.manifest_pdf_url:
+        return None
+    key = get_storage().key_for_url(batch.manifest_pdf_url)
+    if not key:
+        return None
+    return get_storage().get_bytes(key)
+
+
+def invalidate_manifest(batch: Batch) -> None:
+    if not batch.manifest_pdf_url:
+        return
+    old_url = batch.manifest_pdf_url
+    batch.manifest_pdf_url = None
+    _delete_manifest_object(old_url)
+
+
+def _delete_manifest_object(url: str) -> None:
+    storage = get_storage()
+    key = storage.key_for_url(url)
+    if not key:
+        return
+    try:
+        storage.delete(key)
+    except Exception as exc:
+        logger.warning("Manifest cleanup failed for %s: %s", key, exc)
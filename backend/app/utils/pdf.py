@@ -1,11 +1,22 @@
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from functools import lru_cache
 from io import BytesIO
 from pathlib import Path
+from types import SimpleNamespace
 from typing import Iterable
 
 import httpx
 import qrcode
+from pypdf import PdfReader, PdfWriter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm
@@ -16,16 +27,50 @@ from reportlab.pdfgen import canvas
 from app.config import get_settings
 from app.models import Batch, ItemJob
 from app.utils.diamond import format_diamond_carat
+from app.utils.photo_cache import LabelPhotoCache, photo_cache_key
+from app.utils.storage import StorageClient
+from app.utils.thumbnails import THUMBNAIL_SIZES, thumbnail_key
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
 LOGO_PATH = Path(__file__).resolve().parent.parent / "assets" / "majestic-logo.png"
-HTTP_CLIENT = httpx.Client(timeout=5.0, follow_redirects=True)
+LOGO_SIZE = 10 * mm
+LOGO_FORM_NAME = "majesticLogo"
+# Part of every cached label's key: bump whenever _draw_label output changes.
+LABEL_LAYOUT_VERSION = 1
+LABEL_CACHE_PREFIX = "labels"
+HTTP_CLIENT = httpx.Client(timeout=httpx.Timeout(5.0, connect=2.0), follow_redirects=True)
+LABEL_PHOTO_PREFETCH_WORKERS = 8
+LABEL_PHOTO_DISK_ENTRIES = 5000
 LABEL_SHEET_COLUMNS = 2
 LABEL_SHEET_ROWS = 3
 LABEL_SHEET_MARGIN_X = 2 * mm
 LABEL_SHEET_MARGIN_Y = 2 * mm
 LABEL_SHEET_GAP_X = 2 * mm
 LABEL_SHEET_GAP_Y = 4 * mm
+# Sheets of at least this many pages are split across the render process pool.
+LABEL_SHEET_PARALLEL_MIN_PAGES = 20
+LABEL_SHEET_MIN_CHUNK_PAGES = 5
+# Everything _draw_label reads from a job; worker processes get plain copies.
+LABEL_JOB_FIELDS = (
+    "job_id",
+    "item_source",
+    "repair_type",
+    "factory_name",
+    "work_narration",
+    "style_number",
+    "approximate_weight",
+    "diamond_cent",
+    "purchase_value",
+    "voucher_no",
+    "customer_name",
+    "item_description",
+    "created_at",
+    "target_return_date",
+)
+
+_render_pool: ProcessPoolExecutor | None = None
+_render_pool_lock = threading.Lock()
 
 
 def _label_dimensions(
@@ -71,15 +116,30 @@ def _trim_text(text: str, max_width: float, font_name: str, font_size: int) -> s
     return f"{trimmed}{suffix}" if trimmed else suffix
 
 
+@lru_cache(maxsize=1)
 def _load_logo_image() -> ImageReader | None:
     if not LOGO_PATH.exists():
         return None
     try:
-        return ImageReader(str(LOGO_PATH))
+        logo = ImageReader(BytesIO(LOGO_PATH.read_bytes()))
+        # Decode now so later documents reuse the pixel data.
+        logo.getRGBData()
+        return logo
     except Exception:
         return None
 
 
+def _ensure_logo_form(c: canvas.Canvas) -> None:
+    # The logo is embedded once per document as a form XObject that the label
+    # template references.
+    logo = _load_logo_image()
+    if logo is None or c.hasForm(LOGO_FORM_NAME):
+        return
+    c.beginForm(LOGO_FORM_NAME, 0, 0, LOGO_SIZE, LOGO_SIZE)
+    _draw_image(c, logo, 0, 0, LOGO_SIZE, LOGO_SIZE)
+    c.endForm()
+
+
 def _load_photo_bytes(photo: dict) -> bytes | None:
     if not isinstance(photo, dict):
         return None
@@ -89,18 +149,40 @@ def _load_photo_bytes(photo: dict) -> bytes | None:
         path = None
         if key:
             path = Path(settings.local_storage_path) / key
+            thumb_path = Path(settings.local_storage_path) / thumbnail_key(key, THUMBNAIL_SIZES[0])
+            if thumb_path.exists():
+                path = thumb_path
         elif url and url.startswith("/storage/"):
             path = Path(settings.local_storage_path) / url.removeprefix("/storage/")
         if path and path.exists():
             return path.read_bytes()
-    if not url or url.startswith("/"):
-        return None
-    try:
-        response = HTTP_CLIENT.get(url)
-        response.raise_for_status()
-        return response.content
-    except Exception:
-        return None
+    # A thumb_url can name a rendition that was never written; the original
+    # is the fallback.
+    for candidate in dict.fromkeys([url, photo.get("url")]):
+        if not candidate or candidate.startswith("/"):
+            continue
+        try:
+            response = HTTP_CLIENT.get(candidate)
+            response.raise_for_status()
+            return response.content
+        except Exception:
+            continue
+    return None
+
+
+label_photo_cache = LabelPhotoCache(
+    _load_photo_bytes,
+    max_entries=settings.label_photo_cache_entries,
+    disk_dir=settings.label_photo_cache_dir or str(Path(tempfile.gettempdir()) / "diamond-label-photos"),
+    max_disk_entries=LABEL_PHOTO_DISK_ENTRIES,
+)
+
+
+def _first_photo(job: ItemJob):
+    photos = job.photos or []
+    if isinstance(photos, list) and photos:
+        return photos[0]
+    return None
 
 
 @lru_cache(maxsize=512)
@@ -177,6 +259,145 @@ def _wrap_text(text: str, max_width: float, font_name: str, font_size: float) ->
     return lines or [text]
 
 
+LABEL_MARGIN = 4 * mm
+LABEL_HEADER_HEIGHT = 13 * mm
+LABEL_QR_SIZE = 22 * mm
+LABEL_PHOTO_BOX = 22 * mm
+LABEL_COLUMN_GAP = 3 * mm
+
+
+def _label_layout(width: float, height: float, left_fields: list[dict], right_fields: list[dict]) -> dict:
+    header_y = height - LABEL_MARGIN - LABEL_HEADER_HEIGHT
+    col_width = (width - 2 * LABEL_MARGIN - LABEL_COLUMN_GAP) / 2
+    bottom_area_top = LABEL_MARGIN + LABEL_PHOTO_BOX + 8 * mm
+    info_top = header_y - 2 * mm
+    info_height = max(info_top - bottom_area_top, 30 * mm)
+    return {
+        "header_y": header_y,
+        "title_x": LABEL_MARGIN + LOGO_SIZE + 3 * mm,
+        "col_width": col_width,
+        "left_x": LABEL_MARGIN,
+        "right_x": LABEL_MARGIN + col_width + LABEL_COLUMN_GAP,
+        "info_top": info_top,
+        "row_unit": info_height / max(_field_units(left_fields), _field_units(right_fields)),
+        "bottom_area_top": bottom_area_top,
+        "qr_x": LABEL_MARGIN,
+        "qr_y": LABEL_MARGIN,
+        "photo_x": width - LABEL_MARGIN - LABEL_PHOTO_BOX,
+        "photo_y": LABEL_MARGIN,
+    }
+
+
+def _field_rows(fields: list[dict], x: float, layout: dict):
+    row_y = layout["info_top"]
+    for field in fields:
+        field_height = layout["row_unit"] * float(field.get("row_span", 1.0))
+        yield field, x, row_y, field_height
+        row_y -= field_height
+
+
+def _label_template_name(width: float, height: float) -> str:
+    return f"labelTemplate{width:.2f}x{height:.2f}"
+
+
+def _ensure_label_template(
+    c: canvas.Canvas,
+    width: float,
+    height: float,
+    left_fields: list[dict],
+    right_fields: list[dict],
+    layout: dict,
+) -> str:
+    """Define the static part of a label (frame, header, captions) once per document.
+
+    The form is drawn in label-local coordinates, so it already follows any
+    scale applied around it; only the label size needs to be part of the name.
+    Captions come from the field layout, which is the same for every job.
+    """
+    name = _label_template_name(width, height)
+    if c.hasForm(name):
+        return name
+    _ensure_logo_form(c)
+    c.beginForm(name, 0, 0, width, height)
+
+    header_y = layout["header_y"]
+    c.setStrokeColor(colors.HexColor("#d1d5db"))
+    c.setLineWidth(0.5)
+    c.rect(0, 0, width, height, stroke=1, fill=0)
+
+    c.setFillColor(colors.HexColor("#f3efe7"))
+    c.rect(0, header_y, width, LABEL_HEADER_HEIGHT, stroke=0, fill=1)
+    c.setFillColor(colors.black)
+
+    if _load_logo_image() is not None:
+        c.saveState()
+        c.translate(LABEL_MARGIN, header_y + (LABEL_HEADER_HEIGHT - LOGO_SIZE) / 2)
+        c.doForm(LOGO_FORM_NAME)
+        c.restoreState()
+    c.setFont("Helvetica-Bold", 9)
+    c.drawString(layout["title_x"], header_y + LABEL_HEADER_HEIGHT - 5 * mm, "Majestic Tracking")
+
+    c.setFillColor(colors.HexColor("#6b7280"))
+    for fields, x in ((left_fields, layout["left_x"]), (right_fields, layout["right_x"])):
+        for field, field_x, field_y, field_height in _field_rows(fields, x, layout):
+            c.setFont("Helvetica", min(5.4, field_height * 0.28))
+            c.drawString(field_x, field_y, field["label"].upper())
+
+    bottom_area_top = layout["bottom_area_top"]
+    c.setStrokeColor(colors.HexColor("#e5e7eb"))
+    c.setLineWidth(0.6)
+    c.line(LABEL_MARGIN, bottom_area_top, width - LABEL_MARGIN, bottom_area_top)
+
+    qr_x, qr_y = layout["qr_x"], layout["qr_y"]
+    photo_x, photo_y = layout["photo_x"], layout["photo_y"]
+    c.setFont("Helvetica", 5.5)
+    c.drawString(qr_x, bottom_area_top - 5 * mm, "SCAN")
+    c.drawString(photo_x, bottom_area_top - 5 * mm, "PHOTO")
+
+    c.setStrokeColor(colors.HexColor("#d1d5db"))
+    c.setLineWidth(0.5)
+    c.roundRect(qr_x - 1 * mm, qr_y - 1 * mm, LABEL_QR_SIZE + 2 * mm, LABEL_QR_SIZE + 2 * mm, 2 * mm, stroke=1, fill=0)
+    c.roundRect(
+        photo_x - 1 * mm, photo_y - 1 * mm, LABEL_PHOTO_BOX + 2 * mm, LABEL_PHOTO_BOX + 2 * mm, 2 * mm, stroke=1, fill=0
+    )
+    c.endForm()
+    return name
+
+
+def _draw_field_value(c: canvas.Canvas, field: dict, x: float, y: float, field_height: float, col_width: float) -> None:
+    value = field["value"]
+    value_font = "Helvetica-Bold"
+    value_top = y - max(2.0 * mm, field_height * 0.42)
+    if field["label"] == "Target Return":
+        c.setFillColor(colors.HexColor("#b91c1c"))
+    else:
+        c.setFillColor(colors.black)
+    if field.get("multiline"):
+        font_size = min(7.0, field_height * 0.25)
+        min_font_size = 4.6
+        available_height = max(field_height - (y - value_top) - (0.4 * mm), font_size * 1.2)
+        lines = _wrap_text(value, col_width, value_font, font_size)
+        line_height = font_size * 1.15
+        while font_size > min_font_size and len(lines) * line_height > available_height:
+            font_size -= 0.4
+            lines = _wrap_text(value, col_width, value_font, font_size)
+            line_height = font_size * 1.15
+        max_lines = max(1, int(available_height / line_height))
+        if len(lines) > max_lines:
+            remainder = " ".join(lines[max_lines - 1 :])
+            lines = lines[: max_lines - 1] + [_trim_text(remainder, col_width, value_font, font_size)]
+        c.setFont(value_font, font_size)
+        line_y = value_top
+        for line in lines:
+            c.drawString(x, line_y, line)
+            line_y -= line_height
+    else:
+        value_size = min(7.4, field_height * 0.38)
+        c.setFont(value_font, value_size)
+        fitted = _trim_text(value, col_width, value_font, value_size)
+        c.drawString(x, value_top, fitted)
+
+
 def _draw_label(
     c: canvas.Canvas,
     job: ItemJob,
@@ -187,40 +408,22 @@ def _draw_label(
     width: float,
     height: float,
     scale: float = 1.0,
+    photo_bytes: bytes | None = None,
 ) -> None:
+    left_fields, right_fields = _build_label_fields(job, factory_name)
+    layout = _label_layout(width, height, left_fields, right_fields)
+    template = _ensure_label_template(c, width, height, left_fields, right_fields, layout)
+
     c.saveState()
     c.translate(x, y)
     if scale != 1.0:
         c.scale(scale, scale)
+    c.doForm(template)
 
-    page_width = width
-    page_height = height
-    c.setStrokeColor(colors.HexColor("#d1d5db"))
-    c.setLineWidth(0.5)
-    c.rect(0, 0, page_width, page_height, stroke=1, fill=0)
-    left_margin = 4 * mm
-    right_margin = 4 * mm
-    top_margin = 4 * mm
-    header_height = 13 * mm
-    header_y = page_height - top_margin - header_height
-
-    c.setFillColor(colors.HexColor("#f3efe7"))
-    c.rect(0, header_y, page_width, header_height, stroke=0, fill=1)
-    c.setFillColor(colors.black)
-
-    logo = _load_logo_image()
-    logo_size = 10 * mm
-    logo_x = left_margin
-    logo_y = header_y + (header_height - logo_size) / 2
-    if logo:
-        _draw_image(c, logo, logo_x, logo_y, logo_size, logo_size)
-    title_x = logo_x + logo_size + 3 * mm
-    c.setFont("Helvetica-Bold", 9)
-    c.drawString(title_x, header_y + header_height - 5 * mm, "Majestic Tracking")
+    header_y = layout["header_y"]
     c.setFont("Helvetica", 6.5)
     c.setFillColor(colors.HexColor("#4b5563"))
-    c.drawString(title_x, header_y + header_height - 9.5 * mm, f"Job {job.job_id}")
-    c.setFillColor(colors.black)
+    c.drawString(layout["title_x"], header_y + LABEL_HEADER_HEIGHT - 9.5 * mm, f"Job {job.job_id}")
 
     source = job.item_source.value if job.item_source else "-"
     if job.repair_type:
@@ -247,110 +450,23 @@ def _draw_label(
 
     c.setFont("Helvetica-Bold", job_type_size)
     c.setFillColor(job_type_color)
-    c.drawRightString(page_width - right_margin, header_y + header_height - 5 * mm, job_type_label)
-    c.setFillColor(colors.black)
-    left_fields, right_fields = _build_label_fields(job, factory_name)
-
-    content_width = page_width - left_margin - right_margin
-    col_gap = 3 * mm
-    col_width = (content_width - col_gap) / 2
-    left_x = left_margin
-    right_x = left_margin + col_width + col_gap
-
-    qr_size = 22 * mm
-    photo_box = 22 * mm
-    bottom_area_top = left_margin + photo_box + 8 * mm
-    info_top = header_y - 2 * mm
-    info_height = max(info_top - bottom_area_top, 30 * mm)
-    row_unit = info_height / max(_field_units(left_fields), _field_units(right_fields))
-
-    def draw_field(field: dict, x: float, y: float) -> None:
-        label = field["label"]
-        value = field["value"]
-        field_height = row_unit * float(field.get("row_span", 1.0))
-        label_font = "Helvetica"
-        value_font = "Helvetica-Bold"
-        label_size = min(5.4, field_height * 0.28)
-        value_top = y - max(2.0 * mm, field_height * 0.42)
-        c.setFillColor(colors.HexColor("#6b7280"))
-        c.setFont(label_font, label_size)
-        c.drawString(x, y, label.upper())
-        if label == "Target Return":
-            c.setFillColor(colors.HexColor("#b91c1c"))
-        else:
-            c.setFillColor(colors.black)
-        if field.get("multiline"):
-            font_size = min(7.0, field_height * 0.25)
-            min_font_size = 4.6
-            available_height = max(field_height - (y - value_top) - (0.4 * mm), font_size * 1.2)
-            lines = _wrap_text(value, col_width, value_font, font_size)
-            line_height = font_size * 1.15
-            while font_size > min_font_size and len(lines) * line_height > available_height:
-                font_size -= 0.4
-                lines = _wrap_text(value, col_width, value_font, font_size)
-                line_height = font_size * 1.15
-            max_lines = max(1, int(available_height / line_height))
-            if len(lines) > max_lines:
-                remainder = " ".join(lines[max_lines - 1 :])
-                lines = lines[: max_lines - 1] + [_trim_text(remainder, col_width, value_font, font_size)]
-            c.setFont(value_font, font_size)
-            line_y = value_top
-            for line in lines:
-                c.drawString(x, line_y, line)
-                line_y -= line_height
-        else:
-            value_size = min(7.4, field_height * 0.38)
-            c.setFont(value_font, value_size)
-            fitted = _trim_text(value, col_width, value_font, value_size)
-            c.drawString(x, value_top, fitted)
-
-    def draw_column(fields: list[dict], x: float) -> None:
-        row_y = info_top
-        for field in fields:
-            draw_field(field, x, row_y)
-            row_y -= row_unit * float(field.get("row_span", 1.0))
-
-    draw_column(left_fields, left_x)
-    draw_column(right_fields, right_x)
-
-    c.setStrokeColor(colors.HexColor("#e5e7eb"))
-    c.setLineWidth(0.6)
-    c.line(left_margin, bottom_area_top, page_width - right_margin, bottom_area_top)
-
-    photos = job.photos or []
-    photo_reader = None
-    if isinstance(photos, list) and photos:
-        photo_bytes = _load_photo_bytes(photos[0])
-        if photo_bytes:
-            photo_reader = ImageReader(BytesIO(photo_bytes))
+    c.drawRightString(width - LABEL_MARGIN, header_y + LABEL_HEADER_HEIGHT - 5 * mm, job_type_label)
 
-    qr_buffer = BytesIO(_qr_png_bytes(job.job_id))
-    qr_buffer.seek(0)
-
-    qr_x = left_margin
-    qr_y = left_margin
-    photo_x = page_width - right_margin - photo_box
-    photo_y = left_margin
-
-    c.setFont("Helvetica", 5.5)
-    c.setFillColor(colors.HexColor("#6b7280"))
-    c.drawString(qr_x, bottom_area_top - 5 * mm, "SCAN")
-    c.drawString(photo_x, bottom_area_top - 5 * mm, "PHOTO")
+    for fields, column_x in ((left_fields, layout["left_x"]), (right_fields, layout["right_x"])):
+        for field, field_x, field_y, field_height in _field_rows(fields, column_x, layout):
+            _draw_field_value(c, field, field_x, field_y, field_height, layout["col_width"])
     c.setFillColor(colors.black)
 
-    c.setStrokeColor(colors.HexColor("#d1d5db"))
-    c.setLineWidth(0.5)
-    c.roundRect(qr_x - 1 * mm, qr_y - 1 * mm, qr_size + 2 * mm, qr_size + 2 * mm, 2 * mm, stroke=1, fill=0)
-    c.roundRect(photo_x - 1 * mm, photo_y - 1 * mm, photo_box + 2 * mm, photo_box + 2 * mm, 2 * mm, stroke=1, fill=0)
-
-    _draw_image(c, ImageReader(qr_buffer), qr_x, qr_y, qr_size, qr_size)
+    qr_buffer = BytesIO(_qr_png_bytes(job.job_id))
+    _draw_image(c, ImageReader(qr_buffer), layout["qr_x"], layout["qr_y"], LABEL_QR_SIZE, LABEL_QR_SIZE)
 
-    if photo_reader:
-        _draw_image(c, photo_reader, photo_x, photo_y, photo_box, photo_box)
+    photo_x, photo_y = layout["photo_x"], layout["photo_y"]
+    if photo_bytes:
+        _draw_image(c, ImageReader(BytesIO(photo_bytes)), photo_x, photo_y, LABEL_PHOTO_BOX, LABEL_PHOTO_BOX)
     else:
         c.setFont("Helvetica", 6)
         c.setFillColor(colors.HexColor("#9ca3af"))
-        c.drawCentredString(photo_x + photo_box / 2, photo_y + photo_box / 2, "No photo")
+        c.drawCentredString(photo_x + LABEL_PHOTO_BOX / 2, photo_y + LABEL_PHOTO_BOX / 2, "No photo")
         c.setFillColor(colors.black)
 
     c.restoreState()
@@ -382,28 +498,67 @@ def _label_positions(
     return positions
 
 
-def generate_label_pdf(job: ItemJob, branch_name: str, factory_name: str | None = None) -> bytes:
+def _render_label_pdf(job: ItemJob, branch_name: str, factory_name: str | None, photo_bytes: bytes | None) -> bytes:
     buffer = BytesIO()
     label_width, label_height = _label_dimensions()
     c = canvas.Canvas(buffer, pagesize=(label_width, label_height))
-
-    _draw_label(c, job, branch_name, factory_name, 0, 0, label_width, label_height)
+    _draw_label(c, job, branch_name, factory_name, 0, 0, label_width, label_height, photo_bytes=photo_bytes)
     c.showPage()
     c.save()
     return buffer.getvalue()
 
 
-def generate_label_sheet_pdf(
-    labels: Iterable[tuple[ItemJob, str, str | None]],
-    columns: int = LABEL_SHEET_COLUMNS,
-    rows: int = LABEL_SHEET_ROWS,
-    start_position: int = 1,
+def generate_label_pdf(job: ItemJob, branch_name: str, factory_name: str | None = None) -> bytes:
+    photo_bytes = label_photo_cache.get(_first_photo(job))
+    return _render_label_pdf(job, branch_name, factory_name, photo_bytes)
+
+
+def label_digest(job: ItemJob, branch_name: str, factory_name: str | None = None) -> str:
+    """Hash of everything a single label renders from; the label's cache key and ETag."""
+    left_fields, right_fields = _build_label_fields(job, factory_name)
+    payload = {
+        "layout": LABEL_LAYOUT_VERSION,
+        "job_id": job.job_id,
+        "branch": branch_name,
+        "factory": factory_name,
+        "fields": [[field["label"], field["value"]] for field in [*left_fields, *right_fields]],
+        "photo": photo_cache_key(_first_photo(job)),
+    }
+    raw = json.dumps(payload, separators=(",", ":"), sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cached_label_pdf(
+    storage: StorageClient,
+    job: ItemJob,
+    branch_name: str,
+    factory_name: str | None = None,
+    *,
+    digest: str | None = None,
 ) -> bytes:
-    buffer = BytesIO()
-    c = canvas.Canvas(buffer, pagesize=A4)
+    digest = digest or label_digest(job, branch_name, factory_name)
+    key = f"{LABEL_CACHE_PREFIX}/{digest}.pdf"
+    cached = storage.get_bytes(key)
+    if cached is not None:
+        return cached
+
+    photo = _first_photo(job)
+    photo_bytes = label_photo_cache.get(photo)
+    pdf_bytes = _render_label_pdf(job, branch_name, factory_name, photo_bytes)
+    # A label drawn with the placeholder because the photo fetch failed must not
+    # be pinned under the digest of the label with the photo.
+    if photo_cache_key(photo) is None or photo_bytes is not None:
+        try:
+            storage.put_bytes(key, pdf_bytes, content_type="application/pdf")
+        except Exception as exc:
+            logger.warning("Label cache write failed for %s: %s", key, exc)
+    return pdf_bytes
+
+
+def _sheet_positions(columns: int, rows: int) -> list[tuple[float, float]]:
     page_width, page_height = A4
     label_width, label_height = _label_dimensions(columns=columns, rows=rows)
-    positions = _label_positions(
+    return _label_positions(
         page_width,
         page_height,
         label_width,
@@ -413,8 +568,82 @@ def generate_label_sheet_pdf(
         gap_x=LABEL_SHEET_GAP_X,
         gap_y=LABEL_SHEET_GAP_Y,
     )
+
+
+def _label_snapshot(job: ItemJob) -> SimpleNamespace:
+    return SimpleNamespace(**{field: getattr(job, field) for field in LABEL_JOB_FIELDS})
+
+
+def _render_label_pages(pages: list[list[tuple]], columns: int, rows: int) -> bytes:
+    """Render sheet pages; each page lists (position, job, branch, factory, photo bytes)."""
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    label_width, label_height = _label_dimensions(columns=columns, rows=rows)
+    positions = _sheet_positions(columns, rows)
+    for page in pages:
+        for position_index, job, branch_name, factory_name, photo_bytes in page:
+            x, y = positions[position_index]
+            _draw_label(c, job, branch_name, factory_name, x, y, label_width, label_height, photo_bytes=photo_bytes)
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _render_processes() -> int:
+    return settings.label_render_processes or os.cpu_count() or 1
+
+
+def _label_render_pool() -> ProcessPoolExecutor | None:
+    global _render_pool
+    processes = _render_processes()
+    if processes < 2:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            # spawn, not fork: the API process holds DB connections and threads.
+            _render_pool = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn"))
+        return _render_pool
+
+
+def _render_label_pages_parallel(pages: list[list[tuple]], columns: int, rows: int) -> bytes | None:
+    global _render_pool
+    pool = _label_render_pool()
+    if pool is None:
+        return None
+    chunk_size = max(LABEL_SHEET_MIN_CHUNK_PAGES, -(-len(pages) // _render_processes()))
+    chunks = [
+        [
+            [(position, _label_snapshot(job), branch, factory, photo) for position, job, branch, factory, photo in page]
+            for page in pages[start : start + chunk_size]
+        ]
+        for start in range(0, len(pages), chunk_size)
+    ]
+    try:
+        parts = list(pool.map(_render_label_pages, chunks, [columns] * len(chunks), [rows] * len(chunks)))
+    except BrokenProcessPool:
+        logger.warning("Label render pool broke; rendering in-process")
+        with _render_pool_lock:
+            _render_pool = None
+        return None
+
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(PdfReader(BytesIO(part)))
+    buffer = BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def generate_label_sheet_pdf(
+    labels: Iterable[tuple[ItemJob, str, str | None]],
+    columns: int = LABEL_SHEET_COLUMNS,
+    rows: int = LABEL_SHEET_ROWS,
+    start_position: int = 1,
+) -> bytes:
+    positions = _sheet_positions(columns, rows)
     if not positions:
-        c.save()
+        buffer = BytesIO()
+        canvas.Canvas(buffer, pagesize=A4).save()
         return buffer.getvalue()
 
     label_list = list(labels)
@@ -423,9 +652,16 @@ def generate_label_sheet_pdf(
     if start_position > labels_per_page:
         raise ValueError(f"start_position must be between 1 and {labels_per_page}")
 
+    # Fetch every photo up front and in parallel; drawing then never waits on storage.
+    photos = label_photo_cache.prefetch(
+        (_first_photo(job) for job, _branch_name, _factory_name in label_list),
+        max_workers=LABEL_PHOTO_PREFETCH_WORKERS,
+        timeout=settings.label_photo_prefetch_timeout,
+    )
+
     start_index = start_position - 1
     first_page_capacity = labels_per_page - start_index
-    current_page = 0
+    pages: list[list[tuple]] = [[]]
     for index, (job, branch_name, factory_name) in enumerate(label_list):
         if index < first_page_capacity:
             page_index = 0
@@ -434,34 +670,43 @@ def generate_label_sheet_pdf(
             adjusted = index - first_page_capacity
             page_index = 1 + adjusted // labels_per_page
             position_index = adjusted % labels_per_page
-        while current_page < page_index:
-            c.showPage()
-            current_page += 1
-        x, y = positions[position_index]
-        _draw_label(c, job, branch_name, factory_name, x, y, label_width, label_height)
+        while len(pages) <= page_index:
+            pages.append([])
+        photo_bytes = photos.get(photo_cache_key(_first_photo(job)))
+        pages[page_index].append((position_index, job, branch_name, factory_name, photo_bytes))
+
+    if len(pages) >= LABEL_SHEET_PARALLEL_MIN_PAGES:
+        merged = _render_label_pages_parallel(pages, columns, rows)
+        if merged is not None:
+            return merged
+    return _render_label_pages(pages, columns, rows)
 
-    c.showPage()
-    c.save()
-    return buffer.getvalue()
 
+def generate_manifest_pdf(batch: Batch, jobs: Iterable[ItemJob], *, live_status: bool = True) -> bytes:
+    """Render a voucher manifest.
 
-def generate_manifest_pdf(batch: Batch, jobs: Iterable[ItemJob]) -> bytes:
+    With ``live_status`` off the voucher and job statuses are left out, so a
+    copy stored at dispatch does not go stale as the items move on.
+    """
     buffer = BytesIO()
     c = canvas.Canvas(buffer, pagesize=A4)
     c.setFont("Helvetica-Bold", 14)
     c.drawString(20 * mm, 280 * mm, f"Voucher Manifest: {batch.batch_code}")
 
     c.setFont("Helvetica", 10)
-    c.drawString(20 * mm, 272 * mm, f"Status: {batch.status}")
-    c.drawString(20 * mm, 266 * mm, f"Item Count: {batch.item_count}")
+    lines = [f"Status: {batch.status}"] if live_status else []
+    lines.append(f"Item Count: {batch.item_count}")
     if batch.factory_name:
-        c.drawString(20 * mm, 260 * mm, f"Factory: {batch.factory_name}")
+        lines.append(f"Factory: {batch.factory_name}")
+    for index, line in enumerate(lines):
+        c.drawString(20 * mm, (272 - 6 * index) * mm, line)
 
     y = 246 * mm
     c.setFont("Helvetica-Bold", 10)
     c.drawString(20 * mm, y, "Job ID")
     c.drawString(60 * mm, y, "Description")
-    c.drawString(150 * mm, y, "Status")
+    if live_status:
+        c.drawString(150 * mm, y, "Status")
 
     c.setFont("Helvetica", 9)
     y -= 8 * mm
@@ -471,7 +716,8 @@ def generate_manifest_pdf(batch: Batch, jobs: Iterable[ItemJob]) -> bytes:
             y = 270 * mm
         c.drawString(20 * mm, y, job.job_id)
         c.drawString(60 * mm, y, (job.item_description or "")[:40])
-        c.drawString(150 * mm, y, job.current_status)
+        if live_status:
+            c.drawString(150 * mm, y, job.current_status)
         y -= 6 * mm
 
     c.showPage()
@@ -0,0 +1,171 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from app.utils.thumbnails import render_thumbnails
+
+logger = logging.getLogger(__name__)
+
+LABEL_PHOTO_PX = 256
+MISS_TTL_SECONDS = 60.0
+
+
+def photo_cache_key(photo) -> Optional[str]:
+    if not isinstance(photo, dict):
+        return None
+    return photo.get("key") or photo.get("thumb_url") or photo.get("url") or None
+
+
+class LabelPhotoCache:
+    """Two-level LRU of label-sized JPEGs, keyed by storage key.
+
+    Upload keys are never reused for different content, so entries do not need
+    invalidating; they only age out. Failed fetches are remembered briefly so a
+    sheet full of unreachable photos falls back to the placeholder at once.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[dict], Optional[bytes]],
+        *,
+        max_entries: int,
+        disk_dir: Optional[str],
+        max_disk_entries: int,
+    ) -> None:
+        self._loader = loader
+        self._max_entries = max_entries
+        self._max_disk_entries = max_disk_entries
+        self._disk_dir = Path(disk_dir) if disk_dir else None
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        # Deadlines share one TTL, so insertion order is expiry order.
+        self._misses: OrderedDict[str, float] = OrderedDict()
+        self._lock = threading.Lock()
+        # Eviction lists and stats the whole directory, so it only runs once
+        # the file count passes a high-water mark, then trims back to the limit.
+        self._disk_high_water = max_disk_entries + max(max_disk_entries // 4, 1)
+        self._disk_count = 0
+        if self._disk_dir:
+            self._disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_count = sum(1 for _ in self._disk_dir.glob("*.jpg"))
+
+    def _disk_path(self, cache_key: str) -> Path:
+        assert self._disk_dir
+        return self._disk_dir / f"{hashlib.sha256(cache_key.encode('utf-8')).hexdigest()}.jpg"
+
+    def _remember(self, cache_key: str, content: bytes) -> None:
+        with self._lock:
+            self._entries[cache_key] = content
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _remember_miss(self, cache_key: str) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._misses.pop(cache_key, None)
+            self._misses[cache_key] = now + MISS_TTL_SECONDS
+            while self._misses and (
+                len(self._misses) > self._max_entries or next(iter(self._misses.values())) <= now
+            ):
+                self._misses.popitem(last=False)
+
+    def _read_disk(self, cache_key: str) -> Optional[bytes]:
+        if not self._disk_dir:
+            return None
+        path = self._disk_path(cache_key)
+        try:
+            content = path.read_bytes()
+        except OSError:
+            return None
+        os.utime(path)
+        return content
+
+    def _write_disk(self, cache_key: str, content: bytes) -> None:
+        if not self._disk_dir:
+            return
+        path = self._disk_path(cache_key)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Label photo cache write failed: %s", exc)
+            return
+        with self._lock:
+            self._disk_count += 1
+            if self._disk_count <= self._disk_high_water:
+                return
+            self._disk_count = self._max_disk_entries
+        self._evict_disk()
+
+    def _evict_disk(self) -> None:
+        assert self._disk_dir
+        try:
+            files = sorted(self._disk_dir.glob("*.jpg"), key=lambda item: item.stat().st_mtime)
+            for stale in files[: max(len(files) - self._max_disk_entries, 0)]:
+                stale.unlink(missing_ok=True)
+        except OSError as exc:
+            logger.warning("Label photo cache eviction failed: %s", exc)
+
+    def get(self, photo) -> Optional[bytes]:
+        cache_key = photo_cache_key(photo)
+        if not cache_key:
+            return None
+        with self._lock:
+            content = self._entries.get(cache_key)
+            if content is not None:
+                self._entries.move_to_end(cache_key)
+                return content
+            deadline = self._misses.get(cache_key)
+            if deadline is not None:
+                if deadline > time.monotonic():
+                    return None
+                del self._misses[cache_key]
+
+        content = self._read_disk(cache_key)
+        if content is None:
+            content = self._fetch(photo)
+            if content is None:
+                self._remember_miss(cache_key)
+                return None
+            self._write_disk(cache_key, content)
+        self._remember(cache_key, content)
+        return content
+
+    def _fetch(self, photo: dict) -> Optional[bytes]:
+        original = self._loader(photo)
+        if not original:
+            return None
+        try:
+            return render_thumbnails(original, sizes=(LABEL_PHOTO_PX,))[LABEL_PHOTO_PX]
+        except Exception:
+            return None
+
+    def prefetch(self, photos: Iterable, *, max_workers: int, timeout: float) -> dict[str, bytes]:
+        """Fetch photos concurrently; anything not ready by the deadline is left out."""
+        pending = {}
+        for photo in photos:
+            cache_key = photo_cache_key(photo)
+            if cache_key and cache_key not in pending:
+                pending[cache_key] = photo
+        if not pending:
+            return {}
+
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(pending)), thread_name_prefix="label-photos")
+        futures = {cache_key: executor.submit(self.get, photo) for cache_key, photo in pending.items()}
+        wait(futures.values(), timeout=timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+        results = {}
+        for cache_key, future in futures.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                content = future.result()
+                if content:
+                    results[cache_key] = content
+        return results
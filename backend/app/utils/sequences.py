@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import JobIdCounter, VoucherCounter
+from app.utils.vouchers import format_voucher_code
+
+JOB_ID_PREFIX = "DJ"
+
+
+def format_job_id(year: int, number: int) -> str:
+    return f"{JOB_ID_PREFIX}-{year}-{number:06d}"
+
+
+def _reserve(db: Session, counter: type[JobIdCounter] | type[VoucherCounter], count: int, **keys: int) -> range:
+    """Atomically reserve ``count`` consecutive values from a counter row.
+
+    The row is upserted with ``RETURNING`` so concurrent callers are
+    serialized on the row lock instead of racing on ``MAX(code)``. The
+    reservation belongs to the caller's transaction and is released again on
+    rollback, so committed codes stay gap-free.
+    """
+
+    if count < 1:
+        raise ValueError("count must be at least 1")
+    stmt = (
+        insert(counter)
+        .values(**keys, last_value=count)
+        .on_conflict_do_update(
+            index_elements=list(keys),
+            set_={"last_value": counter.last_value + count},
+        )
+        .returning(counter.last_value)
+    )
+    last_value = db.execute(stmt).scalar_one()
+    return range(last_value - count + 1, last_value + 1)
+
+
+def reserve_job_numbers(db: Session, count: int = 1, *, year: int | None = None) -> range:
+    year = year or datetime.now(timezone.utc).year
+    return _reserve(db, JobIdCounter, count, year=year)
+
+
+def reserve_job_ids(db: Session, count: int, *, year: int | None = None) -> list[str]:
+    year = year or datetime.now(timezone.utc).year
+    return [format_job_id(year, number) for number in reserve_job_numbers(db, count, year=year)]
+
+
+def next_job_id(db: Session) -> str:
+    return reserve_job_ids(db, 1)[0]
+
+
+def next_voucher_code(db: Session, *, year: int, month: int) -> str:
+    sequence = _reserve(db, VoucherCounter, 1, year=year, month=month)[0]
+    return format_voucher_code(year, month, sequence)
@@ -1,14 +1,36 @@
 import os
+import shutil
 import uuid
+from functools import lru_cache
+from io import BytesIO
 from pathlib import Path
-from typing import Tuple
+from typing import BinaryIO, Iterator, Optional, Tuple
 
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
 
 from app.config import get_settings
 
 settings = get_settings()
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Objects above the threshold go up as S3 multipart uploads, so at most
+# max_concurrency parts are buffered per upload.
+S3_TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=2,
+    io_chunksize=UPLOAD_CHUNK_SIZE,
+)
+
+
+def _close_after(chunks: Iterator[bytes], handle) -> Iterator[bytes]:
+    try:
+        yield from chunks
+    finally:
+        handle.close()
+
 
 class StorageClient:
     def __init__(self) -> None:
@@ -35,15 +57,118 @@ class StorageClient:
 
     def upload_file(self, filename: str, content: bytes) -> Tuple[str, str, str]:
         ext = Path(filename).suffix.lower().lstrip(".")
+        return self.upload_fileobj(BytesIO(content), ext=ext)
+
+    def url_for(self, key: str) -> str:
+        if self.backend == "s3":
+            return f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{key}"
+        return f"/storage/{key}"
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = self.url_for("")
+        if url.startswith(prefix):
+            return url[len(prefix) :] or None
+        # Local URLs may have been stored with the API host in front.
+        marker = "/storage/"
+        if self.backend != "s3" and marker in url:
+            return url.split(marker, 1)[1] or None
+        return None
+
+    def upload_fileobj(
+        self,
+        fileobj: BinaryIO,
+        *,
+        ext: str,
+        content_type: Optional[str] = None,
+    ) -> Tuple[str, str, str]:
         key = f"uploads/{uuid.uuid4().hex}.{ext or 'bin'}"
+        self.put_fileobj(key, fileobj, content_type=content_type)
+        url = self.url_for(key)
+        return key, url, url
+
+    def put_fileobj(self, key: str, fileobj: BinaryIO, *, content_type: Optional[str] = None) -> None:
         if self.backend == "s3":
             assert self._s3
-            self._s3.put_object(Bucket=settings.s3_bucket, Key=key, Body=content)
-            url = f"{settings.s3_endpoint_url.rstrip('/')}/{settings.s3_bucket}/{key}"
-            return key, url, url
+            extra_args = {"ContentType": content_type} if content_type else None
+            self._s3.upload_fileobj(
+                fileobj,
+                settings.s3_bucket,
+                key,
+                ExtraArgs=extra_args,
+                Config=S3_TRANSFER_CONFIG,
+            )
+            return
         path = Path(settings.local_storage_path) / key
         path.parent.mkdir(parents=True, exist_ok=True)
-        with path.open("wb") as handle:
-            handle.write(content)
-        url = f"/storage/{key}"
-        return key, url, url
+        try:
+            with path.open("wb") as handle:
+                shutil.copyfileobj(fileobj, handle, UPLOAD_CHUNK_SIZE)
+        except BaseException:
+            if path.exists():
+                os.remove(path)
+            raise
+
+    def put_bytes(self, key: str, content: bytes, *, content_type: Optional[str] = None) -> None:
+        self.put_fileobj(key, BytesIO(content), content_type=content_type)
+
+    def get_bytes(self, key: str) -> Optional[bytes]:
+        """Like read_bytes, but None when the object does not exist."""
+        try:
+            return self.read_bytes(key)
+        except FileNotFoundError:
+            return None
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}:
+                return None
+            raise
+
+    def iter_chunks(self, key: str) -> Optional[Iterator[bytes]]:
+        """Stream an object in UPLOAD_CHUNK_SIZE pieces; None when it does not exist.
+
+        The object is opened before returning, so a missing key is reported
+        up front rather than partway through a response.
+        """
+        if self.backend == "s3":
+            assert self._s3
+            try:
+                body = self._s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"]
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}:
+                    return None
+                raise
+            return _close_after(body.iter_chunks(UPLOAD_CHUNK_SIZE), body)
+        try:
+            handle = (Path(settings.local_storage_path) / key).open("rb")
+        except FileNotFoundError:
+            return None
+        return _close_after(iter(lambda: handle.read(UPLOAD_CHUNK_SIZE), b""), handle)
+
+    def exists(self, key: str) -> bool:
+        if self.backend == "s3":
+            assert self._s3
+            try:
+                self._s3.head_object(Bucket=settings.s3_bucket, Key=key)
+            except ClientError as exc:
+                if exc.response.get("Error", {}).get("Code") in {"NoSuchKey", "404"}:
+                    return False
+                raise
+            return True
+        return (Path(settings.local_storage_path) / key).exists()
+
+    def delete(self, key: str) -> None:
+        if self.backend == "s3":
+            assert self._s3
+            self._s3.delete_object(Bucket=settings.s3_bucket, Key=key)
+            return
+        (Path(settings.local_storage_path) / key).unlink(missing_ok=True)
+
+    def read_bytes(self, key: str) -> bytes:
+        if self.backend == "s3":
+            assert self._s3
+            return self._s3.get_object(Bucket=settings.s3_bucket, Key=key)["Body"].read()
+        return (Path(settings.local_storage_path) / key).read_bytes()
+
+
+@lru_cache
+def get_storage() -> StorageClient:
+    return StorageClient()
@@ -0,0 +1,168 @@
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from PIL import Image, ImageOps
+from sqlalchemy import func, literal
+from sqlalchemy.dialects.postgresql import JSONPATH
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import ItemJob
+from app.utils.storage import StorageClient
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Smallest rendition first: it is the one list views and labels use.
+THUMBNAIL_SIZES = (256, 1024)
+THUMBNAIL_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif"}
+THUMBNAIL_QUALITY = 82
+
+# Jobs with a photo still served at full size that has not already failed to
+# render; the backfill skips everything else unless asked to verify.
+PENDING_PHOTOS_PATH = literal(
+    "$[*] ? ((@.thumb_url == @.url || !exists(@.thumb_url)) && !exists(@.thumb_failed))", JSONPATH
+)
+
+_executor = ThreadPoolExecutor(max_workers=settings.thumbnail_workers, thread_name_prefix="thumbnails")
+
+
+def thumbnail_key(key: str, size: int) -> str:
+    path = PurePosixPath(key)
+    return str(path.with_name(f"{path.stem}_{size}.jpg"))
+
+
+def supports_thumbnails(key: str) -> bool:
+    return PurePosixPath(key).suffix.lower().lstrip(".") in THUMBNAIL_EXTENSIONS
+
+
+def render_thumbnails(content: bytes, sizes: tuple[int, ...] = THUMBNAIL_SIZES) -> dict[int, bytes]:
+    with Image.open(BytesIO(content)) as source:
+        # draft() lets the JPEG decoder downscale while decoding, so a 12 MP
+        # photo is never fully materialised just to produce a 1024px copy.
+        source.draft("RGB", (max(sizes), max(sizes)))
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    renditions = {}
+    for size in sorted(sizes, reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+        renditions[size] = buffer.getvalue()
+    return renditions
+
+
+def generate_thumbnails(storage: StorageClient, key: str) -> dict[int, str]:
+    renditions = render_thumbnails(storage.read_bytes(key))
+    keys = {}
+    for size, content in renditions.items():
+        keys[size] = thumbnail_key(key, size)
+        storage.put_bytes(keys[size], content, content_type="image/jpeg")
+    return keys
+
+
+def _log_failure(key: str, future: Future) -> None:
+    exc = future.exception()
+    if exc is not None:
+        logger.warning("Thumbnail generation failed for %s: %s", key, exc)
+
+
+def schedule_thumbnails(storage: StorageClient, key: str) -> bool:
+    """Queue renditions for an uploaded original.
+
+    The upload hands out the original as thumb_url, since the rendition does
+    not exist yet. Saving the photos on a job links renditions that have landed
+    (link_existing_thumbnails), and backfill_photo_thumbnails catches photos
+    saved before theirs did. A failed render or a restart only leaves the
+    photo on its original.
+    """
+    if not supports_thumbnails(key):
+        return False
+    future = _executor.submit(generate_thumbnails, storage, key)
+    future.add_done_callback(lambda done: _log_failure(key, done))
+    return True
+
+
+def _points_at_original(photo) -> bool:
+    if not isinstance(photo, dict) or not photo.get("key") or not supports_thumbnails(photo["key"]):
+        return False
+    thumb_url = photo.get("thumb_url")
+    return not thumb_url or thumb_url == photo.get("url")
+
+
+def _needs_thumbnail(photo, storage: StorageClient, *, retry_failed: bool = False) -> bool:
+    if not isinstance(photo, dict) or not photo.get("key") or not supports_thumbnails(photo["key"]):
+        return False
+    if photo.get("thumb_failed") and not retry_failed:
+        return False
+    if _points_at_original(photo):
+        return True
+    # Uploads from before renditions were confirmed may point at one that
+    # was never written.
+    small_key = thumbnail_key(photo["key"], THUMBNAIL_SIZES[0])
+    return photo["thumb_url"].endswith(small_key) and not storage.exists(small_key)
+
+
+def _thumbnail_url(storage: StorageClient, photo: dict, key: str) -> str:
+    # Keep whatever host prefix the original URL was stored with.
+    url = photo.get("url") or ""
+    if url.endswith(photo["key"]):
+        return f"{url[: -len(photo['key'])]}{key}"
+    return storage.url_for(key)
+
+
+def link_existing_thumbnails(storage: StorageClient, photos: list) -> list:
+    """Point photos still on their original at a rendition already in storage."""
+    linked = []
+    for photo in photos:
+        if _points_at_original(photo):
+            small_key = thumbnail_key(photo["key"], THUMBNAIL_SIZES[0])
+            if storage.exists(small_key):
+                photo = {**photo, "thumb_url": _thumbnail_url(storage, photo, small_key)}
+        linked.append(photo)
+    return linked
+
+
+def backfill_photo_thumbnails(
+    db: Session, storage: StorageClient, *, chunk_size: int = 100, verify: bool = False
+) -> int:
+    """Switch photos over to renditions, rendering only the ones that are missing.
+
+    Photos whose render fails are marked ``thumb_failed`` and left alone after
+    that. ``verify`` walks every job with photos instead, re-rendering
+    renditions that a thumb_url names but storage lacks and retrying failures.
+    """
+    query = db.query(ItemJob.id).filter(ItemJob.photos.isnot(None), func.jsonb_array_length(ItemJob.photos) > 0)
+    if not verify:
+        query = query.filter(func.jsonb_path_exists(ItemJob.photos, PENDING_PHOTOS_PATH))
+    job_ids = [row.id for row in query]
+    updated = 0
+    for start in range(0, len(job_ids), chunk_size):
+        jobs = db.query(ItemJob).filter(ItemJob.id.in_(job_ids[start : start + chunk_size])).all()
+        linked = {job.id: link_existing_thumbnails(storage, job.photos or []) for job in jobs}
+        pending = {
+            photo["key"]: _executor.submit(generate_thumbnails, storage, photo["key"])
+            for photos in linked.values()
+            for photo in photos
+            if _needs_thumbnail(photo, storage, retry_failed=verify)
+        }
+        for job in jobs:
+            photos = []
+            for photo in linked[job.id]:
+                future = pending.get(photo.get("key"))
+                if future is not None:
+                    try:
+                        keys = future.result()
+                    except Exception as exc:
+                        logger.warning("Thumbnail backfill failed for %s: %s", photo["key"], exc)
+                        photo = {**photo, "thumb_failed": True}
+                    else:
+                        photo = {key: value for key, value in photo.items() if key != "thumb_failed"}
+                        photo["thumb_url"] = _thumbnail_url(storage, photo, keys[THUMBNAIL_SIZES[0]])
+                photos.append(photo)
+            if photos != job.photos:
+                job.photos = photos
+                updated += 1
+        db.commit()
+    return updated
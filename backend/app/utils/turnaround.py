@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import uuid
+from collections.abc import Iterable
+from datetime import datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models import JobStageTiming, Status, StatusEvent
+
+TRACKED_STATUSES = [
+    Status.PURCHASED,
+    Status.PACKED_READY,
+    Status.DISPATCHED_TO_FACTORY,
+    Status.RECEIVED_AT_FACTORY,
+    Status.RETURNED_FROM_FACTORY,
+    Status.RECEIVED_AT_SHOP,
+    Status.ADDED_TO_STOCK,
+    Status.HANDED_TO_DELIVERY,
+    Status.DELIVERED_TO_CUSTOMER,
+]
+
+TURNAROUND_STAGES: list[tuple[str, Status, tuple[Status, ...]]] = [
+    ("Purchase->Packed", Status.PURCHASED, (Status.PACKED_READY,)),
+    ("Packed->Dispatch", Status.PACKED_READY, (Status.DISPATCHED_TO_FACTORY,)),
+    ("Dispatch->FactoryReceive", Status.DISPATCHED_TO_FACTORY, (Status.RECEIVED_AT_FACTORY,)),
+    ("FactoryReceive->Return", Status.RECEIVED_AT_FACTORY, (Status.RETURNED_FROM_FACTORY,)),
+    ("Return->ShopReceive", Status.RETURNED_FROM_FACTORY, (Status.RECEIVED_AT_SHOP,)),
+    ("ShopReceive->Stock/Delivery", Status.RECEIVED_AT_SHOP, (Status.ADDED_TO_STOCK, Status.HANDED_TO_DELIVERY)),
+    ("Delivery->Delivered", Status.HANDED_TO_DELIVERY, (Status.DELIVERED_TO_CUSTOMER,)),
+]
+
+
+def stage_column(status: Status) -> str:
+    return f"{status.value.lower()}_at"
+
+
+# When a job last reached any stage after purchase. Every turnaround stage ends
+# at or before it, so ``LATEST_STAGE_AT >= cutoff`` narrows the report to jobs
+# that finished a stage in the window; ix_job_stage_timings_latest_stage_at
+# indexes exactly this expression.
+LATEST_STAGE_AT = func.greatest(*[getattr(JobStageTiming, stage_column(status)) for status in TRACKED_STATUSES[1:]])
+
+
+def record_stage_timings(db: Session, events: Iterable[StatusEvent]) -> None:
+    """Upsert the first time each job reached a tracked status.
+
+    Call this next to every ``db.add(StatusEvent(...))`` so the turnaround
+    report never has to scan ``status_events``. Postgres ``LEAST`` ignores
+    NULLs, which keeps the earliest timestamp when a job re-enters a status.
+    """
+
+    rows: dict[uuid.UUID, dict[str, datetime]] = {}
+    for event in events:
+        if event.to_status not in TRACKED_STATUSES or event.timestamp is None:
+            continue
+        column = stage_column(event.to_status)
+        row = rows.setdefault(event.job_id, {})
+        if column not in row or event.timestamp < row[column]:
+            row[column] = event.timestamp
+    if not rows:
+        return
+
+    columns = sorted({column for row in rows.values() for column in row})
+    stmt = insert(JobStageTiming).values(
+        [{"job_id": job_id, **{column: row.get(column) for column in columns}} for job_id, row in rows.items()]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobStageTiming.job_id],
+        set_={column: func.least(getattr(JobStageTiming, column), stmt.excluded[column]) for column in columns},
+    )
+    db.execute(stmt)
+
+
+def backfill_stage_timings(db: Session) -> int:
+    columns = [stage_column(status) for status in TRACKED_STATUSES]
+    source = select(
+        StatusEvent.job_id,
+        *[
+            func.min(StatusEvent.timestamp).filter(StatusEvent.to_status == status).label(stage_column(status))
+            for status in TRACKED_STATUSES
+        ],
+    ).group_by(StatusEvent.job_id)
+    stmt = insert(JobStageTiming).from_select(["job_id", *columns], source)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[JobStageTiming.job_id],
+        set_={column: stmt.excluded[column] for column in columns},
+    )
+    return db.execute(stmt).rowcount
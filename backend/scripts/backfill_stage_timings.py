@@ -0,0 +1,16 @@
+from app.db import SessionLocal
+from app.utils.turnaround import backfill_stage_timings
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        count = backfill_stage_timings(db)
+        db.commit()
+        print(f"Backfilled stage timings for {count} jobs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+import sys
+
+from app.db import SessionLocal
+from app.utils.storage import get_storage
+from app.utils.thumbnails import backfill_photo_thumbnails
+
+
+def main() -> None:
+    # --verify also re-renders thumb_urls that name a missing rendition and
+    # retries photos that failed before; the scheduled run skips both.
+    verify = "--verify" in sys.argv[1:]
+    db = SessionLocal()
+    try:
+        count = backfill_photo_thumbnails(db, get_storage(), verify=verify)
+        print(f"Backfilled photo thumbnails for {count} jobs")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import logging
+import multiprocessing
+import signal
+import threading
+
+from app.config import get_settings
+from app.db import SessionLocal
+from app.routers.documents import DOCUMENT_HANDLERS
+from app.utils.document_jobs import run_worker
+from app.utils.storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+
+def worker_main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(SessionLocal, get_storage(), DOCUMENT_HANDLERS, stop=stop)
+
+
+def main() -> None:
+    count = max(get_settings().document_workers, 1)
+    if count == 1:
+        worker_main()
+        return
+    logging.basicConfig(level=logging.INFO)
+    processes = [multiprocessing.Process(target=worker_main, name=f"document-worker-{index}") for index in range(count)]
+
+    def shutdown(signum, _frame) -> None:
+        # Each child stops after its current job on SIGTERM; join below waits for them.
+        logger.info("Stopping %d document workers on signal %d", count, signum)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+
+    for process in processes:
+        process.start()
+    # Installed after the fork, so the children keep only their own handlers.
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+    logger.info("Started %d document workers", count)
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
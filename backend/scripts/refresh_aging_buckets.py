@@ -0,0 +1,16 @@
+from app.db import SessionLocal
+from app.utils.aging import refresh_aging_buckets
+
+
+def main() -> None:
+    db = SessionLocal()
+    try:
+        refreshed_at = refresh_aging_buckets(db)
+        db.commit()
+        print(f"Refreshed pending-aging buckets as of {refreshed_at.isoformat()}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+import os
+import uuid
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from app.models import Branch, ItemJob, Role, Status
+
+# Point this at a database migrated to head to run the tests that need Postgres;
+# they are skipped without it.
+PLAN_TEST_DATABASE_URL = os.environ.get("PLAN_TEST_DATABASE_URL")
+
+
+class FakeResult:
+    def __init__(self, value) -> None:
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+    scalar_one = scalar_one_or_none = scalar
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: self.value)
+
+    def __iter__(self):
+        return iter(self.value or ())
+
+    def partitions(self):
+        if self.value:
+            yield self.value
+
+
+class FakeSession:
+    """A stand-in Session for unit tests that never reach Postgres.
+
+    ``execute`` records the statement and answers with the next of ``results``
+    (``None`` once they run out); ``get`` looks keys up in ``objects``.
+    """
+
+    def __init__(self, *results, objects=None) -> None:
+        self.results = list(results)
+        self.objects = dict(objects or {})
+        self.statements = []
+        self.info = {}
+        self.commits = 0
+        self.rollbacks = 0
+        self.closed = False
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return FakeResult(self.results.pop(0) if self.results else None)
+
+    def get(self, _model, key, **_kwargs):
+        return self.objects.get(key)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_session():
+    return FakeSession
+
+
+@pytest.fixture(scope="session")
+def pg_engine():
+    if not PLAN_TEST_DATABASE_URL:
+        pytest.skip("PLAN_TEST_DATABASE_URL is not set")
+    engine = create_engine(PLAN_TEST_DATABASE_URL)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def pg_db(pg_engine):
+    """A Postgres session rolled back after the test; its commits only release savepoints."""
+    with pg_engine.connect() as conn:
+        transaction = conn.begin()
+        session = Session(bind=conn, join_transaction_mode="create_savepoint")
+        try:
+            yield session
+        finally:
+            session.close()
+            transaction.rollback()
+
+
+@pytest.fixture
+def pg_job(pg_db):
+    """Adds jobs on a branch of their own to ``pg_db``."""
+    branch = Branch(name=f"test-{uuid.uuid4().hex[:8]}")
+    pg_db.add(branch)
+    pg_db.flush()
+
+    def add_job(status: Status = Status.PURCHASED, **fields) -> ItemJob:
+        job = ItemJob(
+            job_id=f"T-{uuid.uuid4().hex[:12]}",
+            branch_id=branch.id,
+            item_description="Ring",
+            current_status=status,
+            current_holder_role=Role.PURCHASE,
+            **fields,
+        )
+        pg_db.add(job)
+        pg_db.flush()
+        return job
+
+    return add_job
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import OperationalError
+
+from app.models import JobAgingBucket, ReportSnapshot, Status
+from app.utils.aging import AGING_SNAPSHOT, aging_bucket, note_aging_move, record_aging_moves
+
+REFRESHED_AT = datetime(2026, 3, 20, 12, 0, tzinfo=timezone.utc)
+
+
+def test_aging_bucket_boundaries():
+    def days_ago(days, hours=0):
+        return REFRESHED_AT - timedelta(days=days, hours=hours)
+
+    assert aging_bucket(days_ago(2, hours=23), REFRESHED_AT) == "bucket_0_2"
+    assert aging_bucket(days_ago(3), REFRESHED_AT) == "bucket_3_7"
+    assert aging_bucket(days_ago(15, hours=23), REFRESHED_AT) == "bucket_8_15"
+    assert aging_bucket(days_ago(30), REFRESHED_AT) == "bucket_16_30"
+    assert aging_bucket(days_ago(31), REFRESHED_AT) == "bucket_30_plus"
+    # Touched after the refresh, or not flushed yet.
+    assert aging_bucket(REFRESHED_AT + timedelta(minutes=5), REFRESHED_AT) == "bucket_0_2"
+    assert aging_bucket(None, REFRESHED_AT) == "bucket_0_2"
+
+
+def test_record_aging_moves_nets_deltas_into_one_upsert(fake_session):
+    db = fake_session(REFRESHED_AT)
+    now = REFRESHED_AT + timedelta(hours=1)
+    note_aging_move(db, (Status.PURCHASED, REFRESHED_AT - timedelta(days=10)), (Status.PACKED_READY, now))
+    note_aging_move(db, (Status.PURCHASED, REFRESHED_AT - timedelta(days=9)), (Status.PACKED_READY, now))
+    note_aging_move(db, None, (Status.PURCHASED, now))
+    note_aging_move(db, (Status.PURCHASED, now), None)
+
+    record_aging_moves(db)
+
+    assert db.info == {}
+    assert len(db.statements) == 2
+    compiled = db.statements[1].compile(dialect=postgresql.dialect())
+    assert "job_aging_buckets.job_count + excluded.job_count" in str(compiled)
+    rows = sorted(
+        (compiled.params[f"status_m{i}"], compiled.params[f"bucket_m{i}"], compiled.params[f"job_count_m{i}"])
+        for i in range(2)
+    )
+    assert rows == [(Status.PACKED_READY, "bucket_0_2", 2), (Status.PURCHASED, "bucket_8_15", -2)]
+
+
+def test_record_aging_moves_skips_without_moves(fake_session):
+    db = fake_session()
+    record_aging_moves(db)
+    assert db.statements == []
+
+
+def _bucket_count(db, status: Status, bucket: str) -> int:
+    return db.execute(
+        select(JobAgingBucket.job_count).where(JobAgingBucket.status == status, JobAgingBucket.bucket == bucket)
+    ).scalar() or 0
+
+
+def _lock_snapshot_row(conn, **for_update):
+    conn.execute(select(ReportSnapshot.name).where(ReportSnapshot.name == AGING_SNAPSHOT).with_for_update(**for_update))
+
+
+def test_record_aging_moves_waits_for_a_refresh_but_not_for_other_transitions_on_postgres(pg_engine, pg_db):
+    now = datetime.now(timezone.utc)
+    before = _bucket_count(pg_db, Status.ON_HOLD, "bucket_0_2")
+    pg_db.execute(text("SET LOCAL lock_timeout = '500ms'"))
+    pg_db.commit()
+
+    with pg_engine.connect() as other, other.begin():
+        # A refresh holds the row FOR UPDATE; transitions wait for it to land.
+        _lock_snapshot_row(other)
+        note_aging_move(pg_db, None, (Status.ON_HOLD, now))
+        with pytest.raises(OperationalError, match="lock timeout"):
+            record_aging_moves(pg_db)
+    pg_db.rollback()
+
+    with pg_engine.connect() as other, other.begin():
+        # Another transition holds the same KEY SHARE lock; both go ahead.
+        _lock_snapshot_row(other, read=True, key_share=True)
+        note_aging_move(pg_db, None, (Status.ON_HOLD, now))
+        note_aging_move(pg_db, None, (Status.ON_HOLD, now))
+        record_aging_moves(pg_db)
+    assert _bucket_count(pg_db, Status.ON_HOLD, "bucket_0_2") == before + 2
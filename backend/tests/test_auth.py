@@ -1,11 +1,16 @@
+import asyncio
+import time
+import uuid
 from types import SimpleNamespace
 
 import pytest
 from fastapi import HTTPException
 from jose import jwt
 
+from app import deps
 from app.config import get_settings
-from app.deps import extract_access_token
+from app.deps import ActiveUserCache, extract_access_token, get_current_user, user_cache
+from app.models import Role, User
 from app.routers.auth import _request_is_secure
 from app.utils.security import create_access_token, create_refresh_token, new_jti
 
@@ -54,3 +59,47 @@ def test_request_is_secure_prefers_forwarded_proto():
         url=SimpleNamespace(scheme="http"),
     )
     assert _request_is_secure(request) is True
+
+
+def test_active_user_cache_returns_copy_until_invalidated():
+    user = User(id=uuid.uuid4(), username="packer", roles=[Role.PACKING], is_active=True)
+    cache = ActiveUserCache(ttl_seconds=60)
+    cache.set(user)
+
+    cached = cache.get(user.id)
+    assert cached is not user
+    assert cached.username == "packer"
+    assert cached.roles == [Role.PACKING]
+
+    cache.invalidate(user.id)
+    assert cache.get(user.id) is None
+
+
+def test_active_user_cache_expires_entries():
+    user = User(id=uuid.uuid4(), username="packer", roles=[Role.PACKING], is_active=True)
+    cache = ActiveUserCache(ttl_seconds=0.01)
+    cache.set(user)
+    time.sleep(0.02)
+    assert cache.get(user.id) is None
+
+
+def test_get_current_user_loads_once_then_serves_cache(monkeypatch):
+    user = User(id=uuid.uuid4(), username="packer", roles=[Role.PACKING], is_active=True)
+    token = create_access_token(subject=str(user.id), roles=["Packing"], expires_minutes=5)
+    credentials = SimpleNamespace(scheme="Bearer", credentials=token)
+    request = SimpleNamespace(cookies={})
+    loads = []
+
+    async def load_user(user_id):
+        loads.append(user_id)
+        return user if user.id == user_id else None
+
+    monkeypatch.setattr(deps, "_load_user", load_user)
+    user_cache.invalidate(user.id)
+
+    first = asyncio.run(get_current_user(request, credentials))
+    second = asyncio.run(get_current_user(request, credentials))
+
+    assert first.username == second.username == "packer"
+    assert loads == [user.id]
+    user_cache.invalidate(user.id)
@@ -134,3 +134,71 @@ def test_build_manifest_workbook_preserves_decimal_carat_values():
     items = workbook["Items"]
     assert items["D2"].value == pytest.approx(0.37)
     assert items["D2"].number_format == "#,##0.###"
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def url_for(self, key):
+        return f"/storage/{key}"
+
+    def key_for_url(self, url):
+        return url.removeprefix("/storage/")
+
+    def put_bytes(self, key, content, *, content_type=None):
+        self.objects[key] = content
+
+    def get_bytes(self, key):
+        return self.objects.get(key)
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+
+
+def test_stored_manifest_is_served_until_invalidated(monkeypatch):
+    from app.utils import manifests
+
+    storage = MemoryStorage()
+    monkeypatch.setattr(manifests, "get_storage", lambda: storage)
+    monkeypatch.setattr(manifests, "render_manifest", lambda db, batch, **_: b"%PDF-manifest")
+    batch = SimpleNamespace(batch_code="VCH-2026-03-001", status=BatchStatus.DISPATCHED, manifest_pdf_url=None)
+
+    manifests.store_manifest(None, batch)
+    assert batch.manifest_pdf_url.startswith("/storage/manifests/VCH-2026-03-001-")
+    assert manifests.load_stored_manifest(batch) == b"%PDF-manifest"
+
+    manifests.invalidate_manifest(batch)
+    assert batch.manifest_pdf_url is None
+    assert storage.objects == {}
+    assert manifests.load_stored_manifest(batch) is None
+
+
+def test_restoring_manifest_replaces_previous_object(monkeypatch):
+    from app.utils import manifests
+
+    storage = MemoryStorage()
+    monkeypatch.setattr(manifests, "get_storage", lambda: storage)
+    monkeypatch.setattr(manifests, "render_manifest", lambda db, batch, **_: b"%PDF-manifest")
+    batch = SimpleNamespace(batch_code="VCH-2026-03-001", status=BatchStatus.CLOSED, manifest_pdf_url=None)
+
+    manifests.store_manifest(None, batch)
+    manifests.store_manifest(None, batch)
+
+    assert list(storage.objects) == [storage.key_for_url(batch.manifest_pdf_url)]
+
+
+def test_stored_manifest_leaves_out_live_statuses(monkeypatch):
+    from app.utils import manifests
+
+    storage = MemoryStorage()
+    rendered = {}
+    monkeypatch.setattr(manifests, "get_storage", lambda: storage)
+    monkeypatch.setattr(
+        manifests, "render_manifest", lambda db, batch, **kwargs: rendered.update(kwargs) or b"%PDF-manifest"
+    )
+    batch = SimpleNamespace(batch_code="VCH-2026-03-001", status=BatchStatus.DISPATCHED, manifest_pdf_url=None)
+
+    manifests.store_manifest(None, batch)
+
+    assert rendered == {"live_status": False}
@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.db import get_db
+from app.deps import get_current_user
+from app.models import Batch, BatchItem, Branch, Factory, ItemJob, JobStageTiming, Role, Status, StatusEvent, User
+from app.routers import jobs
+from app.routers.jobs import BULK_SCAN_MAX_ITEMS
+
+
+@pytest.fixture
+def seed(pg_db):
+    # Commits here only release savepoints of the rolled-back test transaction.
+    suffix = uuid.uuid4().hex[:8]
+    branch = Branch(name=f"bulk-scan-{suffix}")
+    factory = Factory(name=f"Polish House {suffix}")
+    user = User(username=f"bulk-scan-{suffix}", password_hash="x", roles=[Role.PACKING, Role.DISPATCH])
+    pg_db.add_all([branch, factory, user])
+    pg_db.commit()
+
+    def add_job(status: Status, *, archived: bool = False) -> ItemJob:
+        job = ItemJob(
+            job_id=f"BS-{suffix}-{uuid.uuid4().hex[:6]}",
+            branch_id=branch.id,
+            item_description="Ring",
+            current_status=status,
+            current_holder_role=Role.PURCHASE,
+            is_archived=archived,
+        )
+        pg_db.add(job)
+        pg_db.commit()
+        return job
+
+    def add_batch() -> Batch:
+        batch = Batch(batch_code=f"VCH-{suffix}", branch_id=branch.id, created_by=user.id, factory_id=factory.id, item_count=0)
+        pg_db.add(batch)
+        pg_db.commit()
+        return batch
+
+    return {"user": user, "factory": factory, "add_job": add_job, "add_batch": add_batch}
+
+
+@pytest.fixture
+def client(pg_db, seed):
+    app = FastAPI()
+    app.include_router(jobs.router)
+    app.dependency_overrides[get_db] = lambda: pg_db
+    app.dependency_overrides[get_current_user] = lambda: seed["user"]
+    return TestClient(app)
+
+
+def test_bulk_scan_rejects_more_than_the_cap(client):
+    job_ids = [f"BS-CAP-{index}" for index in range(BULK_SCAN_MAX_ITEMS + 1)]
+
+    response = client.post("/jobs/scan/bulk", json={"job_ids": job_ids, "to_status": "PACKED_READY"})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"At most {BULK_SCAN_MAX_ITEMS} items can be scanned at once"
+
+
+def test_bulk_scan_reports_each_item_and_commits_the_valid_ones(client, pg_db, seed):
+    ready = seed["add_job"](Status.PURCHASED)
+    wrong_step = seed["add_job"](Status.RECEIVED_AT_SHOP)
+    archived = seed["add_job"](Status.PURCHASED, archived=True)
+    job_ids = [ready.job_id, wrong_step.job_id, "BS-MISSING", archived.job_id, ready.job_id]
+
+    response = client.post("/jobs/scan/bulk", json={"job_ids": job_ids, "to_status": "PACKED_READY"})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(result["job_id"], result["ok"], result["detail"]) for result in body["results"]] == [
+        (ready.job_id, True, None),
+        (wrong_step.job_id, False, "Admin override required"),
+        ("BS-MISSING", False, "Job not found"),
+        (archived.job_id, False, "Item is archived"),
+    ]
+    assert body["results"][0]["event"]["job_code"] == ready.job_id
+    assert (body["updated_count"], body["failed_count"]) == (1, 3)
+
+    pg_db.expire_all()
+    assert ready.current_status == Status.PACKED_READY
+    assert wrong_step.current_status == Status.RECEIVED_AT_SHOP
+    events = pg_db.execute(select(StatusEvent.job_id).where(StatusEvent.job_id.in_([ready.id, wrong_step.id]))).scalars().all()
+    assert events == [ready.id]
+    assert pg_db.get(JobStageTiming, ready.id).packed_ready_at is not None
+
+
+def test_bulk_scan_attaches_dispatched_jobs_to_the_voucher(client, pg_db, seed):
+    batch = seed["add_batch"]()
+    first, second = seed["add_job"](Status.PACKED_READY), seed["add_job"](Status.PACKED_READY)
+    payload = {"job_ids": [first.job_id, second.job_id], "to_status": "DISPATCHED_TO_FACTORY", "batch_id": str(batch.id)}
+
+    response = client.post("/jobs/scan/bulk", json=payload)
+
+    assert response.status_code == 200
+    assert response.json()["updated_count"] == 2
+    pg_db.expire_all()
+    assert batch.item_count == 2
+    attached = pg_db.execute(select(BatchItem.job_id).where(BatchItem.batch_id == batch.id)).scalars().all()
+    assert set(attached) == {first.id, second.id}
+    assert {first.factory_id, second.factory_id} == {seed["factory"].id}
+    assert response.json()["results"][0]["event"]["remarks"] == f"Voucher dispatch {batch.batch_code}"
+
+
+def test_bulk_scan_requires_a_voucher_for_dispatch_and_keeps_nothing_when_all_fail(client, pg_db, seed):
+    job = seed["add_job"](Status.PACKED_READY)
+
+    response = client.post("/jobs/scan/bulk", json={"job_ids": [job.job_id], "to_status": "DISPATCHED_TO_FACTORY"})
+
+    assert response.status_code == 200
+    assert response.json()["results"][0]["detail"] == "Voucher id required for dispatch"
+    assert response.json()["updated_count"] == 0
+    pg_db.expire_all()
+    assert job.current_status == Status.PACKED_READY
@@ -0,0 +1,101 @@
+import uuid
+
+import pytest
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.models import Branch, ItemJob, Role, Status
+from app.routers.reports import _parquet_export_query
+from app.routers.sync import _feed_query
+from app.utils.change_xid import CHANGE_XID_HORIZON
+
+
+@pytest.fixture
+def branch(pg_engine):
+    # These tests need real commits across sessions, so they clean up after
+    # themselves instead of running in a rolled-back transaction.
+    with Session(pg_engine) as db:
+        branch = Branch(name=f"change-xid-{uuid.uuid4().hex[:8]}")
+        db.add(branch)
+        db.commit()
+        branch_id = branch.id
+    yield branch_id
+    with Session(pg_engine) as db:
+        db.execute(delete(ItemJob).where(ItemJob.branch_id == branch_id))
+        db.execute(delete(Branch).where(Branch.id == branch_id))
+        db.commit()
+
+
+def _add_job(db: Session, branch_id, job_id: str) -> None:
+    db.add(
+        ItemJob(
+            job_id=job_id,
+            branch_id=branch_id,
+            item_description="Ring",
+            current_status=Status.PURCHASED,
+            current_holder_role=Role.PURCHASE,
+        )
+    )
+    db.flush()
+
+
+def _pull(engine, branch_id, since):
+    with Session(engine) as db:
+        horizon = db.execute(CHANGE_XID_HORIZON).scalar_one()
+        query = _parquet_export_query("jobs", since=since, horizon=horizon).where(ItemJob.branch_id == branch_id)
+        return {row.job_id for row in db.execute(query)}, horizon
+
+
+def test_export_watermark_does_not_skip_a_late_commit(pg_engine, branch):
+    suffix = uuid.uuid4().hex[:8]
+    late = Session(pg_engine)
+    try:
+        # Writes first but commits last, as a slow request would.
+        _add_job(late, branch, f"LATE-{suffix}")
+        with Session(pg_engine) as early:
+            _add_job(early, branch, f"EARLY-{suffix}")
+            early.commit()
+
+        first, watermark = _pull(pg_engine, branch, None)
+        late.commit()
+        second, _ = _pull(pg_engine, branch, watermark)
+    finally:
+        late.close()
+
+    assert first == set()
+    assert second == {f"LATE-{suffix}", f"EARLY-{suffix}"}
+
+
+def _sync_page(engine, branch_id, position):
+    with Session(engine) as db:
+        horizon = db.execute(CHANGE_XID_HORIZON).scalar_one()
+        query = _feed_query(select(ItemJob), ItemJob.change_xid, ItemJob.id, position, horizon, 100)
+        jobs = db.execute(query.where(ItemJob.branch_id == branch_id)).scalars().all()
+        return [job.job_id for job in jobs], (jobs[-1].change_xid, jobs[-1].id) if jobs else position
+
+
+def test_sync_watermark_does_not_pass_a_late_commit(pg_engine, branch):
+    suffix = uuid.uuid4().hex[:8]
+    with Session(pg_engine) as db:
+        _add_job(db, branch, f"FIRST-{suffix}")
+        db.commit()
+    synced, position = _sync_page(pg_engine, branch, None)
+    assert synced == [f"FIRST-{suffix}"]
+
+    late = Session(pg_engine)
+    try:
+        _add_job(late, branch, f"LATE-{suffix}")
+        with Session(pg_engine) as early:
+            _add_job(early, branch, f"EARLY-{suffix}")
+            early.commit()
+
+        # The early write is held back while the late one is still open...
+        held, held_position = _sync_page(pg_engine, branch, position)
+        late.commit()
+        # ...so the watermark has not moved past the late write.
+        caught_up, _ = _sync_page(pg_engine, branch, held_position)
+    finally:
+        late.close()
+
+    assert held == []
+    assert caught_up == [f"LATE-{suffix}", f"EARLY-{suffix}"]
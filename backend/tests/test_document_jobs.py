@@ -0,0 +1,102 @@
+import uuid
+from datetime import datetime, timezone
+
+from fastapi import HTTPException
+
+from app.models import DocumentJob, DocumentJobStatus
+from app.utils.document_jobs import (
+    MAX_ATTEMPTS,
+    DocumentResult,
+    claim_next_job,
+    purge_expired_documents,
+    run_document_job,
+)
+
+
+class FakeStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def put_bytes(self, key, content, *, content_type=None):
+        self.objects[key] = (content, content_type)
+
+    def delete(self, key):
+        self.objects.pop(key, None)
+
+    def url_for(self, key):
+        return f"/storage/{key}"
+
+
+def _document(kind="label_sheet", attempts=1):
+    return DocumentJob(
+        id=uuid.uuid4(),
+        kind=kind,
+        params={"job_ids": ["JOB-1"]},
+        status=DocumentJobStatus.RUNNING,
+        attempts=attempts,
+        started_at=datetime.now(timezone.utc),
+    )
+
+
+def test_run_document_job_stores_result(fake_session):
+    db = fake_session()
+    storage = FakeStorage()
+    document = _document()
+    handlers = {"label_sheet": lambda _db, params: DocumentResult(b"%PDF", "application/pdf", "labels.pdf")}
+
+    run_document_job(db, storage, document, handlers)
+
+    key = f"documents/{document.id}/labels.pdf"
+    assert storage.objects[key] == (b"%PDF", "application/pdf")
+    assert document.status == DocumentJobStatus.SUCCEEDED
+    assert document.result_key == key
+    assert document.filename == "labels.pdf"
+    assert document.finished_at is not None
+
+
+def test_run_document_job_records_handler_error(fake_session):
+    document = _document()
+    db = fake_session(objects={document.id: document})
+
+    def fail(_db, _params):
+        raise HTTPException(status_code=404, detail="Jobs not found: JOB-1")
+
+    run_document_job(db, FakeStorage(), document, {"label_sheet": fail})
+
+    assert db.rollbacks == 1
+    assert document.status == DocumentJobStatus.FAILED
+    assert document.error == "Jobs not found: JOB-1"
+    assert document.result_key is None
+
+
+def test_claim_next_job_fails_jobs_out_of_attempts(fake_session):
+    exhausted = _document(attempts=MAX_ATTEMPTS)
+    queued = _document(attempts=0)
+    queued.status = DocumentJobStatus.QUEUED
+    db = fake_session(exhausted, queued)
+
+    claimed = claim_next_job(db, timeout_seconds=600)
+
+    assert exhausted.status == DocumentJobStatus.FAILED
+    assert exhausted.error == "Worker did not finish the job"
+    assert claimed is queued
+    assert claimed.status == DocumentJobStatus.RUNNING
+    assert claimed.attempts == 1
+
+
+def test_purge_expired_documents_deletes_results_and_keeps_rows(fake_session):
+    document = _document()
+    document.status = DocumentJobStatus.SUCCEEDED
+    document.result_key = f"documents/{document.id}/labels.pdf"
+    document.result_url = f"/storage/{document.result_key}"
+    storage = FakeStorage()
+    storage.put_bytes(document.result_key, b"%PDF")
+    db = fake_session([document])
+
+    assert purge_expired_documents(db, storage, retention_hours=24) == 1
+
+    assert storage.objects == {}
+    assert document.result_key is None
+    assert document.result_url is None
+    assert document.status == DocumentJobStatus.SUCCEEDED
+    assert db.commits == 1
@@ -0,0 +1,198 @@
+import uuid
+from datetime import datetime, timezone
+import gzip
+import tempfile
+from io import BytesIO
+
+import pytest
+from fastapi import HTTPException
+from openpyxl import load_workbook
+from sqlalchemy.dialects import postgresql
+
+from app.models import BatchStatus, ItemSource, Status
+from app.routers.reports import (
+    CSV_CHUNK_BYTES,
+    EXPORT_FIELDS,
+    _accepts_gzip,
+    _csv_export_query,
+    _export_query,
+    _gzip_chunks,
+    _iter_file,
+    _parquet_export_query,
+    _stream_csv_rows,
+    _write_export_parquet,
+    _write_export_xlsx,
+)
+from app.schemas import ExcelExportRequest
+
+
+def _row(job_id: str):
+    values = {header: None for header, _ in EXPORT_FIELDS}
+    values.update(
+        {
+            "Job ID": job_id,
+            "Customer Name": "Asha",
+            "Purchase Value": 1500.0,
+            "Factory": "Polish House",
+            "Status": Status.DISPATCHED_TO_FACTORY,
+            "Item Source": ItemSource.STOCK,
+            "Created At": datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc),
+        }
+    )
+    return tuple(values.values())
+
+
+def _compile(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_export_query_applies_job_list_filters():
+    payload = ExcelExportRequest(status=Status.PURCHASED, phone="98", batch_id="8d2b7f0e-6a6f-4a8e-9f51-2c4d1f7a9b10")
+
+    sql = _compile(_export_query(payload, is_admin=False))
+
+    assert "LEFT OUTER JOIN factories" in sql
+    assert "JOIN batch_items" in sql
+    assert "item_jobs.is_archived IS false" in sql
+    assert "item_jobs.current_status = " in sql
+    assert "item_jobs.customer_phone ILIKE" in sql
+
+
+def test_export_query_rejects_empty_selection():
+    with pytest.raises(HTTPException) as exc:
+        _export_query(ExcelExportRequest(job_ids=[]), is_admin=True)
+    assert exc.value.status_code == 400
+
+
+def test_write_export_xlsx_streams_rows_into_workbook(fake_session):
+    db = fake_session([_row("JOB-1"), _row("JOB-2")])
+
+    output = _write_export_xlsx(db, ExcelExportRequest(), is_admin=True)
+    content = b"".join(_iter_file(output, chunk_size=1024))
+
+    assert db.statements[0].get_execution_options()["yield_per"] > 0
+    assert output.closed
+    ws = load_workbook(filename=BytesIO(content)).active
+    rows = list(ws.iter_rows(values_only=True))
+    assert rows[0] == tuple(header for header, _ in EXPORT_FIELDS)
+    assert [row[0] for row in rows[1:]] == ["JOB-1", "JOB-2"]
+    assert rows[1][11] == "DISPATCHED_TO_FACTORY"
+    assert rows[1][16] == "2026-03-01T09:30:00+00:00"
+
+
+def test_write_export_xlsx_404_when_selection_matches_nothing(fake_session):
+    db = fake_session(False)
+
+    with pytest.raises(HTTPException) as exc:
+        _write_export_xlsx(db, ExcelExportRequest(job_ids=["JOB-9"]), is_admin=True)
+
+    assert exc.value.status_code == 404
+    # Only the existence check ran; no workbook was started.
+    assert len(db.statements) == 1
+    assert "EXISTS" in str(db.statements[0])
+
+
+def test_write_export_xlsx_releases_the_workbook_when_rows_fail(fake_session, monkeypatch, tmp_path):
+    class FailingRows:
+        def __iter__(self):
+            yield _row("JOB-1")
+            raise RuntimeError("connection lost")
+
+    db = fake_session()
+    monkeypatch.setattr(db, "execute", lambda statement: FailingRows())
+    # Write-only sheets buffer into a temporary file of their own.
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+
+    with pytest.raises(RuntimeError):
+        _write_export_xlsx(db, ExcelExportRequest(), is_admin=True)
+
+    assert not list(tmp_path.iterdir())
+
+
+def test_csv_export_query_joins_factory_name():
+    sql = _compile(_csv_export_query("jobs"))
+
+    assert "factories.name" in sql
+    assert "LEFT OUTER JOIN factories ON item_jobs.factory_id = factories.id" in sql
+    assert "item_jobs.photos" not in sql
+
+
+def test_csv_export_query_rejects_unknown_type():
+    with pytest.raises(HTTPException) as exc:
+        _csv_export_query("users")
+    assert exc.value.status_code == 400
+
+
+def test_stream_csv_rows_buffers_into_large_chunks(fake_session):
+    rows = [(f"JOB-{index:05d}", "PURCHASED", "x" * 40) for index in range(5000)]
+    db = fake_session(rows)
+
+    chunks = list(_stream_csv_rows(db, ["job_id", "status", "notes"], _csv_export_query("jobs")))
+
+    assert db.closed
+    assert len(chunks) < 10
+    assert all(len(chunk) >= CSV_CHUNK_BYTES for chunk in chunks[:-1])
+    lines = "".join(chunks).splitlines()
+    assert lines[0] == "job_id,status,notes"
+    assert lines[1] == f"JOB-00000,PURCHASED,{'x' * 40}"
+    assert len(lines) == 5001
+
+
+def test_gzip_chunks_round_trip():
+    body = b"".join(_gzip_chunks(iter(["a,b\r\n", "1,2\r\n"])))
+    assert gzip.decompress(body) == b"a,b\r\n1,2\r\n"
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        ("gzip, deflate, br", True),
+        ("br;q=1.0, gzip;q=0.8", True),
+        ("gzip;q=0", False),
+        ("deflate", False),
+        (None, False),
+    ],
+)
+def test_accepts_gzip(header, expected):
+    assert _accepts_gzip(header) is expected
+
+
+def test_parquet_export_query_applies_date_range_and_change_window():
+    start = datetime(2026, 3, 1, tzinfo=timezone.utc)
+    sql = _compile(
+        _parquet_export_query(
+            "incidents", from_date=start, to_date=datetime(2026, 4, 1, tzinfo=timezone.utc), since=1200, horizon=1250
+        )
+    )
+
+    assert "incidents.created_at >= " in sql
+    assert "incidents.created_at <= " in sql
+    assert "incidents.change_xid >= " in sql
+    assert "incidents.change_xid < " in sql
+    assert sql.endswith("ORDER BY incidents.change_xid, incidents.id")
+
+
+def test_parquet_export_query_pages_events_on_their_change_xid():
+    sql = _compile(_parquet_export_query("events", since=1200, horizon=1250))
+
+    assert "JOIN item_jobs ON status_events.job_id = item_jobs.id" in sql
+    assert "status_events.change_xid >= " in sql
+
+
+def test_write_export_parquet_writes_row_groups(fake_session):
+    pq = pytest.importorskip("pyarrow.parquet")
+    updated = [datetime(2026, 3, day, tzinfo=timezone.utc) for day in (1, 2)]
+    rows = [
+        (
+            uuid.uuid4(), f"VCH-{index}", BatchStatus.DISPATCHED, None, None, None, None, 3, False,
+            datetime(2026, 2, 1, tzinfo=timezone.utc), updated[index],
+        )
+        for index in range(2)
+    ]
+    db = fake_session(rows)
+
+    output = _write_export_parquet(db, "batches", _parquet_export_query("batches"))
+
+    table = pq.read_table(BytesIO(output.read()))
+    assert table.column("batch_code").to_pylist() == ["VCH-0", "VCH-1"]
+    assert table.column("status").to_pylist() == ["DISPATCHED", "DISPATCHED"]
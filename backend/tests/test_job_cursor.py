@@ -0,0 +1,57 @@
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.dialects import postgresql
+
+from app.models import Status
+from app.routers.jobs import _job_cursor_filter
+from app.utils.cursors import decode_cursor, encode_cursor
+
+
+def _sql(clause) -> str:
+    return str(clause.compile(dialect=postgresql.dialect()))
+
+
+def test_cursor_round_trip_serializes_datetimes_and_enums():
+    job_uuid = uuid.uuid4()
+    token = encode_cursor(
+        {
+            "sort": "created_at",
+            "value": datetime(2026, 3, 1, 9, 30, 15, 123456, tzinfo=timezone.utc),
+            "status": Status.PACKED_READY,
+            "id": str(job_uuid),
+        }
+    )
+
+    payload = decode_cursor(token)
+    assert payload["value"] == "2026-03-01T09:30:15.123456+00:00"
+    assert payload["status"] == "PACKED_READY"
+    assert payload["id"] == str(job_uuid)
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor!")
+
+
+def test_job_cursor_filter_uses_row_comparison():
+    token = encode_cursor(
+        {"sort": "created_at", "dir": "desc", "value": datetime(2026, 3, 1, tzinfo=timezone.utc), "id": str(uuid.uuid4())}
+    )
+    sql = _sql(_job_cursor_filter(token, "created_at", True))
+    assert "(item_jobs.created_at, item_jobs.id) <" in sql
+
+
+def test_job_cursor_filter_handles_null_sort_values():
+    token = encode_cursor({"sort": "last_scan_at", "dir": "asc", "value": None, "id": str(uuid.uuid4())})
+    sql = _sql(_job_cursor_filter(token, "last_scan_at", False))
+    assert "item_jobs.last_scan_at IS NULL AND item_jobs.id >" in sql
+
+
+def test_job_cursor_filter_rejects_mismatched_sort():
+    token = encode_cursor({"sort": "job_id", "dir": "asc", "value": "DJ-2026-000001", "id": str(uuid.uuid4())})
+    with pytest.raises(HTTPException) as exc:
+        _job_cursor_filter(token, "job_id", True)
+    assert exc.value.status_code == 400
@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.models import Role, Status
+from app.routers.jobs import _check_scan_transition
+from app.schemas import JobBulkScanRequest, JobScanRequest
+
+
+def _make_job(status: Status):
+    return SimpleNamespace(job_id="DJ-2026-000001", current_status=status)
+
+
+def test_check_scan_transition_allows_role_step():
+    user = SimpleNamespace(roles=[Role.PACKING])
+    payload = JobScanRequest(to_status=Status.PACKED_READY)
+
+    override_needed, event_role = _check_scan_transition(
+        _make_job(Status.PURCHASED), payload, user, previous_status=None
+    )
+
+    assert override_needed is False
+    assert event_role == Role.PACKING
+
+
+def test_check_scan_transition_rejects_wrong_role():
+    user = SimpleNamespace(roles=[Role.PACKING])
+    payload = JobBulkScanRequest(job_ids=["DJ-2026-000001"], to_status=Status.DISPATCHED_TO_FACTORY)
+
+    with pytest.raises(HTTPException) as exc:
+        _check_scan_transition(_make_job(Status.PACKED_READY), payload, user, previous_status=None)
+    assert exc.value.status_code == 403
+
+
+def test_check_scan_transition_resolves_hold_from_previous_status():
+    user = SimpleNamespace(roles=[Role.ADMIN])
+    payload = JobScanRequest(to_status=Status.DISPATCHED_TO_FACTORY, override_reason="Released")
+
+    override_needed, event_role = _check_scan_transition(
+        _make_job(Status.ON_HOLD), payload, user, previous_status=Status.PACKED_READY
+    )
+    assert override_needed is True
+    assert event_role == Role.ADMIN
+
+    with pytest.raises(HTTPException) as exc:
+        _check_scan_transition(_make_job(Status.ON_HOLD), payload, user, previous_status=None)
+    assert exc.value.detail == "Cannot resolve ON_HOLD without previous status"
@@ -0,0 +1,33 @@
+from sqlalchemy.dialects import postgresql
+
+from app.routers import jobs
+from app.routers.jobs import _escape_like, _job_search_query
+
+
+def _sql(query) -> str:
+    return str(query.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_job_search_matches_every_indexed_column_and_ranks_by_similarity():
+    sql = _sql(_job_search_query("9876", include_archived=False, limit=20))
+
+    for column in ("job_id", "customer_phone", "customer_name", "voucher_no", "style_number"):
+        assert f"item_jobs.{column} ILIKE '%%9876%%'" in sql
+        assert f"similarity(item_jobs.{column}, '9876')" in sql
+    assert "item_jobs.is_archived IS false" in sql
+    assert "ORDER BY greatest(" in sql
+    assert "LIMIT 20" in sql
+
+
+def test_job_search_escapes_like_wildcards():
+    assert _escape_like("50%_off\\") == "50\\%\\_off\\\\"
+    sql = _sql(_job_search_query("a_b", include_archived=True, limit=5))
+
+    # Literal binds double the escape character.
+    assert "ILIKE '%%a\\\\_b%%' ESCAPE" in sql
+    assert "is_archived IS false" not in sql
+
+
+def test_job_search_route_is_registered_before_job_detail():
+    paths = [route.path for route in jobs.router.routes]
+    assert paths.index("/jobs/search") < paths.index("/jobs/{job_id}")
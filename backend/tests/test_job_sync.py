@@ -0,0 +1,39 @@
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models import ItemJob
+from app.routers.sync import _decode_watermark, _encode_watermark, _feed_query
+from app.utils.cursors import encode_cursor
+
+
+def test_watermark_round_trip_keeps_each_feed_position():
+    jobs = (1234567, uuid.uuid4())
+
+    assert _decode_watermark(_encode_watermark(jobs, None)) == (jobs, None)
+
+
+def test_decode_watermark_rejects_bad_positions():
+    with pytest.raises(HTTPException) as exc_info:
+        _decode_watermark(encode_cursor({"jobs_xid": "yesterday", "jobs_id": str(uuid.uuid4())}))
+    assert exc_info.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        _decode_watermark("not-a-watermark!")
+
+
+def test_feed_query_pages_on_finished_rows_after_the_position():
+    position = (1200, uuid.uuid4())
+
+    sql = str(
+        _feed_query(select(ItemJob.id), ItemJob.change_xid, ItemJob.id, position, 1250, 100).compile(
+            dialect=postgresql.dialect()
+        )
+    )
+
+    assert "item_jobs.change_xid < " in sql
+    assert "(item_jobs.change_xid, item_jobs.id) > (" in sql
+    assert "ORDER BY item_jobs.change_xid, item_jobs.id" in sql
@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 from types import SimpleNamespace
 
 from app.models import ItemSource, RepairType
-from app.utils.pdf import _build_label_fields, _wrap_text
+from app.routers.jobs import _etag_matches
+from app.utils.pdf import _build_label_fields, _wrap_text, cached_label_pdf, generate_label_sheet_pdf, label_digest
 
 
 def _make_job(*, diamond_cent: float | None, style_number: str, work_narration: str):
@@ -21,6 +22,7 @@ def _make_job(*, diamond_cent: float | None, style_number: str, work_narration:
         item_description="Cluster ring with side stones",
         created_at=datetime(2026, 3, 1, 9, 30, tzinfo=timezone.utc),
         target_return_date=datetime(2026, 3, 18, 18, 0, tzinfo=timezone.utc),
+        photos=[],
     )
 
 
@@ -49,3 +51,84 @@ def test_wrap_text_splits_long_narration_into_multiple_lines():
 
     assert len(lines) > 1
     assert " ".join(lines) == "Stone replacement and polishing for the full cluster setting"
+
+
+def test_label_sheet_shares_template_and_logo():
+    job = _make_job(diamond_cent=0.3, style_number="STYLE-900", work_narration="Polish")
+
+    single = generate_label_sheet_pdf([(job, "Main Branch", None)])
+    sheet = generate_label_sheet_pdf([(job, "Main Branch", None)] * 12)
+
+    # One form for the static label template, one for the logo it references.
+    assert sheet.count(b"/Subtype /Form") == single.count(b"/Subtype /Form") == 2
+    assert sheet.count(b"/Subtype /Image") == single.count(b"/Subtype /Image")
+
+
+def test_large_label_sheet_renders_in_process_pool_and_merges(monkeypatch):
+    from io import BytesIO
+
+    from pypdf import PdfReader
+
+    from app.utils import pdf
+
+    monkeypatch.setattr(pdf.settings, "label_render_processes", 2)
+    monkeypatch.setattr(pdf, "LABEL_SHEET_PARALLEL_MIN_PAGES", 2)
+    monkeypatch.setattr(pdf, "LABEL_SHEET_MIN_CHUNK_PAGES", 1)
+    job = _make_job(diamond_cent=0.3, style_number="STYLE-900", work_narration="Polish")
+    try:
+        merged = pdf.generate_label_sheet_pdf([(job, "Main Branch", None)] * 20, start_position=5)
+        assert pdf._render_pool is not None
+    finally:
+        if pdf._render_pool is not None:
+            pdf._render_pool.shutdown()
+            pdf._render_pool = None
+
+    # 2 labels fill page one from position 5, the other 18 take three more pages.
+    assert len(PdfReader(BytesIO(merged)).pages) == 4
+
+
+class MemoryStorage:
+    def __init__(self):
+        self.objects = {}
+
+    def get_bytes(self, key):
+        return self.objects.get(key)
+
+    def put_bytes(self, key, content, *, content_type=None):
+        self.objects[key] = content
+
+
+def test_label_digest_tracks_rendered_fields_only():
+    job = _make_job(diamond_cent=0.3, style_number="STYLE-900", work_narration="Polish")
+    digest = label_digest(job, "Main Branch", "Polish House")
+
+    assert label_digest(job, "Main Branch", "Polish House") == digest
+    job.current_status = "Packed Ready"
+    assert label_digest(job, "Main Branch", "Polish House") == digest
+    job.work_narration = "Polish and rhodium"
+    assert label_digest(job, "Main Branch", "Polish House") != digest
+
+
+def test_cached_label_pdf_renders_once_per_digest(monkeypatch):
+    from app.utils import pdf
+
+    renders = []
+    monkeypatch.setattr(pdf, "_render_label_pdf", lambda *args: renders.append(args) or b"%PDF-label")
+    storage = MemoryStorage()
+    job = _make_job(diamond_cent=0.3, style_number="STYLE-900", work_narration="Polish")
+
+    first = cached_label_pdf(storage, job, "Main Branch", None)
+    second = cached_label_pdf(storage, job, "Main Branch", None)
+
+    assert first == second == b"%PDF-label"
+    assert len(renders) == 1
+    assert list(storage.objects) == [f"labels/{label_digest(job, 'Main Branch', None)}.pdf"]
+
+
+def test_etag_matches_if_none_match_forms():
+    etag = '"abc123"'
+    assert _etag_matches('"abc123"', etag)
+    assert _etag_matches('W/"abc123", "other"', etag)
+    assert _etag_matches("*", etag)
+    assert not _etag_matches('"other"', etag)
+    assert not _etag_matches(None, etag)
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.routers import events
+from app.utils.live_events import RESYNC_FRAME, EventHub, listen_dsn
+
+
+class _IdleHub(EventHub):
+    # Subscribers without the LISTEN connection; tests publish directly.
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+
+def test_listen_dsn_drops_the_sqlalchemy_driver():
+    assert listen_dsn("postgresql+psycopg://diamond:secret@db:5432/diamond") == "postgresql://diamond:secret@db:5432/diamond"
+
+
+def test_publish_frames_payload_by_type_and_skips_malformed():
+    hub = _IdleHub("postgresql://")
+    queue = hub.subscribe()
+
+    hub.publish('{"type": "status", "job_id": "J-1", "to": "PACKED_READY"}')
+    hub.publish("not json")
+
+    assert queue.get_nowait() == 'event: status\ndata: {"type": "status", "job_id": "J-1", "to": "PACKED_READY"}\n\n'
+    assert queue.empty()
+
+
+def test_slow_subscriber_is_told_to_resync():
+    hub = _IdleHub("postgresql://", queue_size=2)
+    slow = hub.subscribe()
+
+    for index in range(3):
+        hub.publish(f'{{"type": "batch", "item_count": {index}}}')
+
+    assert slow.get_nowait() == RESYNC_FRAME
+    assert slow.empty()
+
+
+def test_event_frames_unsubscribes_when_client_goes_away():
+    hub = _IdleHub("postgresql://")
+
+    async def run():
+        frames = events._event_frames(hub)
+        assert (await frames.__anext__()).startswith("retry: ")
+        hub.publish('{"type": "incident", "status": "OPEN"}')
+        assert (await frames.__anext__()).startswith("event: incident\n")
+        await frames.aclose()
+
+    asyncio.run(run())
+    assert not hub._subscribers
@@ -0,0 +1,101 @@
+import threading
+from io import BytesIO
+
+from PIL import Image
+
+from app.utils import photo_cache
+from app.utils.photo_cache import LABEL_PHOTO_PX, MISS_TTL_SECONDS, LabelPhotoCache
+
+
+def _jpeg_bytes(width: int = 1200, height: int = 900) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(20, 120, 200)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class CountingLoader:
+    def __init__(self, content: bytes | None):
+        self.content = content
+        self.calls = 0
+
+    def __call__(self, photo: dict) -> bytes | None:
+        self.calls += 1
+        return self.content
+
+
+def test_get_resizes_once_and_serves_from_memory(tmp_path):
+    loader = CountingLoader(_jpeg_bytes())
+    cache = LabelPhotoCache(loader, max_entries=8, disk_dir=str(tmp_path), max_disk_entries=8)
+    photo = {"key": "uploads/a.jpg", "url": "/storage/uploads/a.jpg"}
+
+    first = cache.get(photo)
+    second = cache.get(photo)
+
+    assert first == second
+    assert loader.calls == 1
+    with Image.open(BytesIO(first)) as image:
+        assert max(image.size) == LABEL_PHOTO_PX
+
+
+def test_disk_layer_survives_new_process_cache(tmp_path):
+    loader = CountingLoader(_jpeg_bytes())
+    photo = {"key": "uploads/a.jpg"}
+    LabelPhotoCache(loader, max_entries=8, disk_dir=str(tmp_path), max_disk_entries=8).get(photo)
+
+    fresh = LabelPhotoCache(loader, max_entries=8, disk_dir=str(tmp_path), max_disk_entries=8)
+    assert fresh.get(photo)
+    assert loader.calls == 1
+
+
+def test_disk_layer_is_trimmed_past_the_high_water_mark(tmp_path):
+    cache = LabelPhotoCache(CountingLoader(_jpeg_bytes(64, 64)), max_entries=1, disk_dir=str(tmp_path), max_disk_entries=4)
+    for index in range(5):
+        cache.get({"key": f"uploads/{index}.jpg"})
+    assert len(list(tmp_path.glob("*.jpg"))) == 5
+
+    cache.get({"key": "uploads/5.jpg"})
+    assert len(list(tmp_path.glob("*.jpg"))) == 4
+
+
+def test_failed_fetch_is_remembered(tmp_path):
+    loader = CountingLoader(None)
+    cache = LabelPhotoCache(loader, max_entries=8, disk_dir=None, max_disk_entries=0)
+
+    assert cache.get({"key": "uploads/missing.jpg"}) is None
+    assert cache.get({"key": "uploads/missing.jpg"}) is None
+    assert loader.calls == 1
+
+
+def test_remembered_misses_expire_and_stay_bounded(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(photo_cache.time, "monotonic", lambda: clock[0])
+    loader = CountingLoader(None)
+    cache = LabelPhotoCache(loader, max_entries=2, disk_dir=None, max_disk_entries=0)
+
+    for name in ("a", "b", "c"):
+        cache.get({"key": f"uploads/{name}.jpg"})
+    assert list(cache._misses) == ["uploads/b.jpg", "uploads/c.jpg"]
+
+    clock[0] += MISS_TTL_SECONDS + 1
+    assert cache.get({"key": "uploads/b.jpg"}) is None
+    assert loader.calls == 4
+    assert list(cache._misses) == ["uploads/b.jpg"]
+
+
+def test_prefetch_skips_photos_past_the_deadline():
+    release = threading.Event()
+    content = _jpeg_bytes(64, 64)
+
+    def loader(photo: dict) -> bytes:
+        if photo["key"] == "uploads/slow.jpg":
+            release.wait(5)
+        return content
+
+    cache = LabelPhotoCache(loader, max_entries=8, disk_dir=None, max_disk_entries=0)
+    photos = [{"key": "uploads/fast.jpg"}, {"key": "uploads/slow.jpg"}, {"key": "uploads/fast.jpg"}, None]
+    try:
+        results = cache.prefetch(photos, max_workers=4, timeout=0.5)
+    finally:
+        release.set()
+
+    assert set(results) == {"uploads/fast.jpg"}
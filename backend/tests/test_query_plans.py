@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.models import ItemJob
+from app.routers.reports import _ops_summary_statements, _turnaround_statement
+from app.schemas import JobFilters
+from app.utils.job_filters import apply_job_filters
+
+# A bitmap scan reports its table on the Bitmap Heap Scan node.
+INDEX_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan"}
+ATTENTION_FILTERS = ["overdue_returns", "aged_over_7", "at_factory", "awaiting_closure"]
+OPS_SUMMARY_TABLES = ["incidents", "item_jobs", "batches"]
+
+
+def _plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from _plan_nodes(child)
+
+
+def _scans(engine, statement, table: str) -> set[str]:
+    compiled = statement.compile(engine, compile_kwargs={"render_postcompile": True})
+    with engine.connect() as conn, conn.begin():
+        # Small test tables are always cheapest to scan sequentially; with seq
+        # scans priced out, a Seq Scan in the plan means no index can serve it.
+        conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()[0]["Plan"]
+    return {node["Node Type"] for node in _plan_nodes(plan) if node.get("Relation Name") == table}
+
+
+@pytest.mark.parametrize("attention", ATTENTION_FILTERS)
+def test_attention_filter_uses_index(pg_engine, attention):
+    statement = apply_job_filters(select(ItemJob.id), JobFilters(attention=attention), is_admin=False)
+
+    scans = _scans(pg_engine, statement, "item_jobs")
+
+    assert "Seq Scan" not in scans
+    assert scans & INDEX_SCANS
+
+
+@pytest.mark.parametrize("table", OPS_SUMMARY_TABLES)
+def test_ops_summary_counts_use_index(pg_engine, table):
+    statements = dict(zip(OPS_SUMMARY_TABLES, _ops_summary_statements(datetime.now(timezone.utc))))
+
+    scans = _scans(pg_engine, statements[table], table)
+
+    assert "Seq Scan" not in scans
+    assert scans & INDEX_SCANS
+
+
+def test_turnaround_window_uses_index(pg_engine):
+    statement = _turnaround_statement(datetime.now(timezone.utc) - timedelta(days=365))
+
+    scans = _scans(pg_engine, statement, "job_stage_timings")
+
+    assert "Seq Scan" not in scans
+    assert scans & INDEX_SCANS
@@ -0,0 +1,62 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+
+from app.models import ReportSnapshot
+from app.routers.reports import SNAPSHOT_LOCK_NAMESPACE, _load_snapshot
+
+
+def _stale_snapshot():
+    return SimpleNamespace(payload={"value": 1}, computed_at=datetime.now(timezone.utc) - timedelta(minutes=5))
+
+
+def test_load_snapshot_serves_fresh_copy_without_recomputing(fake_session):
+    computed_at = datetime.now(timezone.utc) - timedelta(seconds=5)
+    db = fake_session(objects={"ops_summary": SimpleNamespace(payload={"value": 1}, computed_at=computed_at)})
+
+    payload, stamp = _load_snapshot(db, "ops_summary", 30, lambda: {"value": 2})
+
+    assert payload == {"value": 1}
+    assert stamp == computed_at
+    assert db.statements == []
+
+
+def test_load_snapshot_serves_stale_copy_while_another_worker_refreshes(fake_session):
+    snapshot = _stale_snapshot()
+    db = fake_session(False, objects={"ops_summary": snapshot})
+
+    payload, stamp = _load_snapshot(db, "ops_summary", 30, lambda: {"value": 2})
+
+    assert (payload, stamp) == (snapshot.payload, snapshot.computed_at)
+    assert db.commits == 0
+
+
+def test_load_snapshot_recomputes_and_stores_when_stale(fake_session):
+    snapshot = _stale_snapshot()
+    db = fake_session(True, objects={"ops_summary": snapshot})
+
+    payload, stamp = _load_snapshot(db, "ops_summary", 30, lambda: {"value": 2})
+
+    assert payload == {"value": 2}
+    assert stamp > snapshot.computed_at
+    assert db.commits == 1
+
+
+def test_load_snapshot_advisory_lock_lets_one_worker_refresh_on_postgres(pg_engine, pg_db):
+    name = f"test-{uuid.uuid4().hex[:8]}"
+    stale = _stale_snapshot()
+    pg_db.add(ReportSnapshot(name=name, payload=stale.payload, computed_at=stale.computed_at))
+    pg_db.commit()
+
+    with pg_engine.connect() as other, other.begin():
+        # Another worker is mid-refresh.
+        assert other.execute(select(func.pg_try_advisory_xact_lock(SNAPSHOT_LOCK_NAMESPACE, func.hashtext(name)))).scalar()
+        payload, _ = _load_snapshot(pg_db, name, 30, lambda: {"value": 2})
+        assert payload == {"value": 1}
+
+    payload, stamp = _load_snapshot(pg_db, name, 30, lambda: {"value": 2})
+    assert payload == {"value": 2}
+    pg_db.expire_all()
+    assert pg_db.get(ReportSnapshot, name).computed_at == stamp
@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.utils.sequences import format_job_id, next_voucher_code, reserve_job_ids, reserve_job_numbers
+
+# Far enough out that no real counter row is touched; the Postgres tests roll back anyway.
+TEST_YEAR = 2999
+
+
+def test_format_job_id():
+    assert format_job_id(2026, 42) == "DJ-2026-000042"
+
+
+def test_reserve_job_numbers_returns_block_ending_at_counter(fake_session):
+    db = fake_session(110)
+    assert list(reserve_job_numbers(db, 10, year=2026)) == list(range(101, 111))
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (year) DO UPDATE" in sql
+    assert "RETURNING job_id_counters.last_value" in sql
+
+
+def test_reserve_job_ids_formats_block(fake_session):
+    assert reserve_job_ids(fake_session(3), 2, year=2026) == ["DJ-2026-000002", "DJ-2026-000003"]
+
+
+def test_reserve_job_numbers_rejects_empty_block(fake_session):
+    with pytest.raises(ValueError):
+        reserve_job_numbers(fake_session(0), 0, year=2026)
+
+
+def test_next_voucher_code_uses_month_counter(fake_session):
+    db = fake_session(12)
+    assert next_voucher_code(db, year=2026, month=3) == "VCH-2026-03-012"
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert "ON CONFLICT (year, month) DO UPDATE" in sql
+
+
+def test_reservations_hand_out_consecutive_blocks_on_postgres(pg_db):
+    first = reserve_job_numbers(pg_db, 3, year=TEST_YEAR)
+    second = reserve_job_numbers(pg_db, 2, year=TEST_YEAR)
+
+    assert len(first) == 3
+    assert list(second) == [first.stop, first.stop + 1]
+
+    first_code = next_voucher_code(pg_db, year=TEST_YEAR, month=1)
+    second_code = next_voucher_code(pg_db, year=TEST_YEAR, month=1)
+    assert int(second_code.rsplit("-", 1)[1]) == int(first_code.rsplit("-", 1)[1]) + 1
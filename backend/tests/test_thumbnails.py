@@ -0,0 +1,115 @@
+from io import BytesIO
+
+from PIL import Image
+
+from app.utils.thumbnails import (
+    THUMBNAIL_SIZES,
+    _needs_thumbnail,
+    _thumbnail_url,
+    backfill_photo_thumbnails,
+    generate_thumbnails,
+    link_existing_thumbnails,
+    render_thumbnails,
+    supports_thumbnails,
+    thumbnail_key,
+)
+
+
+def _jpeg_bytes(width: int, height: int) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), color=(200, 30, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+class MemoryStorage:
+    def __init__(self, objects: dict[str, bytes]):
+        self.objects = objects
+
+    def read_bytes(self, key: str) -> bytes:
+        return self.objects[key]
+
+    def put_bytes(self, key: str, content: bytes, *, content_type=None) -> None:
+        self.objects[key] = content
+
+    def exists(self, key: str) -> bool:
+        return key in self.objects
+
+    def url_for(self, key: str) -> str:
+        return f"/storage/{key}"
+
+
+def test_thumbnail_keys_sit_next_to_original():
+    assert thumbnail_key("uploads/abc123.png", 256) == "uploads/abc123_256.jpg"
+    assert supports_thumbnails("uploads/abc123.JPG")
+    assert not supports_thumbnails("uploads/abc123.heic")
+
+
+def test_render_thumbnails_fits_each_size_and_keeps_aspect():
+    renditions = render_thumbnails(_jpeg_bytes(4000, 3000))
+
+    assert set(renditions) == set(THUMBNAIL_SIZES)
+    with Image.open(BytesIO(renditions[256])) as small:
+        assert small.format == "JPEG"
+        assert small.size == (256, 192)
+    with Image.open(BytesIO(renditions[1024])) as medium:
+        assert medium.size == (1024, 768)
+
+
+def test_generate_thumbnails_writes_renditions_to_storage():
+    storage = MemoryStorage({"uploads/abc.jpg": _jpeg_bytes(800, 600)})
+
+    keys = generate_thumbnails(storage, "uploads/abc.jpg")
+
+    assert keys == {256: "uploads/abc_256.jpg", 1024: "uploads/abc_1024.jpg"}
+    assert set(storage.objects) == {"uploads/abc.jpg", "uploads/abc_256.jpg", "uploads/abc_1024.jpg"}
+
+
+def test_backfill_targets_photos_still_pointing_at_original():
+    storage = MemoryStorage({})
+    legacy = {
+        "key": "uploads/abc.jpg",
+        "url": "https://api.example.com/storage/uploads/abc.jpg",
+        "thumb_url": "https://api.example.com/storage/uploads/abc.jpg",
+    }
+
+    assert _needs_thumbnail(legacy, storage)
+    assert _thumbnail_url(storage, legacy, "uploads/abc_256.jpg") == (
+        "https://api.example.com/storage/uploads/abc_256.jpg"
+    )
+
+
+def test_backfill_repairs_thumb_urls_pointing_at_missing_renditions():
+    storage = MemoryStorage({})
+    photo = {
+        "key": "uploads/abc.jpg",
+        "url": "https://api.example.com/storage/uploads/abc.jpg",
+        "thumb_url": "https://api.example.com/storage/uploads/abc_256.jpg",
+    }
+
+    assert _needs_thumbnail(photo, storage)
+    storage.objects["uploads/abc_256.jpg"] = b"jpeg"
+    assert not _needs_thumbnail(photo, storage)
+
+
+def test_link_existing_thumbnails_switches_only_photos_whose_rendition_landed():
+    storage = MemoryStorage({"uploads/abc_256.jpg": b"jpeg"})
+    landed = {"key": "uploads/abc.jpg", "url": "/storage/uploads/abc.jpg", "thumb_url": "/storage/uploads/abc.jpg"}
+    pending = {"key": "uploads/def.jpg", "url": "/storage/uploads/def.jpg", "thumb_url": "/storage/uploads/def.jpg"}
+
+    linked = link_existing_thumbnails(storage, [landed, pending])
+
+    assert linked == [{**landed, "thumb_url": "/storage/uploads/abc_256.jpg"}, pending]
+
+
+def test_backfill_links_landed_renditions_and_stops_retrying_failures_on_postgres(pg_db, pg_job):
+    # Neither original is in storage: a render attempt can only fail.
+    storage = MemoryStorage({"uploads/abc_256.jpg": b"jpeg"})
+    landed = {"key": "uploads/abc.jpg", "url": "/storage/uploads/abc.jpg", "thumb_url": "/storage/uploads/abc.jpg"}
+    broken = {"key": "uploads/def.jpg", "url": "/storage/uploads/def.jpg", "thumb_url": "/storage/uploads/def.jpg"}
+    job = pg_job(photos=[landed, broken])
+
+    assert backfill_photo_thumbnails(pg_db, storage) == 1
+
+    pg_db.refresh(job)
+    assert job.photos == [{**landed, "thumb_url": "/storage/uploads/abc_256.jpg"}, {**broken, "thumb_failed": True}]
+    assert backfill_photo_thumbnails(pg_db, storage) == 0
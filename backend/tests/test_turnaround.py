@@ -0,0 +1,88 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.models import JobStageTiming, Status
+from app.routers.reports import _turnaround_statement
+from app.utils.turnaround import TURNAROUND_STAGES, record_stage_timings, stage_column
+
+
+def _event(job_id, status, timestamp):
+    return SimpleNamespace(job_id=job_id, to_status=status, timestamp=timestamp)
+
+
+def test_stage_columns_cover_every_turnaround_stage():
+    for _label, start_status, end_statuses in TURNAROUND_STAGES:
+        for status in (start_status, *end_statuses):
+            assert stage_column(status).endswith("_at")
+    assert stage_column(Status.RECEIVED_AT_SHOP) == "received_at_shop_at"
+
+
+def test_record_stage_timings_keeps_earliest_timestamp_per_job(fake_session):
+    job_id = uuid.uuid4()
+    first = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+    events = [
+        _event(job_id, Status.PACKED_READY, first + timedelta(hours=2)),
+        _event(job_id, Status.PACKED_READY, first),
+        _event(job_id, Status.CANCELLED, first),
+    ]
+    db = fake_session()
+
+    record_stage_timings(db, events)
+
+    assert len(db.statements) == 1
+    compiled = db.statements[0].compile(dialect=postgresql.dialect())
+    assert "least(job_stage_timings.packed_ready_at, excluded.packed_ready_at)" in str(compiled)
+    assert first in compiled.params.values()
+    assert first + timedelta(hours=2) not in compiled.params.values()
+
+
+def test_record_stage_timings_skips_untracked_statuses(fake_session):
+    db = fake_session()
+    record_stage_timings(db, [_event(uuid.uuid4(), Status.ON_HOLD, datetime.now(timezone.utc))])
+    assert db.statements == []
+
+
+def test_record_stage_timings_upsert_keeps_first_arrival_on_postgres(pg_db, pg_job):
+    job = pg_job()
+    first = datetime(2026, 3, 1, 9, 0, tzinfo=timezone.utc)
+
+    record_stage_timings(pg_db, [_event(job.id, Status.PACKED_READY, first + timedelta(hours=2))])
+    record_stage_timings(pg_db, [_event(job.id, Status.PACKED_READY, first)])
+    # A later re-entry, and a different stage, leave the first arrival alone.
+    record_stage_timings(
+        pg_db,
+        [
+            _event(job.id, Status.PACKED_READY, first + timedelta(days=1)),
+            _event(job.id, Status.DISPATCHED_TO_FACTORY, first + timedelta(days=2)),
+        ],
+    )
+
+    timing = pg_db.get(JobStageTiming, job.id, populate_existing=True)
+    assert timing.packed_ready_at == first
+    assert timing.dispatched_to_factory_at == first + timedelta(days=2)
+
+
+def test_turnaround_only_counts_stages_inside_the_window_on_postgres(pg_db, pg_job):
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=30)
+    inside, straddling, outside = pg_job(), pg_job(), pg_job()
+    record_stage_timings(
+        pg_db,
+        [
+            _event(inside.id, Status.PURCHASED, now - timedelta(days=10)),
+            _event(inside.id, Status.PACKED_READY, now - timedelta(days=6)),
+            _event(straddling.id, Status.PURCHASED, now - timedelta(days=40)),
+            _event(straddling.id, Status.PACKED_READY, now - timedelta(days=20)),
+            _event(outside.id, Status.PURCHASED, now - timedelta(days=90)),
+            _event(outside.id, Status.PACKED_READY, now - timedelta(days=80)),
+        ],
+    )
+    job_ids = [inside.id, straddling.id, outside.id]
+
+    row = pg_db.execute(_turnaround_statement(cutoff).where(JobStageTiming.job_id.in_(job_ids))).one()
+
+    average, p50, p90 = row[0:3]
+    assert (float(average), p50, p90) == (4.0, 4.0, 4.0)
@@ -0,0 +1,68 @@
+from io import BytesIO
+
+import pytest
+
+from app.utils import storage as storage_module
+from app.utils.images import detect_image_type
+from app.utils.storage import StorageClient
+
+
+@pytest.mark.parametrize(
+    ("head", "expected"),
+    [
+        (b"\xff\xd8\xff\xe0\x00\x10JFIF", "jpg"),
+        (b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR", "png"),
+        (b"RIFF\x24\x00\x00\x00WEBPVP8 ", "webp"),
+        (b"GIF89a\x01\x00", "gif"),
+        (b"\x00\x00\x00\x18ftypheic\x00\x00", "heic"),
+        (b"%PDF-1.7", None),
+        (b"", None),
+    ],
+)
+def test_detect_image_type(head, expected):
+    assert detect_image_type(head) == expected
+
+
+def test_local_upload_streams_fileobj(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module.settings, "storage_backend", "local")
+    monkeypatch.setattr(storage_module.settings, "local_storage_path", str(tmp_path))
+    content = b"\xff\xd8\xff" + b"x" * (storage_module.UPLOAD_CHUNK_SIZE * 2 + 17)
+
+    key, url, thumb_url = StorageClient().upload_fileobj(BytesIO(content), ext="jpg")
+
+    assert key.startswith("uploads/") and key.endswith(".jpg")
+    assert url == thumb_url == f"/storage/{key}"
+    assert (tmp_path / key).read_bytes() == content
+
+
+def test_local_upload_removes_partial_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module.settings, "storage_backend", "local")
+    monkeypatch.setattr(storage_module.settings, "local_storage_path", str(tmp_path))
+
+    class BrokenReader:
+        def __init__(self):
+            self.calls = 0
+
+        def read(self, size=-1):
+            self.calls += 1
+            if self.calls > 1:
+                raise OSError("client went away")
+            return b"\xff\xd8\xff" + b"x" * 10
+
+    with pytest.raises(OSError):
+        StorageClient().upload_fileobj(BrokenReader(), ext="jpg")
+    assert not any((tmp_path / "uploads").iterdir())
+
+
+def test_local_iter_chunks_streams_and_reports_missing(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage_module.settings, "storage_backend", "local")
+    monkeypatch.setattr(storage_module.settings, "local_storage_path", str(tmp_path))
+    storage = StorageClient()
+    content = b"x" * (storage_module.UPLOAD_CHUNK_SIZE + 5)
+    storage.put_bytes("documents/sheet.pdf", content)
+
+    chunks = list(storage.iter_chunks("documents/sheet.pdf"))
+
+    assert [len(chunk) for chunk in chunks] == [storage_module.UPLOAD_CHUNK_SIZE, 5]
+    assert b"".join(chunks) == content
+    assert storage.iter_chunks("documents/missing.pdf") is None